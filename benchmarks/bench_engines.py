@@ -0,0 +1,68 @@
+# bench_engines.py
+"""Compare startup time and query latency of the JSON and SQLite engines.
+
+    python benchmarks/bench_engines.py --sizes 10k,100k
+"""
+import argparse
+import json
+import os
+import tempfile
+import time
+
+from common import parse_sizes, quiet, synthetic_rows
+
+from phonebook.contact import Contact
+from phonebook.phonebook import PhoneBook
+from phonebook.sqlite_phonebook import SQLitePhoneBook
+
+QUERIES = {
+    "search": lambda phonebook: phonebook.search_contacts("Smi"),
+    "filter": lambda phonebook: phonebook.filter_contacts_by_time_frame("2024-01-01", "2024-01-02"),
+    "group": lambda phonebook: phonebook.group_contacts("last_name"),
+    "sort": lambda phonebook: phonebook.sort_contacts("last_name"),
+}
+
+
+def write_json(path, count):
+    records = []
+    for i, row in enumerate(synthetic_rows(count)):
+        timestamp = f"2024-01-{1 + i % 28:02d}T12:00:00"
+        records.append(Contact(**row, created_at=timestamp, updated_at=timestamp).to_dict())
+    with open(path, "w") as f:
+        json.dump(records, f, indent=4)
+
+
+def timed(func):
+    start = time.perf_counter()
+    result = func()
+    return time.perf_counter() - start, result
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--sizes", default="10k,100k", help="Comma-separated contact counts")
+    args = parser.parse_args()
+
+    print(f"{'rows':>10} {'engine':>8} {'startup':>9} " + " ".join(f"{name:>9}" for name in QUERIES))
+    for size in parse_sizes(args.sizes):
+        with tempfile.TemporaryDirectory() as workdir:
+            json_path = os.path.join(workdir, "contacts.json")
+            db_path = os.path.join(workdir, "contacts.db")
+            engines = {
+                "json": lambda: PhoneBook(json_path),
+                "sqlite": lambda: SQLitePhoneBook(db_path),
+            }
+            results = {}
+            with quiet():
+                write_json(json_path, size)
+                SQLitePhoneBook(db_path).migrate_from_json(json_path)
+                for name, factory in engines.items():
+                    startup, phonebook = timed(factory)
+                    latencies = [timed(lambda: query(phonebook))[0] for query in QUERIES.values()]
+                    results[name] = [startup] + latencies
+            for name, timings in results.items():
+                print(f"{size:>10} {name:>8} " + " ".join(f"{t:9.3f}" for t in timings))
+
+
+if __name__ == "__main__":
+    main()
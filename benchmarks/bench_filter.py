@@ -0,0 +1,47 @@
+# bench_filter.py
+"""Compare time-frame filter latency with and without the timestamp index.
+
+    python benchmarks/bench_filter.py --sizes 100k,1m
+"""
+import argparse
+import time
+
+from common import MemoryStorage, parse_sizes, quiet, synthetic_records
+
+from phonebook.phonebook import PhoneBook
+
+RANGES = [("2024-03-03", "2024-03-04"), ("2024-01-01", "2024-06-30")]
+
+
+def average(func, repeat):
+    start = time.perf_counter()
+    for _ in range(repeat):
+        func()
+    return (time.perf_counter() - start) / repeat
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--sizes", default="100k", help="Comma-separated contact counts")
+    parser.add_argument("--repeat", type=int, default=100, help="Indexed queries to average over")
+    args = parser.parse_args()
+
+    print(f"{'contacts':>10} {'range':>24} {'scan (ms)':>10} {'index (ms)':>11} {'results':>8}")
+    for size in parse_sizes(args.sizes):
+        with quiet():
+            phonebook = PhoneBook(storage=MemoryStorage(synthetic_records(size)))
+            rows = []
+            for start, end in RANGES:
+                query = lambda: phonebook.filter_contacts_by_time_frame(start, end)
+                indexed = average(query, args.repeat)
+                results = len(query())
+                index = phonebook._indexes.pop("created_at")
+                scan = average(query, 1)
+                phonebook._indexes["created_at"] = index
+                rows.append((f"{start}..{end}", scan, indexed, results))
+        for label, scan, indexed, results in rows:
+            print(f"{size:>10} {label:>24} {scan * 1000:10.1f} {indexed * 1000:11.2f} {results:>8}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,57 @@
+# bench_formats.py
+"""Compare load time, save time and file size of the on-disk formats.
+
+For every size the script saves the same synthetic contacts with each
+file-based storage backend and reports the time to save, the time to load
+them back and the size of the resulting file.
+
+    python benchmarks/bench_formats.py --sizes 100k,1m
+"""
+import argparse
+import os
+import tempfile
+import time
+
+from common import parse_sizes, quiet, synthetic_rows
+
+from phonebook.contact import Contact
+from phonebook.storage import ColumnarStorage, JSONLinesStorage, JSONStorage
+
+BACKENDS = {"json": JSONStorage, "jsonl": JSONLinesStorage, "columnar": ColumnarStorage}
+
+
+def synthetic_records(size):
+    return [Contact(**row, created_at="2024-01-01T12:00:00", updated_at="2024-01-01T12:00:00").to_dict()
+            for row in synthetic_rows(size)]
+
+
+def time_format(storage, records):
+    start = time.perf_counter()
+    storage.save(records)
+    save_time = time.perf_counter() - start
+    start = time.perf_counter()
+    loaded = storage.load()
+    load_time = time.perf_counter() - start
+    assert len(loaded) == len(records)
+    return save_time, load_time, os.path.getsize(storage.filename)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--sizes", default="10k,100k", help="Comma-separated phonebook sizes")
+    args = parser.parse_args()
+
+    print(f"{'size':>9} {'format':>9} {'save (s)':>9} {'load (s)':>9} {'size (MB)':>10}")
+    for size in parse_sizes(args.sizes):
+        with quiet():
+            records = synthetic_records(size)
+        with tempfile.TemporaryDirectory() as tmpdir:
+            for name, backend in BACKENDS.items():
+                storage = backend(os.path.join(tmpdir, f"contacts.{name}"))
+                with quiet():
+                    save_time, load_time, file_size = time_format(storage, records)
+                print(f"{size:>9} {name:>9} {save_time:9.3f} {load_time:9.3f} {file_size / 1e6:10.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,55 @@
+# bench_fuzzy.py
+"""Measure fuzzy name search latency with the phonetic index and with a scan.
+
+The index is built by the first search on an eagerly loaded phonebook; a
+lazily loaded phonebook scans the stored records on every search.
+
+    python benchmarks/bench_fuzzy.py --sizes 100k,1m
+"""
+import argparse
+import time
+
+from common import MemoryStorage, parse_sizes, quiet, synthetic_records
+
+from phonebook.phonebook import PhoneBook
+
+QUERIES = ["Jonson", "Smiht", "Gracia", "Jon Smith", "Fatma Kahn", "Zzyzx"]
+
+
+def best_of(func, repeat=3):
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        timings.append(time.perf_counter() - start)
+    return min(timings)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--sizes", default="100k", help="Comma-separated contact counts")
+    parser.add_argument("--limit", type=int, default=10, help="Number of results per search")
+    args = parser.parse_args()
+
+    print(f"{'contacts':>10} {'query':>12} {'scan (ms)':>10} {'index (ms)':>11} {'results':>8}")
+    for size in parse_sizes(args.sizes):
+        with quiet():
+            records = synthetic_records(size)
+            phonebook = PhoneBook(storage=MemoryStorage(records))
+            lazy = PhoneBook(storage=MemoryStorage(records), lazy=True)
+            start = time.perf_counter()
+            phonebook.fuzzy_search_contacts(QUERIES[0], limit=args.limit)
+            build = time.perf_counter() - start
+            rows = []
+            for query in QUERIES:
+                indexed = best_of(lambda: phonebook.fuzzy_search_contacts(query, limit=args.limit))
+                scan = best_of(lambda: lazy.fuzzy_search_contacts(query, limit=args.limit), repeat=1)
+                results = len(phonebook.fuzzy_search_contacts(query, limit=args.limit))
+                rows.append((query, scan, indexed, results))
+        print(f"{size:>10} {'(build)':>12} {'':>10} {build * 1000:11.0f}")
+        for query, scan, indexed, results in rows:
+            print(f"{size:>10} {query:>12} {scan * 1000:10.1f} {indexed * 1000:11.1f} {results:>8}")
+
+
+if __name__ == "__main__":
+    main()
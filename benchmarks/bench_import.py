@@ -0,0 +1,63 @@
+# bench_import.py
+"""Benchmark CSV import with the hash-indexed duplicate check.
+
+The "before" column replays the original linear ``is_duplicate`` scan. Both
+runs skip ``save_contacts`` so that only the duplicate detection cost is
+measured. The quadratic baseline is skipped above ``--max-baseline`` rows.
+
+    python benchmarks/bench_import.py --sizes 10k,100k,1m
+"""
+import argparse
+import os
+import tempfile
+import time
+
+from common import parse_sizes, quiet, write_csv
+
+from phonebook.phonebook import PhoneBook
+
+
+class LinearScanPhoneBook(PhoneBook):
+    """PhoneBook using the original O(n) duplicate scan."""
+
+    def is_duplicate(self, contact):
+        for existing_contact in self.contacts:
+            if (existing_contact.first_name == contact.first_name and
+                existing_contact.last_name == contact.last_name and
+                existing_contact.phone == contact.phone and
+                existing_contact.email == contact.email and
+                existing_contact.address == contact.address):
+                return True
+        return False
+
+
+def time_import(phonebook_class, csv_path, workdir):
+    phonebook = phonebook_class(os.path.join(workdir, "contacts.json"))
+    phonebook.save_contacts = lambda: None
+    start = time.perf_counter()
+    phonebook.import_contacts_from_csv(csv_path)
+    return time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--sizes", default="10k,100k,1m", help="Comma-separated row counts")
+    parser.add_argument("--max-baseline", type=int, default=20_000,
+                        help="Largest size to run the linear-scan baseline for")
+    args = parser.parse_args()
+
+    print(f"{'rows':>10} {'before (s)':>12} {'after (s)':>12}")
+    for size in parse_sizes(args.sizes):
+        with tempfile.TemporaryDirectory() as workdir:
+            csv_path = os.path.join(workdir, "contacts.csv")
+            write_csv(csv_path, size)
+            with quiet():
+                before = (time_import(LinearScanPhoneBook, csv_path, workdir)
+                          if size <= args.max_baseline else None)
+                after = time_import(PhoneBook, csv_path, workdir)
+        before_text = f"{before:12.2f}" if before is not None else f"{'skipped':>12}"
+        print(f"{size:>10} {before_text} {after:12.2f}")
+
+
+if __name__ == "__main__":
+    main()
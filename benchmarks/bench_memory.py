@@ -0,0 +1,65 @@
+# bench_memory.py
+"""Report memory used per contact by PhoneBook.contacts.
+
+"before" models the original Contact (per-instance __dict__, ISO string
+timestamps); "after" is the current slotted Contact.
+
+    python benchmarks/bench_memory.py --sizes 100k,1m
+"""
+import argparse
+import gc
+import tracemalloc
+
+from common import parse_sizes, quiet, synthetic_rows
+
+from phonebook.contact import Contact
+
+
+class DictContact:
+    """The original Contact layout, without logging."""
+
+    def __init__(self, first_name, last_name, phone, email=None, address=None, created_at=None, updated_at=None):
+        self.first_name = first_name
+        self.last_name = last_name
+        self.phone = phone
+        self.email = email
+        self.address = address
+        self.created_at = created_at
+        self.updated_at = updated_at
+
+
+def records(count):
+    for i, row in enumerate(synthetic_rows(count)):
+        # Build fresh strings, as json.load does, so interning is measured.
+        row = {key: "".join(value) for key, value in row.items()}
+        timestamp = f"2024-01-{1 + i % 28:02d}T12:{i // 60 % 60:02d}:{i % 60:02d}.{i % 1_000_000:06d}"
+        yield dict(row, created_at=timestamp, updated_at=timestamp)
+
+
+def bytes_per_contact(factory, count):
+    gc.collect()
+    tracemalloc.start()
+    # Records are built and dropped one at a time, so everything still
+    # allocated at the end is held by the contacts themselves.
+    contacts = [factory(**record) for record in records(count)]
+    gc.collect()
+    current, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return current / len(contacts)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--sizes", default="100k", help="Comma-separated contact counts")
+    args = parser.parse_args()
+
+    print(f"{'contacts':>10} {'before (B)':>12} {'after (B)':>12}")
+    for size in parse_sizes(args.sizes):
+        with quiet():
+            before = bytes_per_contact(DictContact, size)
+            after = bytes_per_contact(Contact, size)
+        print(f"{size:>10} {before:12.0f} {after:12.0f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,48 @@
+# bench_parallel.py
+"""Measure CSV import throughput with 1, 2, 4 and 8 worker processes.
+
+Each run imports the same file into an empty phonebook, normalizing and
+validating phones and emails as the CLI does, with a single save at the
+end. "sequential" is the single-process importer.
+
+    python benchmarks/bench_parallel.py --size 1m
+"""
+import argparse
+import os
+import tempfile
+import time
+
+from common import parse_sizes, quiet, write_csv
+
+from phonebook.phonebook import PhoneBook
+
+
+def time_import(csv_path, workdir, workers):
+    filename = os.path.join(workdir, f"contacts-{workers}.json")
+    phonebook = PhoneBook(filename, lazy=True)
+    start = time.perf_counter()
+    phonebook.import_contacts_from_csv(csv_path, workers=workers)
+    elapsed = time.perf_counter() - start
+    os.remove(filename)
+    return elapsed
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--size", default="200k", help="Number of CSV rows")
+    parser.add_argument("--workers", default="1,2,4,8", help="Comma-separated worker counts")
+    args = parser.parse_args()
+    size = parse_sizes(args.size)[0]
+
+    print(f"{'workers':>10} {'time (s)':>9} {'rows/s':>10}")
+    with tempfile.TemporaryDirectory() as workdir:
+        csv_path = os.path.join(workdir, "input.csv")
+        write_csv(csv_path, size)
+        for workers in [None] + [int(n) for n in args.workers.split(",")]:
+            with quiet():
+                elapsed = time_import(csv_path, workdir, workers)
+            print(f"{workers or 'sequential':>10} {elapsed:9.2f} {size / elapsed:10.0f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,50 @@
+# bench_search.py
+"""Compare substring search latency with and without the trigram index.
+
+    python benchmarks/bench_search.py --sizes 100k,1m
+"""
+import argparse
+import time
+
+from common import MemoryStorage, parse_sizes, quiet, synthetic_records
+
+from phonebook.phonebook import PhoneBook
+
+QUERIES = ["Smith", "(000) 001", "ohn", "J*son", "mi"]
+
+
+def best_of(func, repeat=3):
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        timings.append(time.perf_counter() - start)
+    return min(timings)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--sizes", default="100k", help="Comma-separated contact counts")
+    args = parser.parse_args()
+
+    print(f"{'contacts':>10} {'query':>10} {'scan (ms)':>10} {'index (ms)':>11} {'results':>8}")
+    for size in parse_sizes(args.sizes):
+        with quiet():
+            start = time.perf_counter()
+            phonebook = PhoneBook(storage=MemoryStorage(synthetic_records(size)))
+            load = time.perf_counter() - start
+            rows = []
+            for query in QUERIES:
+                indexed = best_of(lambda: phonebook.search_contacts(query))
+                results = len(phonebook.search_contacts(query))
+                index = phonebook._indexes.pop("trigram")
+                scan = best_of(lambda: phonebook.search_contacts(query), repeat=1)
+                phonebook._indexes["trigram"] = index
+                rows.append((query, scan, indexed, results))
+        print(f"{size:>10} {'(load)':>10} {'':>10} {load * 1000:11.0f}")
+        for query, scan, indexed, results in rows:
+            print(f"{size:>10} {query:>10} {scan * 1000:10.1f} {indexed * 1000:11.1f} {results:>8}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,85 @@
+# bench_startup.py
+"""Measure how long each one-shot CLI action takes on a large phonebook.
+
+For every action the script reports the in-process time with eager loading
+(every record becomes a Contact up front), with lazy loading, and the wall
+clock time of a full ``python cli.py`` invocation, which uses lazy loading.
+
+    python benchmarks/bench_startup.py --size 100k
+"""
+import argparse
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import time
+
+from common import parse_sizes, quiet, synthetic_rows
+
+import cli
+from phonebook.contact import Contact
+from phonebook.phonebook import PhoneBook
+
+CLI_PATH = os.path.abspath(cli.__file__)
+
+ACTIONS = {
+    "add": ["add", "--first_name", "New", "--last_name", "Person", "--phone", "(999) 999-9999"],
+    "update": ["update", "--index", "0", "--phone", "(888) 888-8888"],
+    "delete": ["delete", "--index", "0"],
+    "search": ["search", "--query", "Zzz"],
+    "filter": ["filter", "--start_date", "2000-01-01", "--end_date", "2000-01-02"],
+    "export": ["export", "--path", "exported.csv"],
+}
+
+
+def write_contacts(workdir, size):
+    os.makedirs(os.path.join(workdir, "data"), exist_ok=True)
+    records = [Contact(**row, created_at="2024-01-01T12:00:00", updated_at="2024-01-01T12:00:00").to_dict()
+               for row in synthetic_rows(size)]
+    with open(os.path.join(workdir, cli.CONTACTS_FILE), "w") as f:
+        json.dump(records, f, indent=4)
+
+
+def time_in_process(argv, lazy):
+    args = cli.build_parser().parse_args(argv)
+    start = time.perf_counter()
+    phonebook = PhoneBook(cli.CONTACTS_FILE, lazy=lazy)
+    cli.ACTIONS[args.action](args, phonebook)
+    return time.perf_counter() - start
+
+
+def time_subprocess(argv):
+    start = time.perf_counter()
+    subprocess.run([sys.executable, CLI_PATH, *argv], check=True,
+                   stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    return time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--size", default="100k", help="Number of contacts in the phonebook")
+    args = parser.parse_args()
+    size = parse_sizes(args.size)[0]
+
+    print(f"{'action':>8} {'eager (s)':>10} {'lazy (s)':>10} {'cli (s)':>10}")
+    cwd = os.getcwd()
+    with tempfile.TemporaryDirectory() as workdir:
+        os.chdir(workdir)
+        try:
+            for action, argv in ACTIONS.items():
+                timings = []
+                for lazy in (False, True):
+                    with quiet():
+                        write_contacts(workdir, size)
+                        timings.append(time_in_process(argv, lazy))
+                with quiet():
+                    write_contacts(workdir, size)
+                timings.append(time_subprocess(argv))
+                print(f"{action:>8} " + " ".join(f"{t:10.3f}" for t in timings))
+        finally:
+            os.chdir(cwd)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,78 @@
+# bench_stream.py
+"""Measure time and peak memory of streaming CSV import and export.
+
+Each step runs in a fresh process so its peak resident set size can be
+reported on its own. Use large sizes (e.g. ``--sizes 20m``, several GB of
+CSV) to check that memory stays flat for the SQLite engine.
+
+    python benchmarks/bench_stream.py --sizes 100k,1m
+"""
+import argparse
+import os
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+
+from common import parse_sizes, quiet, write_csv
+
+from phonebook.phonebook import PhoneBook
+from phonebook.sqlite_phonebook import SQLitePhoneBook
+
+STEPS = {
+    "import json (stream)": lambda workdir: PhoneBook(
+        os.path.join(workdir, "contacts.json"), lazy=True
+    ).import_contacts_from_csv(os.path.join(workdir, "input.csv"), stream=True),
+    "import sqlite (stream)": lambda workdir: SQLitePhoneBook(
+        os.path.join(workdir, "contacts.db")
+    ).import_contacts_from_csv(os.path.join(workdir, "input.csv"), stream=True),
+    "export sqlite (csv)": lambda workdir: SQLitePhoneBook(
+        os.path.join(workdir, "contacts.db")
+    ).export_contacts_to_csv(os.path.join(workdir, "output.csv")),
+    "export sqlite (csv.gz)": lambda workdir: SQLitePhoneBook(
+        os.path.join(workdir, "contacts.db")
+    ).export_contacts_to_csv(os.path.join(workdir, "output.csv.gz")),
+}
+
+
+def run_step(name, workdir):
+    """Run one step in a child process; return (seconds, peak RSS in MB)."""
+    output = subprocess.run(
+        [sys.executable, __file__, "--child", name, workdir],
+        check=True, capture_output=True, text=True
+    ).stdout.split()
+    return float(output[0]), float(output[1])
+
+
+def child(name, workdir):
+    with quiet():
+        start = time.perf_counter()
+        STEPS[name](workdir)
+        elapsed = time.perf_counter() - start
+    peak_kb = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    print(elapsed, peak_kb / 1024)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--sizes", default="100k", help="Comma-separated row counts")
+    parser.add_argument("--child", nargs=2, metavar=("STEP", "WORKDIR"), help=argparse.SUPPRESS)
+    args = parser.parse_args()
+    if args.child:
+        child(*args.child)
+        return
+
+    print(f"{'rows':>10} {'csv (MB)':>9} {'step':>24} {'time (s)':>9} {'peak RSS (MB)':>14}")
+    for size in parse_sizes(args.sizes):
+        with tempfile.TemporaryDirectory() as workdir:
+            csv_path = os.path.join(workdir, "input.csv")
+            write_csv(csv_path, size)
+            csv_mb = os.path.getsize(csv_path) / 1e6
+            for name in STEPS:
+                elapsed, peak = run_step(name, workdir)
+                print(f"{size:>10} {csv_mb:9.0f} {name:>24} {elapsed:9.2f} {peak:14.0f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,246 @@
+# bench_suite.py
+"""Time every PhoneBook operation on each storage backend and report the results as JSON.
+
+Each operation runs on a fresh copy of a phonebook filled with synthetic
+contacts, so operations that change the phonebook do not affect the next
+run. The best of ``--repeat`` runs is reported. Write the results to a file
+and pass it as ``--baseline`` to a later run to see which operations got
+slower; the script exits with status 1 if any slowed down by more than
+``--threshold``.
+
+    python benchmarks/bench_suite.py --sizes 10k,100k --output results.json
+    python benchmarks/bench_suite.py --sizes 10k,100k --baseline results.json
+    python benchmarks/bench_suite.py --sizes 100k --backends json,sqlite --names zipf --duplicate-rate 0.1
+"""
+import argparse
+import json
+import os
+import platform
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime, timezone
+
+from common import NAME_DISTRIBUTIONS, parse_sizes, quiet, synthetic_records, write_csv
+
+import cli
+from phonebook.contact import Contact
+from phonebook.phonebook import PhoneBook
+from phonebook.sqlite_phonebook import SQLitePhoneBook
+
+BACKENDS = tuple(sorted(cli.STORAGE_BACKENDS)) + ("sqlite",)
+# Contacts added one at a time by the "add" operation.
+ADD_COUNT = 100
+# Every DELETE_STEP-th contact is removed by the "delete_batch" operation.
+DELETE_STEP = 100
+
+
+def open_phonebook(backend, path, lazy=False):
+    if backend == "sqlite":
+        return SQLitePhoneBook(path)
+    return PhoneBook(storage=cli.STORAGE_BACKENDS[backend](path), lazy=lazy)
+
+
+def add_contacts(phonebook, context):
+    for i in range(ADD_COUNT):
+        phonebook.add_contact(Contact("Bench", f"Added{i}", f"(999) 999-{i:04d}"))
+    return ADD_COUNT
+
+
+def delete_batch(phonebook, context):
+    indices = range(0, context["size"], DELETE_STEP)
+    phonebook.delete_contacts(indices)
+    return len(indices)
+
+
+def save_contacts(phonebook, context):
+    phonebook.save_contacts()
+    return context["size"]
+
+
+def import_contacts(phonebook, context):
+    return phonebook.import_contacts_from_csv(context["import_path"])["imported"]
+
+
+def export_contacts(phonebook, context):
+    phonebook.export_contacts_to_csv(os.path.join(context["workdir"], "export.csv"))
+    return context["size"]
+
+
+# Each operation takes an open phonebook and returns the number of contacts
+# it added, returned or wrote. "load" is timed separately, as it is the
+# opening of the phonebook itself.
+OPERATIONS = {
+    "save": save_contacts,
+    "add": add_contacts,
+    "import": import_contacts,
+    "export": export_contacts,
+    "search": lambda phonebook, context: len(phonebook.search_contacts("Smi")),
+    "filter": lambda phonebook, context: len(phonebook.filter_contacts_by_time_frame("2024-01-01", "2024-03-31")),
+    "sort": lambda phonebook, context: len(phonebook.sort_contacts("last_name,first_name")),
+    "group": lambda phonebook, context: len(phonebook.group_contacts("last_name")),
+    "delete_batch": delete_batch,
+}
+# SQLite writes every change as it is made, so it has no full save to time.
+SKIPPED = {("sqlite", "save")}
+
+
+def write_phonebook(backend, path, records):
+    if backend == "sqlite":
+        json_path = path + ".json"
+        cli.STORAGE_BACKENDS["json"](json_path).save(records)
+        SQLitePhoneBook(path).migrate_from_json(json_path)
+        os.remove(json_path)
+    else:
+        cli.STORAGE_BACKENDS[backend](path).save(records)
+
+
+def run_operation(backend, operation, context, repeat, lazy):
+    """Return the timings of ``repeat`` runs of ``operation`` and the number of contacts it handled."""
+    base, workdir = context["base"], context["workdir"]
+    path = os.path.join(workdir, os.path.basename(context["path"]))
+    timings = []
+    for _ in range(repeat):
+        shutil.rmtree(workdir, ignore_errors=True)
+        shutil.copytree(base, workdir)
+        start = time.perf_counter()
+        phonebook = open_phonebook(backend, path, lazy)
+        if operation == "load":
+            items = context["size"]
+        else:
+            start = time.perf_counter()
+            items = OPERATIONS[operation](phonebook, context)
+        timings.append(time.perf_counter() - start)
+        if backend == "sqlite":
+            phonebook.connection.close()
+    return timings, items
+
+
+def benchmark(sizes, backends, operations, generator, repeat, lazy):
+    results = []
+    for size in sizes:
+        with quiet():
+            records = synthetic_records(size, **generator)
+        for backend in backends:
+            with tempfile.TemporaryDirectory() as tmpdir:
+                base = os.path.join(tmpdir, "base")
+                os.makedirs(base)
+                filename = "contacts.db" if backend == "sqlite" else "contacts.json"
+                context = {
+                    "size": size,
+                    "base": base,
+                    "path": os.path.join(base, filename),
+                    "workdir": os.path.join(tmpdir, "work"),
+                    "import_path": os.path.join(tmpdir, "import.csv"),
+                }
+                generator_options = {key: value for key, value in generator.items() if key != "seed"}
+                with quiet():
+                    write_phonebook(backend, context["path"], records)
+                    write_csv(context["import_path"], max(size // 10, 1), generator["seed"] + 1, **generator_options)
+                for operation in operations:
+                    if (backend, operation) in SKIPPED:
+                        continue
+                    with quiet():
+                        timings, items = run_operation(backend, operation, context, repeat, lazy)
+                    results.append({
+                        "size": size,
+                        "backend": backend,
+                        "operation": operation,
+                        "seconds": min(timings),
+                        "runs": timings,
+                        "items": items,
+                    })
+                    print(f"{size:>9} {backend:>9} {operation:>13} {min(timings):9.4f}s", file=sys.stderr)
+    return results
+
+
+def git_commit():
+    try:
+        output = subprocess.run(["git", "rev-parse", "HEAD"], capture_output=True, text=True, check=True,
+                                cwd=os.path.dirname(os.path.abspath(__file__)))
+    except (OSError, subprocess.CalledProcessError):
+        return None
+    return output.stdout.strip()
+
+
+def compare(results, baseline, threshold):
+    """Print each result next to the same measurement in ``baseline``; return the regressed ones."""
+    previous = {(r["size"], r["backend"], r["operation"]): r["seconds"] for r in baseline["results"]}
+    regressions = []
+    print(f"{'size':>9} {'backend':>9} {'operation':>13} {'before':>9} {'after':>9} {'change':>8}", file=sys.stderr)
+    for result in results:
+        before = previous.get((result["size"], result["backend"], result["operation"]))
+        if not before:
+            continue
+        change = result["seconds"] / before - 1
+        flag = " slower" if change > threshold else ""
+        if flag:
+            regressions.append(result)
+        print(f"{result['size']:>9} {result['backend']:>9} {result['operation']:>13} "
+              f"{before:9.4f} {result['seconds']:9.4f} {change:+8.0%}{flag}", file=sys.stderr)
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--sizes", default="10k", help="Comma-separated contact counts")
+    parser.add_argument("--backends", default=",".join(BACKENDS),
+                        help=f"Comma-separated storage backends (default: {','.join(BACKENDS)})")
+    parser.add_argument("--operations", default=",".join(("load",) + tuple(OPERATIONS)),
+                        help="Comma-separated operations to time (default: all)")
+    parser.add_argument("--repeat", type=int, default=3, help="Runs per operation; the best is reported")
+    parser.add_argument("--lazy", action="store_true", help="Open JSON-based phonebooks lazily, like the CLI does")
+    parser.add_argument("--seed", type=int, default=0, help="Seed of the synthetic contact generator")
+    parser.add_argument("--names", choices=NAME_DISTRIBUTIONS, default="uniform",
+                        help="Distribution of first and last names")
+    parser.add_argument("--email-rate", type=float, default=1.0, help="Fraction of contacts with an email address")
+    parser.add_argument("--duplicate-rate", type=float, default=0.0,
+                        help="Fraction of generated contacts that repeat an earlier one")
+    parser.add_argument("--output", help="Write the JSON results to this file instead of stdout")
+    parser.add_argument("--baseline", help="JSON results of an earlier run to compare against")
+    parser.add_argument("--threshold", type=float, default=0.2,
+                        help="Slowdown against the baseline that counts as a regression (default: 0.2)")
+    args = parser.parse_args()
+
+    backends = [backend.strip() for backend in args.backends.split(",")]
+    operations = [operation.strip() for operation in args.operations.split(",")]
+    for backend in backends:
+        if backend not in BACKENDS:
+            parser.error(f"unknown backend: {backend}")
+    for operation in operations:
+        if operation != "load" and operation not in OPERATIONS:
+            parser.error(f"unknown operation: {operation}")
+    generator = {"seed": args.seed, "names": args.names, "email_rate": args.email_rate,
+                 "duplicate_rate": args.duplicate_rate}
+
+    results = benchmark(parse_sizes(args.sizes), backends, operations, generator, args.repeat, args.lazy)
+    report = {
+        "meta": {
+            "timestamp": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+            "commit": git_commit(),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "cpu_count": os.cpu_count(),
+            "repeat": args.repeat,
+            "lazy": args.lazy,
+            "generator": generator,
+        },
+        "results": results,
+    }
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(report, f, indent=2)
+    else:
+        json.dump(report, sys.stdout, indent=2)
+        print()
+    if args.baseline:
+        with open(args.baseline) as f:
+            regressions = compare(results, json.load(f), args.threshold)
+        if regressions:
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,123 @@
+# common.py
+"""Helpers shared by the benchmark scripts."""
+import contextlib
+import csv
+import io
+import logging
+import os
+import random
+import sys
+
+# Allow running the scripts directly, e.g. ``python benchmarks/bench_import.py``.
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+FIRST_NAMES = ["John", "Jane", "Alice", "Bob", "Ivan", "Maria", "Wei", "Fatima", "Omar", "Sara"]
+LAST_NAMES = ["Doe", "Smith", "Johnson", "Brown", "Lee", "Garcia", "Chen", "Khan", "Fu", "Ming"]
+STREETS = ["Main St", "Oak St", "Pine St", "Maple St", "Elm St", "Cedar Ave"]
+FIELDNAMES = ["first_name", "last_name", "phone", "email", "address"]
+
+
+NAME_DISTRIBUTIONS = ("uniform", "zipf")
+
+
+def synthetic_rows(count, seed=0, names="uniform", email_rate=1.0, duplicate_rate=0.0):
+    """Yield ``count`` deterministic contact rows as dictionaries.
+
+    ``names`` picks first and last names uniformly or with a Zipf
+    distribution, where a few names are very common. Each row has an email
+    address with probability ``email_rate``, and with probability
+    ``duplicate_rate`` a row repeats an earlier row instead of being unique.
+    The defaults produce the same rows as before these options existed.
+    """
+    rng = random.Random(seed)
+    if names not in NAME_DISTRIBUTIONS:
+        raise ValueError(f"Unknown name distribution: {names}")
+    weights = [1 / rank for rank in range(1, len(FIRST_NAMES) + 1)]
+
+    def pick(choices):
+        return rng.choice(choices) if names == "uniform" else rng.choices(choices, weights)[0]
+
+    previous = []
+    for i in range(count):
+        if duplicate_rate and previous and rng.random() < duplicate_rate:
+            yield dict(rng.choice(previous))
+            continue
+        first_name = pick(FIRST_NAMES)
+        last_name = pick(LAST_NAMES)
+        row = {
+            "first_name": first_name,
+            "last_name": last_name,
+            "phone": f"({i // 10_000_000 % 1000:03d}) {i // 10_000 % 1000:03d}-{i % 10_000:04d}",
+            "email": f"{first_name.lower()}.{last_name.lower()}{i}@example.com",
+            "address": f"{rng.randint(1, 9999)} {rng.choice(STREETS)}",
+        }
+        if email_rate < 1 and rng.random() >= email_rate:
+            row["email"] = ""
+        if duplicate_rate:
+            previous.append(row)
+        yield row
+
+
+def write_csv(path, count, seed=0, **options):
+    """Write ``count`` synthetic rows to the CSV file at ``path``; ``options`` go to ``synthetic_rows``."""
+    with open(path, mode="w", newline="") as file:
+        writer = csv.DictWriter(file, fieldnames=FIELDNAMES)
+        writer.writeheader()
+        writer.writerows(synthetic_rows(count, seed, **options))
+
+
+@contextlib.contextmanager
+def quiet():
+    """Silence logging and stdout so they do not dominate the timings."""
+    logging.disable(logging.CRITICAL)
+    try:
+        with contextlib.redirect_stdout(io.StringIO()):
+            yield
+    finally:
+        logging.disable(logging.NOTSET)
+
+
+def parse_sizes(value):
+    """Parse a comma-separated list of sizes such as ``10k,100k,1m``."""
+    sizes = []
+    for item in value.split(","):
+        item = item.strip().lower()
+        multiplier = {"k": 1_000, "m": 1_000_000}.get(item[-1:], 1)
+        sizes.append(int(item.rstrip("km")) * multiplier)
+    return sizes
+
+
+class MemoryStorage:
+    """Storage that serves a fixed list of records and discards saves.
+
+    Lets benchmarks build large phonebooks without touching the disk.
+    """
+
+    filename = ":memory:"
+
+    def __init__(self, records):
+        self.records = records
+
+    def load(self):
+        return self.records
+
+    def save(self, records):
+        pass
+
+    def append(self, entries):
+        return True
+
+    def lock(self):
+        return contextlib.nullcontext()
+
+    def generation(self):
+        return 0
+
+
+def synthetic_records(count, seed=0, **options):
+    """Return ``count`` synthetic contacts as dictionaries with timestamps; ``options`` go to ``synthetic_rows``."""
+    records = []
+    for i, row in enumerate(synthetic_rows(count, seed, **options)):
+        timestamp = f"2024-{1 + i % 12:02d}-{1 + i % 28:02d}T12:{i // 60 % 60:02d}:{i % 60:02d}"
+        records.append(dict(row, created_at=timestamp, updated_at=timestamp))
+    return records
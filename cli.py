@@ -1,30 +1,35 @@
 # cli.py
 import argparse
+import contextlib
+import itertools
 import logging
-import re
+import sys
 
+from phonebook.batch import UPDATE_FIELDS
+from phonebook.fuzzy import FUZZY_LIMIT
+from phonebook.logs import LOG_LEVELS, configure_logging
+from phonebook.metrics import METRICS
+from phonebook.output import OUTPUT_FORMATS, ContactWriter
 from phonebook.phonebook import PhoneBook, Contact
+from phonebook.storage import ColumnarStorage, JSONLinesStorage, JSONStorage, JournalStorage
+from phonebook.validation import validate_email, validate_phone
+
+STORAGE_BACKENDS = {
+    "json": JSONStorage,
+    "jsonl": JSONLinesStorage,
+    "columnar": ColumnarStorage,
+    "journal": JournalStorage,
+}
+CONTACTS_FILE = "data/contacts.json"
+SQLITE_FILE = "data/contacts.db"
+CSV_EXTENSIONS = ('.csv', '.csv.gz')
+UPDATE_EXTENSIONS = ('.csv', '.jsonl')
+SOCKET_PATH = "data/phonebook.sock"
+# Functions shown by --profile when no file is given for the statistics.
+PROFILE_LINES = 25
+
+logger = logging.getLogger(__name__)
 
-# Configure logging
-logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
-
-def validate_phone(phone):
-    """Validate the phone number format."""
-    pattern = re.compile(r'^\(\d{3}\) \d{3}-\d{4}$')
-    if not pattern.match(phone):
-        raise ValueError(
-            "Phone number must be in the format (###) ###-####. "
-            "Please provide a valid phone number."
-        )
-
-def validate_email(email):
-    """Validate the email address format."""
-    pattern = re.compile(r'^[\w\.-]+@[\w\.-]+\.\w+$')
-    if email and not pattern.match(email):
-        raise ValueError(
-            "Invalid email address. Please provide a valid email address."
-            )
-    
 def add_contact(args, phonebook):
     """Add a new contact to the phonebook."""
     if args.first_name and args.last_name and args.phone:
@@ -36,243 +41,539 @@ def add_contact(args, phonebook):
                 args.first_name, args.last_name, args.phone, args.email, args.address
             )
             phonebook.add_contact(contact)
-            logging.info("Contact added successfully.")
+            logger.info("Contact added successfully.")
             print("Contact added successfully.")
         except ValueError as e:
-            logging.error(f"Error: {e}")
+            logger.error("Error: %s", e)
             print(f"Error: {e}")
     else:
         error_message = "First name, last name, and phone are required to add a contact."
-        logging.error(f"Error: {error_message}")
+        logger.error("Error: %s", error_message)
         print(f"Error: {error_message}")
         raise ValueError(error_message)
 
 def update_contact(args, phonebook):
-    """Update an existing contact in the phonebook."""
-    if args.index is not None:
+    """Update an existing contact in the phonebook, chosen by ID or index."""
+    if args.id or args.index is not None:
         try:
             if args.phone:
                 validate_phone(args.phone)
             if args.email:
                 validate_email(args.email)
-            phonebook.update_contact(
-                args.index, args.first_name, args.last_name, 
-                args.phone, args.email, args.address
-            )
-            logging.info("Contact updated successfully.")
+            fields = (args.first_name, args.last_name, args.phone, args.email, args.address)
+            if args.id:
+                phonebook.update_contact_by_id(args.id, *fields)
+            else:
+                phonebook.update_contact(args.index, *fields)
+            logger.info("Contact updated successfully.")
             print("Contact updated successfully.")
         except ValueError as e:
-            logging.error(f"Error: {e}")
+            logger.error("Error: %s", e)
             print(f"Error: {e}")
+        except KeyError as e:
+            logger.error("Error: %s", e.args[0])
+            print(f"Error: {e.args[0]}")
     else:
-        logging.error("Error: Index is required to update a contact.")
-        print("Error: Please provide the index of the contact to update.")
-        raise ValueError("Index is required to update a contact.")
+        logger.error("Error: ID or index is required to update a contact.")
+        print("Error: Please provide the ID or index of the contact to update.")
+        raise ValueError("ID or index is required to update a contact.")
 
 def delete_contact(args, phonebook):
-    """Delete a contact from the phonebook."""
-    if args.index is not None:
-        phonebook.delete_contact(args.index)
-        logging.info("Contact deleted successfully.")
-        print("Contact deleted successfully.")
+    """Delete a contact from the phonebook, chosen by ID or index."""
+    if args.id or args.index is not None:
+        try:
+            if args.id:
+                phonebook.delete_contact_by_id(args.id)
+            else:
+                phonebook.delete_contact(args.index)
+            logger.info("Contact deleted successfully.")
+            print("Contact deleted successfully.")
+        except KeyError as e:
+            logger.error("Error: %s", e.args[0])
+            print(f"Error: {e.args[0]}")
     else:
-        error_message = "Index is required to delete a contact."
-        logging.error(f"Error: {error_message}")
-        print("Error: Please provide the index of the contact to delete.")
+        error_message = "ID or index is required to delete a contact."
+        logger.error("Error: %s", error_message)
+        print("Error: Please provide the ID or index of the contact to delete.")
         raise ValueError(error_message)
 
 def delete_contacts(args, phonebook):
-    """Delete multiple contacts from the phonebook."""
-    if args.indices:
-        indices = [int(index) - 1 for index in args.indices.split(',')]
-        phonebook.delete_contacts(indices)
-        logging.info("Contacts deleted successfully.")
-        print("Contacts deleted successfully.")
+    """Delete multiple contacts from the phonebook, chosen by IDs or indices."""
+    if args.ids or args.indices:
+        try:
+            if args.ids:
+                phonebook.delete_contacts_by_id([contact_id.strip() for contact_id in args.ids.split(',')])
+            else:
+                phonebook.delete_contacts([int(index) - 1 for index in args.indices.split(',')])
+            logger.info("Contacts deleted successfully.")
+            print("Contacts deleted successfully.")
+        except (IndexError, KeyError) as e:
+            logger.error("Error: %s", e.args[0])
+            print(f"Error: {e.args[0]}. No contacts were deleted.")
     else:
-        error_message = "Indices are required to delete contacts."
-        logging.error(f"Error: {error_message}")
-        print("Error: Please provide the indices of the contacts to delete.")
+        error_message = "IDs or indices are required to delete contacts."
+        logger.error("Error: %s", error_message)
+        print("Error: Please provide the IDs or indices of the contacts to delete.")
         raise ValueError(error_message)
+
+def get_contacts(args, phonebook):
+    """Look up contacts by exact ID, phone number or email address."""
+    if args.id:
+        contact = phonebook.get_by_id(args.id)
+        results = [contact] if contact else []
+    elif args.phone:
+        results = phonebook.get_by_phone(args.phone)
+    elif args.email:
+        results = phonebook.get_by_email(args.email)
+    else:
+        logger.error("Error: ID, phone or email is required to look up contacts.")
+        print("Error: Please provide the ID, phone number or email address to look up.")
+        return
+    if results:
+        write_contacts(args, results)
+        logger.info("Found %s contacts.", len(results))
+    else:
+        print_message(args, "No matching contacts found.")
+        logger.info("No matching contacts found.")
     
+def read_updates(path):
+    """Yield the rows of a CSV or JSON Lines file of contact updates as dictionaries."""
+    import csv
+    import json
+
+    with open(path, newline='') as f:
+        if path.endswith('.jsonl'):
+            for line in f:
+                if line.strip():
+                    yield json.loads(line)
+        else:
+            yield from csv.DictReader(f)
+
+def update_contacts(args, phonebook):
+    """Apply the updates listed in a CSV or JSON Lines file as one batch.
+
+    Each row has the number of the contact (as shown by ``list``) in an
+    ``index`` column and the new values of the fields to change; empty
+    fields keep their value. If any row is invalid, no contact is updated.
+    """
+    if args.path:
+        if args.path.endswith(UPDATE_EXTENSIONS):
+            try:
+                with phonebook.batch() as batch:
+                    for number, row in enumerate(read_updates(args.path), start=1):
+                        try:
+                            index = int(row["index"]) - 1
+                            fields = {field: row.get(field) or None for field in UPDATE_FIELDS}
+                            if fields["phone"]:
+                                validate_phone(fields["phone"])
+                            if fields["email"]:
+                                validate_email(fields["email"])
+                        except (KeyError, TypeError, ValueError) as e:
+                            raise ValueError(f"Row {number}: {e}") from e
+                        batch.update(index, **fields)
+                logger.info("Contacts updated from %s.", args.path)
+                print(f"Updated {batch.counts['updated']} contacts from {args.path}.")
+            except FileNotFoundError:
+                logger.error("Error: The file '%s' was not found. Please check the file path and try again.", args.path)
+                print(f"Error: The file '{args.path}' was not found. Please check the file path and try again.")
+            except (IndexError, ValueError) as e:
+                logger.error("Error: %s", e)
+                print(f"Error: {e}. No contacts were updated.")
+        else:
+            logger.error("Error: The file must be in CSV or JSON Lines format.")
+            print("Error: The file must be in CSV or JSON Lines format.")
+    else:
+        logger.error("Error: Path to the file of updates is required to update contacts.")
+        print("Error: Please provide the path to the CSV or JSON Lines file of updates.")
+
+def write_contacts(args, contacts, first_number=1, **options):
+    """Write ``contacts`` in the output format chosen with --format; return how many were written.
+
+    Contacts are numbered from ``first_number``. ``options`` are passed on
+    to ``ContactWriter``.
+    """
+    with ContactWriter(sys.stdout, args.format, **options) as writer:
+        for number, contact in enumerate(contacts, start=first_number):
+            writer.write(number, contact)
+    return writer.count
+
+def page(args, contacts):
+    """Return the contacts selected by --offset and --limit out of the iterable ``contacts``."""
+    offset = args.offset or 0
+    return itertools.islice(contacts, offset, None if args.limit is None else offset + args.limit)
+
+def print_message(args, message):
+    """Print a message for people reading the output; formats meant for programs get data only."""
+    if args.format in ("text", "table"):
+        print(message)
+
 def list_contacts(args, phonebook):
-    """List all contacts in the phonebook."""
-    contacts = phonebook.list_contacts()
-    if contacts:
-        for i, contact in enumerate(contacts):
-            print_contact_info(i, contact)
-        logging.info("Listed all contacts.")
+    """List the contacts in the phonebook, or the page of them chosen with --offset and --limit."""
+    offset = args.offset or 0
+    contacts = phonebook.iter_contacts(offset=offset, limit=args.limit)
+    if write_contacts(args, contacts, first_number=offset + 1):
+        logger.info("Listed all contacts.")
     else:
-        print("No contacts found.")
-        logging.info("No contacts found.")
+        print_message(args, "No contacts found.")
+        logger.info("No contacts found.")
 
 
 def import_contacts(args, phonebook):
     """Import contacts from a CSV file."""
     if args.path:
-        if args.path.endswith('.csv'):
+        if args.path.endswith(CSV_EXTENSIONS):
             try:
-                phonebook.import_contacts_from_csv(args.path)
-                logging.info(f"Contacts imported from {args.path}.")
+                if args.key:
+                    counts = phonebook.upsert_contacts_from_csv(
+                        args.path, key=args.key, delete_missing=args.delete_missing, workers=args.workers
+                    )
+                    print(
+                        f"Inserted: {counts['inserted']}, updated: {counts['updated']}, "
+                        f"unchanged: {counts['unchanged']}, deleted: {counts['deleted']}, "
+                        f"skipped: {counts['skipped']}, invalid: {counts['invalid']}"
+                    )
+                else:
+                    counts = phonebook.import_contacts_from_csv(
+                        args.path, batch_size=args.batch_size, stream=args.stream, workers=args.workers
+                    )
+                    print(
+                        f"Imported: {counts['imported']}, skipped (duplicates): {counts['skipped']}, "
+                        f"invalid: {counts['invalid']}"
+                    )
+                logger.info("Contacts imported from %s.", args.path)
                 print(f"Contacts imported from {args.path}.")
             except FileNotFoundError:
-                logging.error(f"Error: The file '{args.path}' was not found. Please check the file path and try again.")
+                logger.error("Error: The file '%s' was not found. Please check the file path and try again.", args.path)
                 print(f"Error: The file '{args.path}' was not found. Please check the file path and try again.")
             except Exception as e:
-                logging.error(f"An unexpected error occurred: {e}")
+                logger.error("An unexpected error occurred: %s", e)
                 print(f"An unexpected error occurred: {e}")
         else:
-            logging.error("Error: The file must be in CSV format.")
+            logger.error("Error: The file must be in CSV format.")
             print("Error: The file must be in CSV format.")
     else:
-        logging.error("Error: Path to CSV file is required to import contacts.")
+        logger.error("Error: Path to CSV file is required to import contacts.")
         print("Error: Please provide the path to the CSV file to import contacts.")
 
 
 def export_contacts(args, phonebook):
     """Export contacts to a CSV file."""
     if args.path:
-        if args.path.endswith('.csv'):
+        if args.path.endswith(CSV_EXTENSIONS):
             try:
                 phonebook.export_contacts_to_csv(args.path)
-                logging.info(f"Contacts exported to {args.path}.")
+                logger.info("Contacts exported to %s.", args.path)
                 print(f"Contacts exported to {args.path}.")
             except Exception as e:
-                logging.error(f"An unexpected error occurred: {e}")
+                logger.error("An unexpected error occurred: %s", e)
                 print(f"An unexpected error occurred: {e}")
         else:
-            logging.error("Error: The file must be in CSV format.")
+            logger.error("Error: The file must be in CSV format.")
             print("Error: The file must be in CSV format.")
     else:
-        logging.error("Error: Path to CSV file is required to export contacts.")
+        logger.error("Error: Path to CSV file is required to export contacts.")
         print("Error: Please provide the path to the CSV file to export contacts.")
 
 
 def sort_contacts(args, phonebook):
-    """Sort contacts in the phonebook."""
+    """Show the contacts sorted by one or more keys, without changing the stored order."""
     if args.key:
-        phonebook.sort_contacts(args.key)
-        logging.info(f"Contacts sorted by {args.key}.")
-        sorted_contacts = phonebook.list_contacts()
-        for i, contact in enumerate(sorted_contacts):
-            print_contact_info(i, contact)
-        print(f"Contacts sorted by {args.key}.")
+        try:
+            sorted_contacts = phonebook.sort_contacts(args.key)
+        except ValueError as e:
+            logger.error("Error: %s", e)
+            print(f"Error: {e}")
+            return
+        logger.info("Contacts sorted by %s.", args.key)
+        write_contacts(args, page(args, sorted_contacts), first_number=(args.offset or 0) + 1)
+        print_message(args, f"Contacts sorted by {args.key}.")
     else:
-        logging.error("Error: Key is required to sort contacts.")
+        logger.error("Error: Key is required to sort contacts.")
         print("Error: Please provide the key to sort contacts.")
 
 
-def print_contact_info(i, contact):
-    print(f"Contact {i + 1}:")
-    print(f"  First Name: {contact.first_name}")
-    print(f"  Last Name: {contact.last_name}")
-    print(f"  Phone: {contact.phone}")
-    print(f"  Email: {contact.email}")
-    print(f"  Address: {contact.address}")
-    print(f"  Created At: {contact.created_at}")
-    print(f"  Updated At: {contact.updated_at}")
-    print()
-
-
 def group_contacts(args, phonebook):
     """Group contacts in the phonebook."""
     if args.key:
-        grouped = phonebook.group_contacts(args.key)
-        for key, group in grouped.items():
-            print(f"\nGroup: {key}")
-            print("=" * 50)
-            for i, contact in enumerate(group):
-                print_contact_info(i, contact)
-                print("-" * 50)
-        logging.info(f"Contacts grouped by {args.key}.")
-        print(f"Contacts grouped by {args.key}.")
+        try:
+            grouped = phonebook.group_contacts(args.key)
+        except ValueError as e:
+            logger.error("Error: %s", e)
+            print(f"Error: {e}")
+            return
+        members = ((value, number, contact) for value, group in grouped.items()
+                   for number, contact in enumerate(group, start=1))
+        with ContactWriter(sys.stdout, args.format, separator=True, group_field=args.key) as writer:
+            for value, number, contact in page(args, members):
+                writer.write(number, contact, group=value)
+        logger.info("Contacts grouped by %s.", args.key)
+        print_message(args, f"Contacts grouped by {args.key}.")
     else:
-        logging.error("Error: Key is required to group contacts.")
+        logger.error("Error: Key is required to group contacts.")
         print("Error: Please provide the key to group contacts.")
 
 
 def search_contacts(args, phonebook):
     """Search for contacts in the phonebook."""
     if args.query:
-        results = phonebook.search_contacts(args.query)
-        if results:
-            print("\nSearch Results:")
-            print("=" * 50)
-            for i, contact in enumerate(results):
-                print_contact_info(i, contact)
-                print("-" * 50)
-            logging.info(f"Searched contacts with query: {args.query}.")
+        offset = args.offset or 0
+        if args.fuzzy:
+            limit = FUZZY_LIMIT if args.limit is None else args.limit
+            results = iter(phonebook.fuzzy_search_contacts(args.query, limit=offset + limit)[offset:])
+        else:
+            results = phonebook.iter_search_contacts(args.query, offset=offset, limit=args.limit)
+        first = next(results, None)
+        if first is not None:
+            print_message(args, "\nSearch Results:\n" + "=" * 50)
+            write_contacts(args, itertools.chain([first], results), first_number=offset + 1, separator=True)
+            logger.info("Searched contacts with query: %s.", args.query)
         else:
-            print("No contacts found matching the query.")
-            logging.info(f"No contacts found with query: {args.query}.")
+            print_message(args, "No contacts found matching the query.")
+            logger.info("No contacts found with query: %s.", args.query)
     else:
-        logging.error("Error: Query is required to search contacts.")
+        logger.error("Error: Query is required to search contacts.")
         print("Error: Please provide a search query.")
 
 
 def filter_contacts(args, phonebook):
     """Filter contacts by a time frame in the phonebook."""
     if args.start_date and args.end_date:
-        results = phonebook.filter_contacts_by_time_frame(args.start_date, args.end_date)
+        results = phonebook.filter_contacts_by_time_frame(args.start_date, args.end_date, field=args.date_field)
         if results:
-            print("\nFiltered Contacts:")
-            print("=" * 50)
-            for i, contact in enumerate(results):
-                print_contact_info(i, contact)
-                print("-" * 50)
-            logging.info(f"Filtered contacts by time frame: {args.start_date} to {args.end_date}.")
+            print_message(args, "\nFiltered Contacts:\n" + "=" * 50)
+            write_contacts(args, page(args, results), first_number=(args.offset or 0) + 1, separator=True)
+            logger.info("Filtered contacts by %s: %s to %s.", args.date_field, args.start_date, args.end_date)
         else:
-            print("No contacts found within the specified time frame.")
-            logging.info(f"No contacts found from {args.start_date} to {args.end_date}.")
+            print_message(args, "No contacts found within the specified time frame.")
+            logger.info("No contacts found from %s to %s.", args.start_date, args.end_date)
     else:
-        logging.error("Error: Start date and end date are required to filter contacts.")
+        logger.error("Error: Start date and end date are required to filter contacts.")
         print("Error: Please provide both start date and end date to filter contacts.")
 
-def main():
-    """Main function to parse arguments and execute the corresponding action."""
-    # Welcome message
-    print("Welcome to the PhoneBook CLI!")
-    print("You can perform various operations like adding, viewing, searching, updating, and deleting contacts.")
-    print("Use the --help option to see available commands and options.")
-    print("=" * 50)
+def show_stats(args, phonebook):
+    """Print the hit and miss statistics of the phonebook's query result cache.
 
+    Every CLI invocation starts with an empty cache, so the statistics are
+    most useful with ``--server``, where they cover every query the server
+    has answered.
+    """
+    stats = phonebook.cache_stats()
+    print(
+        f"Query cache: {stats['hits']} hits, {stats['misses']} misses ({stats['hit_rate']:.1%} hit rate), "
+        f"{stats['entries']} of {stats['maxsize']} entries in use, {stats['evictions']} evictions, "
+        f"generation {stats['generation']}"
+    )
+    if METRICS.enabled:
+        for name, values in METRICS.snapshot().items():
+            if values["calls"]:
+                print(
+                    f"{name}: {values['calls']} calls, {values['seconds'] / values['calls'] * 1000:.2f} ms average, "
+                    f"{values['records_scanned']} scanned, {values['records_returned']} returned, "
+                    f"{values['bytes_written']} bytes written"
+                )
+    logger.info("Query cache statistics shown.")
+
+def migrate_contacts(args, phonebook):
+    """Copy contacts from a JSON file into the SQLite database."""
+    source = args.path or CONTACTS_FILE
+    try:
+        count = phonebook.migrate_from_json(source)
+        logger.info("Migrated %s contacts from %s to %s.", count, source, phonebook.filename)
+        print(f"Migrated {count} contacts from {source} to {phonebook.filename}.")
+    except ValueError as e:
+        logger.error("Error: %s", e)
+        print(f"Error: {e}")
+
+def serve_phonebook(args, phonebook):
+    """Keep the phonebook loaded and serve actions sent by other CLI invocations."""
+    import server
+
+    server.serve(args, phonebook)
+
+def run_on_server(args):
+    """Run the action on a running PhoneBook server.
+
+    Returns False if the action cannot be served remotely or no server is
+    running, in which case the caller runs it locally.
+    """
+    import server
+
+    if args.action not in server.SERVER_ACTIONS:
+        return False
+    try:
+        response = server.send_request(args.action, server.request_args(args), args.socket)
+    except OSError:
+        logger.warning("No PhoneBook server is listening on %s, running the action locally.", args.socket)
+        return False
+    if response["ok"]:
+        print(response["output"], end="")
+    else:
+        logger.error("Error: %s", response['error'])
+        print(f"Error: {response['error']}")
+    return True
+
+def create_phonebook(args):
+    """Create the PhoneBook using the storage backend selected on the command line."""
+    if args.storage == "sqlite" or args.action == "migrate":
+        # Imported here so that the other backends do not pay for loading sqlite3.
+        from phonebook.sqlite_phonebook import SQLitePhoneBook
+
+        return SQLitePhoneBook(SQLITE_FILE)
+    storage = STORAGE_BACKENDS[args.storage](CONTACTS_FILE)
+    # Each CLI invocation performs a single action, so only build the
+    # contacts and indexes that action actually touches. A server keeps the
+    # phonebook loaded, so it builds everything up front.
+    return PhoneBook(storage=storage, lazy=args.action != "serve")
+
+ACTIONS = {
+    "add": add_contact,
+    "update": update_contact,
+    "delete": delete_contact,
+    "delete_batch": delete_contacts,
+    "update_batch": update_contacts,
+    "list": list_contacts,
+    "get": get_contacts,
+    "import": import_contacts,
+    "export": export_contacts,
+    "sort": sort_contacts,
+    "group": group_contacts,
+    "search": search_contacts,
+    "filter": filter_contacts,
+    "stats": show_stats,
+    "migrate": migrate_contacts,
+    "serve": serve_phonebook
+}
+
+def non_negative_int(value):
+    """Parse a command-line count, such as --offset or --limit, that must not be negative."""
+    number = int(value)
+    if number < 0:
+        raise argparse.ArgumentTypeError(f"must not be negative: {value}")
+    return number
+
+def positive_int(value):
+    """Parse a command-line count, such as --workers, that must be at least 1."""
+    number = int(value)
+    if number < 1:
+        raise argparse.ArgumentTypeError(f"must be at least 1: {value}")
+    return number
+
+def build_parser():
+    """Build the argument parser for the PhoneBook CLI."""
     parser = argparse.ArgumentParser(description="PhoneBook CLI")
-    parser.add_argument("action", choices=["add", "update", "delete", "delete_batch", "list", "import", "export", "sort", "group", "search", "filter"])
+    parser.add_argument("action", choices=list(ACTIONS))
     parser.add_argument("--first_name", help="First name of the contact")
     parser.add_argument("--last_name", help="Last name of the contact")
     parser.add_argument("--phone", help="Phone number of the contact")
     parser.add_argument("--email", help="Email of the contact")
     parser.add_argument("--address", help="Address of the contact")
+    parser.add_argument("--id", help="ID of the contact to update, delete or look up")
+    parser.add_argument("--ids", help="Comma-separated IDs of contacts to delete")
     parser.add_argument("--index", type=int, help="Index of the contact to update or delete")
     parser.add_argument("--indices", help="Comma-separated indices of contacts to delete")
-    parser.add_argument("--path", help="Path to the CSV file to import/export contacts")
-    parser.add_argument("--key", help="Key to sort or group by")
+    parser.add_argument("--path", help="Path to the CSV file (.csv or .csv.gz) to import/export contacts, "
+                                       "the CSV or JSON Lines file of updates to apply, or the JSON file to migrate")
+    parser.add_argument("--batch_size", "--batch-size", type=int,
+                        help="Number of imported contacts to save at a time (default: save once at the end)")
+    parser.add_argument("--stream", action="store_true",
+                        help="Write imported contacts straight to storage instead of collecting them in memory")
+    parser.add_argument("--workers", type=positive_int,
+                        help="Number of processes used to parse and validate the imported CSV file")
+    parser.add_argument("--key", help="Key to group by, or comma-separated keys to sort by; "
+                                      "prefix a sort key with '-' for descending order (e.g. last_name,-created_at). "
+                                      "With import, comma-separated fields that identify a contact (e.g. email); "
+                                      "rows matching a contact update it instead of adding a new one")
+    parser.add_argument("--delete_missing", "--delete-missing", action="store_true",
+                        help="With import --key, delete contacts whose key is not in the imported file")
     parser.add_argument("--query", help="Search query for wildcard search")
+    parser.add_argument("--fuzzy", action="store_true",
+                        help="Search names that sound like the query and are spelled almost alike, best matches first")
+    parser.add_argument("--limit", type=non_negative_int,
+                        help="Maximum number of contacts to show with list, search, sort, group and filter "
+                             f"(default: all; {FUZZY_LIMIT} for fuzzy search)")
+    parser.add_argument("--offset", type=non_negative_int, default=0,
+                        help="Number of contacts to skip before the first one shown, to page through results")
+    parser.add_argument("--format", choices=OUTPUT_FORMATS, default="text",
+                        help="How to show contacts: the detailed text layout, one table row per contact, "
+                             "JSON Lines or CSV")
     parser.add_argument("--start_date", help="Start date for filtering contacts (YYYY-MM-DD)")
     parser.add_argument("--end_date", help="End date for filtering contacts (YYYY-MM-DD)")
+    parser.add_argument("--date_field", choices=["created_at", "updated_at"], default="created_at",
+                        help="Timestamp to filter contacts by (default: created_at)")
+    parser.add_argument("--storage", choices=sorted(STORAGE_BACKENDS) + ["sqlite"], default="json",
+                        help="Storage backend: a single JSON file, compact JSON Lines, a binary columnar file, "
+                             "a JSON snapshot plus an append-only journal, or an SQLite database")
+    parser.add_argument("--server", action="store_true",
+                        help="Send the action to a running PhoneBook server, if there is one")
+    parser.add_argument("--socket", default=SOCKET_PATH,
+                        help=f"Socket of the PhoneBook server (default: {SOCKET_PATH})")
+    parser.add_argument("--profile", nargs="?", const="-", metavar="PATH",
+                        help=f"Run the action under cProfile and print its {PROFILE_LINES} most expensive calls "
+                             "to stderr, or save the full statistics to PATH for pstats")
+    parser.add_argument("--metrics", metavar="PATH",
+                        help="Collect latency and record counts of every PhoneBook operation and write them to "
+                             "PATH when the action ends: JSON if PATH ends in .json, else Prometheus text")
+    parser.add_argument("--log-level", "--log_level", choices=LOG_LEVELS, default="INFO", type=str.upper,
+                        help="Lowest level of log messages to write to stderr (default: INFO; "
+                             "DEBUG also logs every contact created or updated by bulk operations)")
+    return parser
+
+@contextlib.contextmanager
+def profiled(path):
+    """Profile the block with cProfile if --profile was given.
 
+    ``path`` is "-" to print the most expensive calls to stderr, or the file
+    to save the statistics to; None runs the block without profiling.
+    """
+    if path is None:
+        yield
+        return
+    import cProfile
+    import pstats
+
+    profiler = cProfile.Profile()
+    profiler.enable()
+    try:
+        yield
+    finally:
+        profiler.disable()
+        if path == "-":
+            pstats.Stats(profiler, stream=sys.stderr).sort_stats("cumulative").print_stats(PROFILE_LINES)
+        else:
+            profiler.dump_stats(path)
+            logger.info("Profile written to %s.", path)
+
+def main():
+    """Main function to parse arguments and execute the corresponding action."""
+    parser = build_parser()
     args = parser.parse_args()
-    phonebook = PhoneBook()
-
-    actions = {
-        "add": add_contact,
-        "update": update_contact,
-        "delete": delete_contact,
-        "delete_batch": delete_contacts,
-        "list": list_contacts,
-        "import": import_contacts,
-        "export": export_contacts,
-        "sort": sort_contacts,
-        "group": group_contacts,
-        "search": search_contacts,
-        "filter": filter_contacts
-    }
-
-    action = actions.get(args.action)
-    if action:
-        action(args, phonebook)
-    else:
-        logging.error("Invalid action.")
-        print("Invalid action. Please choose from 'add', 'update', 'delete', 'delete_batch', 'list', 'import', 'export', 'sort', 'group', 'search', or 'filter'.")
+    if args.server and args.metrics and args.action != "serve":
+        # The operations run in the server, which only measures them when it was started with --metrics.
+        parser.error("--metrics cannot be used with --server; start the server with --metrics instead")
+    # Welcome message, left out of output meant for other programs
+    print_message(args, "Welcome to the PhoneBook CLI!\n"
+                        "You can perform various operations like adding, viewing, searching, updating, "
+                        "and deleting contacts.\n"
+                        "Use the --help option to see available commands and options.\n" + "=" * 50)
+    configure_logging(args.log_level)
+    if args.server and run_on_server(args):
+        return
+    if args.metrics:
+        METRICS.enable()
+    try:
+        with profiled(args.profile):
+            phonebook = create_phonebook(args)
+
+            action = ACTIONS.get(args.action)
+            if action:
+                action(args, phonebook)
+            else:
+                logger.error("Invalid action.")
+                print(f"Invalid action. Please choose from {', '.join(repr(name) for name in ACTIONS)}.")
+    finally:
+        if args.metrics:
+            METRICS.write(args.metrics)
+            logger.info("Metrics written to %s.", args.metrics)
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    main()
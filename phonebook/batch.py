@@ -0,0 +1,46 @@
+# batch.py
+"""Changes collected by ``PhoneBook.batch`` and applied together."""
+from phonebook.validation import normalize_contact, normalize_email, normalize_phone
+
+UPDATE_FIELDS = ('first_name', 'last_name', 'phone', 'email', 'address')
+
+
+class Batch:
+    """Adds, updates and deletes buffered until the ``batch`` block ends.
+
+    Indices refer to the contact list as it was when the batch began, so
+    callers do not have to adjust them for deletes made earlier in the same
+    batch. Once the batch is applied, ``counts`` holds the number of added,
+    updated, deleted and skipped (duplicate) contacts.
+
+    Phone numbers and email addresses are normalized as changes are added,
+    so an invalid one raises ``ValueError`` inside the block and nothing is
+    applied.
+    """
+
+    def __init__(self):
+        self.adds = []
+        self.updates = {}
+        self.deletes = set()
+        self.counts = {"added": 0, "updated": 0, "deleted": 0, "skipped": 0}
+
+    def add(self, contact):
+        normalize_contact(contact)
+        self.adds.append(contact)
+
+    def update(self, index, first_name=None, last_name=None, phone=None, email=None, address=None):
+        """Update the contact at ``index``; fields left as None keep their value."""
+        phone, email = phone and normalize_phone(phone), email and normalize_email(email)
+        fields = self.updates.setdefault(index, {})
+        values = (first_name, last_name, phone, email, address)
+        fields.update((name, value) for name, value in zip(UPDATE_FIELDS, values) if value)
+
+    def delete(self, index):
+        self.deletes.add(index)
+
+    def indices(self):
+        """Return every index the batch refers to."""
+        return self.deletes | self.updates.keys()
+
+    def __len__(self):
+        return len(self.adds) + len(self.updates) + len(self.deletes)
@@ -0,0 +1,71 @@
+# cache.py
+"""Cache of query results that PhoneBook drops whenever its contacts change."""
+import threading
+from collections import OrderedDict
+
+# Query results kept by a PhoneBook unless it is given another size.
+QUERY_CACHE_SIZE = 128
+MISSING = object()
+
+
+class QueryCache:
+    """Least-recently-used cache of query results, invalidated by a generation counter.
+
+    Every entry remembers the generation it was computed in. ``invalidate``
+    only bumps the generation, so a change to the contacts costs the same
+    however many results are cached; entries of older generations count as
+    misses and are dropped when they are looked up or pushed out by newer
+    ones. A ``maxsize`` of 0 disables caching but still counts misses.
+    """
+
+    def __init__(self, maxsize=QUERY_CACHE_SIZE):
+        self.maxsize = maxsize
+        self.generation = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key, default=MISSING):
+        """Return the current result cached for ``key``, or ``default``."""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                if entry[0] == self.generation:
+                    self._entries.move_to_end(key)
+                    self.hits += 1
+                    return entry[1]
+                del self._entries[key]
+            self.misses += 1
+            return default
+
+    def put(self, key, value):
+        """Cache ``value`` as the result for ``key`` in the current generation."""
+        if not self.maxsize:
+            return
+        with self._lock:
+            self._entries[key] = (self.generation, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def invalidate(self):
+        """Make every cached result stale."""
+        with self._lock:
+            self.generation += 1
+
+    def stats(self):
+        """Return a dict of the cache's hit and miss counts, size and generation."""
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": self.hits / lookups if lookups else 0.0,
+                "entries": sum(1 for generation, _ in self._entries.values() if generation == self.generation),
+                "maxsize": self.maxsize,
+                "evictions": self.evictions,
+                "generation": self.generation,
+            }
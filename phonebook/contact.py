@@ -1,45 +1,168 @@
 # contact.py
+import functools
 import logging
-from datetime import datetime
+import os
+import sys
 
-# Configure logging
-logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+logger = logging.getLogger(__name__)
+
+
+@functools.cache
+def _clock():
+    """Return the datetime class, the epoch and one microsecond, importing datetime on first use.
+
+    Contacts loaded from storage already carry timestamps, so actions that
+    never parse, format or create one do not load datetime.
+    """
+    from datetime import datetime, timedelta
+
+    return datetime, datetime(1970, 1, 1), timedelta(microseconds=1)
+
+
+def to_timestamp(value):
+    """Convert an ISO 8601 string into integer microseconds since the epoch.
+
+    Timestamps with a UTC offset cannot be stored this way without losing
+    the offset, so they (and unparseable values) are returned unchanged.
+    """
+    datetime, epoch, microsecond = _clock()
+    try:
+        moment = datetime.fromisoformat(value)
+    except (TypeError, ValueError):
+        return value
+    if moment.tzinfo is not None:
+        return value
+    return (moment - epoch) // microsecond
+
+
+def to_isoformat(timestamp):
+    """Convert a value produced by ``to_timestamp`` back into an ISO 8601 string."""
+    if isinstance(timestamp, int):
+        _, epoch, microsecond = _clock()
+        return (epoch + timestamp * microsecond).isoformat()
+    return timestamp
+
+
+def to_micros(value):
+    """Return an ISO 8601 string or stored timestamp as microseconds since the epoch.
+
+    Unlike ``to_timestamp`` this always produces an integer that can be
+    compared: timestamps with a UTC offset are converted to UTC, and strings
+    that are not ISO 8601 raise ``ValueError``.
+    """
+    if isinstance(value, int):
+        return value
+    datetime, epoch, microsecond = _clock()
+    moment = datetime.fromisoformat(value)
+    if moment.tzinfo is not None:
+        from datetime import timezone
+
+        moment = moment.astimezone(timezone.utc).replace(tzinfo=None)
+    return (moment - epoch) // microsecond
+
+
+def new_id():
+    """Return a random 16-character ID for a new contact."""
+    return os.urandom(8).hex()
+
+
+def record_id(record):
+    """Return the ID of a stored contact dictionary.
+
+    Records written before contacts had IDs get one derived from their
+    fields and creation time, so the ID stays the same every time the
+    record is loaded until it is saved with the ID included.
+    """
+    contact_id = record.get("id")
+    if contact_id:
+        return contact_id
+    key = "\x1f".join(
+        str(record.get(field) or "")
+        for field in ("first_name", "last_name", "phone", "email", "address", "created_at")
+    )
+    import hashlib
+
+    return hashlib.blake2b(key.encode(), digest_size=8).hexdigest()
+
+
+def _now():
+    datetime, epoch, microsecond = _clock()
+    return (datetime.now() - epoch) // microsecond
+
+
+def _intern(value):
+    # Names repeat heavily across a large phonebook; interning lets every
+    # contact with the same name share one string object.
+    return sys.intern(value) if isinstance(value, str) else value
 
 
 class Contact:
-    def __init__(self, first_name, last_name, phone, email=None, address=None, created_at=None, updated_at=None):
-        self.first_name = first_name
-        self.last_name = last_name
+    # Contacts are created in large numbers, so they use slots instead of a
+    # per-instance __dict__ and keep timestamps as integers (microseconds
+    # since the epoch) rather than ISO strings.
+    __slots__ = ('id', 'first_name', 'last_name', 'phone', 'email', 'address', '_created_at', '_updated_at')
+
+    def __init__(self, first_name, last_name, phone, email=None, address=None, created_at=None, updated_at=None,
+                 contact_id=None):
+        # The ID never changes, unlike the contact's position in the list.
+        self.id = contact_id or new_id()
+        self.first_name = _intern(first_name)
+        self.last_name = _intern(last_name)
         self.phone = phone
         self.email = email
         self.address = address
-        self.created_at = created_at or datetime.now().isoformat()
-        self.updated_at = updated_at or datetime.now().isoformat()
-        logging.info(
-            f"Contact created: {self.first_name} {self.last_name}, "
-            f"Phone: {self.phone}, Email: {self.email}, Address: {self.address}"
-        )
+        self._created_at = to_timestamp(created_at) if created_at else _now()
+        self._updated_at = to_timestamp(updated_at) if updated_at else _now()
+        # Contacts are created by the million when loading and importing, so
+        # this is DEBUG; PhoneBook logs single additions at INFO.
+        logger.debug("Contact created: %s %s, Phone: %s, Email: %s, Address: %s",
+                     self.first_name, self.last_name, self.phone, self.email, self.address)
 
     def update(self, first_name=None, last_name=None, phone=None, email=None, address=None):
         if first_name:
-            self.first_name = first_name
+            self.first_name = _intern(first_name)
         if last_name:
-            self.last_name = last_name
+            self.last_name = _intern(last_name)
         if phone:
             self.phone = phone
         if email:
             self.email = email
         if address:
             self.address = address
-        self.updated_at = datetime.now().isoformat()
-        logging.info(
-            f"Contact updated: {self.first_name} {self.last_name}, "
-            f"Phone: {self.phone}, Email: {self.email}, Address: {self.address}"
-        )
+        self._updated_at = _now()
+        logger.debug("Contact updated: %s %s, Phone: %s, Email: %s, Address: %s",
+                     self.first_name, self.last_name, self.phone, self.email, self.address)
+
+    @property
+    def created_at(self):
+        return to_isoformat(self._created_at)
+
+    @created_at.setter
+    def created_at(self, value):
+        self._created_at = to_timestamp(value)
+
+    @property
+    def updated_at(self):
+        return to_isoformat(self._updated_at)
+
+    @updated_at.setter
+    def updated_at(self, value):
+        self._updated_at = to_timestamp(value)
+
+    @property
+    def created_timestamp(self):
+        """Creation time as comparable microseconds since the epoch."""
+        return to_micros(self._created_at)
+
+    @property
+    def updated_timestamp(self):
+        """Last update time as comparable microseconds since the epoch."""
+        return to_micros(self._updated_at)
 
     def to_dict(self):
         """Convert the contact to a dictionary."""
         return {
+            "id": self.id,
             "first_name": self.first_name,
             "last_name": self.last_name,
             "phone": self.phone,
@@ -59,5 +182,6 @@ class Contact:
             email=data.get("email"),
             address=data.get("address"),
             created_at=data.get("created_at"),
-            updated_at=data.get("updated_at")
+            updated_at=data.get("updated_at"),
+            contact_id=record_id(data)
         )
\ No newline at end of file
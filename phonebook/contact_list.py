@@ -0,0 +1,77 @@
+# contact_list.py
+import threading
+from collections.abc import MutableSequence
+
+from phonebook.contact import Contact
+
+
+class ContactList(MutableSequence):
+    """List of contacts that keeps loaded records as dictionaries until accessed.
+
+    Records read from storage are only turned into ``Contact`` objects the
+    first time they are indexed or iterated, so operations that touch a
+    single contact do not pay for building every other one.
+    """
+
+    def __init__(self, records=()):
+        self._items = list(records)
+        # Makes sure concurrent readers materialize each record only once.
+        self._materialize_lock = threading.Lock()
+
+    def __len__(self):
+        return len(self._items)
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return [self[i] for i in range(*index.indices(len(self._items)))]
+        item = self._items[index]
+        if isinstance(item, dict):
+            with self._materialize_lock:
+                item = self._items[index]
+                if isinstance(item, dict):
+                    item = self._items[index] = Contact.from_dict(item)
+        return item
+
+    def __setitem__(self, index, contact):
+        self._items[index] = contact
+
+    def __delitem__(self, index):
+        del self._items[index]
+
+    def __iter__(self):
+        for index in range(len(self._items)):
+            yield self[index]
+
+    def __repr__(self):
+        return f"ContactList({len(self._items)} contacts)"
+
+    def insert(self, index, contact):
+        self._items.insert(index, contact)
+
+    def append(self, contact):
+        self._items.append(contact)
+
+    def sort(self, key=None, reverse=False):
+        for _ in self:
+            pass
+        self._items.sort(key=key, reverse=reverse)
+
+    def delete_indices(self, indices):
+        """Remove the items at ``indices`` (a set) in a single pass."""
+        self._items = [item for i, item in enumerate(self._items) if i not in indices]
+
+    def raw(self):
+        """Iterate stored items without materializing them."""
+        return iter(self._items)
+
+
+def raw_records(contacts):
+    """Iterate ``contacts``, leaving lazily loaded records as dictionaries."""
+    if isinstance(contacts, ContactList):
+        return contacts.raw()
+    return iter(contacts)
+
+
+def record_dict(record):
+    """Return the dictionary form of a contact or a raw record."""
+    return record if isinstance(record, dict) else record.to_dict()
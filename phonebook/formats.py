@@ -0,0 +1,159 @@
+# formats.py
+"""On-disk formats for contact records, detected automatically when reading.
+
+* ``json``: an indented JSON array, the original format.
+* ``jsonl``: JSON Lines, one minified record per line. It can be read and
+  written one record at a time, and new records are added by appending.
+* ``columnar``: a binary file that stores each field as a column. After the
+  magic bytes comes a little-endian ``uint32`` header length and a JSON
+  header giving the record count and, for every column, its field name and
+  the byte length of its text. Each column then holds a null flag per
+  record, ``count + 1`` ``uint32`` character offsets and the UTF-8 text of
+  all values, so a whole column is decoded at once and split by slicing.
+  Files are read through ``mmap``.
+"""
+import json
+import logging
+import mmap
+import struct
+import sys
+from array import array
+from itertools import islice
+
+COLUMNAR_MAGIC = b"PBCOLS1\n"
+COLUMNAR_FIELDS = ('id', 'first_name', 'last_name', 'phone', 'email', 'address', 'created_at', 'updated_at')
+_HEADER_LENGTH = struct.Struct("<I")
+_COMPACT = (',', ':')
+
+logger = logging.getLogger(__name__)
+
+
+def detect_format(head):
+    """Return ``"columnar"``, ``"jsonl"`` or ``"json"`` for data starting with the bytes ``head``."""
+    if head.startswith(COLUMNAR_MAGIC):
+        return "columnar"
+    stripped = head.lstrip()
+    return "jsonl" if stripped.startswith(b"{") else "json"
+
+
+def read_records(filename):
+    """Read the records of a contacts file in any supported format.
+
+    Returns the records and the detected format. Raises ``FileNotFoundError``
+    if the file does not exist.
+    """
+    with open(filename, 'rb') as f:
+        head = f.read(64)
+        file_format = detect_format(head)
+        if file_format == "columnar":
+            with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as data:
+                return decode_columnar(data), file_format
+        f.seek(0)
+        if file_format == "jsonl":
+            return read_json_lines(f.read().splitlines(keepends=True)), file_format
+        return (json.load(f) if head.strip() else []), file_format
+
+
+def decode_records(data):
+    """Decode the records from the bytes of a contacts file in any supported format."""
+    file_format = detect_format(data[:64])
+    if file_format == "columnar":
+        return decode_columnar(data)
+    if file_format == "jsonl":
+        return read_json_lines(data.splitlines(keepends=True))
+    return json.loads(data) if data.strip() else []
+
+
+def read_json_lines(lines):
+    """Parse a list of JSON Lines, dropping a torn final line left by an interrupted append."""
+    lines = [line for line in lines if line.strip()]
+    try:
+        # Parsing the lines as a single array is much faster than one
+        # ``json.loads`` call per line.
+        return json.loads(b"[" + b",".join(lines) + b"]")
+    except ValueError:
+        pass
+    records = []
+    for line in lines:
+        try:
+            records.append(json.loads(line))
+        except ValueError:
+            if line.endswith(b"\n"):
+                raise
+            logger.warning("Discarding incomplete final line of contacts file")
+    return records
+
+
+def write_json_lines(f, records):
+    """Write ``records`` to the text file ``f``, one minified JSON object per line."""
+    for record in records:
+        f.write(json.dumps(record, separators=_COMPACT))
+        f.write("\n")
+
+
+def _offsets(values):
+    # 'I' is a 4-byte unsigned int on every platform Python supports.
+    offsets = array('I', values)
+    if sys.byteorder != "little":
+        offsets.byteswap()
+    return offsets
+
+
+def write_columnar(f, records):
+    """Write ``records`` to the binary file ``f`` in the columnar format.
+
+    All values of a column are collected before writing, so unlike the JSON
+    formats this holds every record's fields in memory at once.
+    """
+    columns = {field: [] for field in COLUMNAR_FIELDS}
+    for record in records:
+        for field, values in columns.items():
+            values.append(record.get(field))
+    count = len(columns['id'])
+    sections = []
+    header = {"count": count, "columns": []}
+    for field, values in columns.items():
+        nulls = bytes(value is None for value in values)
+        texts = ["" if value is None else str(value) for value in values]
+        offsets = [0]
+        for text in texts:
+            offsets.append(offsets[-1] + len(text))
+        if offsets[-1] >= 1 << 32:
+            raise ValueError(f"Column {field} is too large for the columnar format")
+        blob = "".join(texts).encode()
+        sections += [nulls, _offsets(offsets).tobytes(), blob]
+        header["columns"].append({"name": field, "bytes": len(blob)})
+    header_bytes = json.dumps(header, separators=_COMPACT).encode()
+    f.write(COLUMNAR_MAGIC)
+    f.write(_HEADER_LENGTH.pack(len(header_bytes)))
+    f.write(header_bytes)
+    for section in sections:
+        f.write(section)
+
+
+def decode_columnar(data):
+    """Decode columnar ``data`` (bytes or an mmap) into a list of record dictionaries."""
+    position = len(COLUMNAR_MAGIC)
+    (header_length,) = _HEADER_LENGTH.unpack_from(data, position)
+    position += _HEADER_LENGTH.size
+    header = json.loads(data[position:position + header_length])
+    position += header_length
+    count = header["count"]
+    names = []
+    columns = []
+    for column in header["columns"]:
+        nulls = data[position:position + count]
+        position += count
+        offsets = array('I')
+        offsets.frombytes(data[position:position + 4 * (count + 1)])
+        if sys.byteorder != "little":
+            offsets.byteswap()
+        position += 4 * (count + 1)
+        text = data[position:position + column["bytes"]].decode()
+        position += column["bytes"]
+        values = [text[start:end] for start, end in zip(offsets, islice(offsets, 1, None))]
+        if any(nulls):
+            values = [None if null else value for null, value in zip(nulls, values)]
+        names.append(column["name"])
+        columns.append(values)
+    return [dict(zip(names, row)) for row in zip(*columns)]
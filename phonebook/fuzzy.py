@@ -0,0 +1,174 @@
+# fuzzy.py
+"""Phonetic keys, bounded edit distance and the index behind fuzzy name search.
+
+A query word matches a first or last name when both have the same Soundex
+code and the edit distance between them is at most a small bound. The
+Soundex code is only used to find candidate names: names are looked up by
+code in a ``PhoneticIndex``, so the edit distance is computed for a
+handful of distinct names instead of for every contact.
+"""
+import re
+
+from phonebook.views import _OrderedView
+
+_SOUNDEX_CODES = {
+    **dict.fromkeys("bfpv", "1"),
+    **dict.fromkeys("cgjkqsxz", "2"),
+    **dict.fromkeys("dt", "3"),
+    "l": "4",
+    **dict.fromkeys("mn", "5"),
+    "r": "6",
+}
+_WORD = re.compile(r"[^\W\d_]+")
+NAME_FIELDS = ('first_name', 'last_name')
+# Results returned by a fuzzy search unless the caller asks for another number.
+FUZZY_LIMIT = 10
+MAX_DISTANCE = 2
+
+
+def normalize_name(name):
+    """Return ``name`` as it is compared by fuzzy search: stripped and lower-cased."""
+    return (name or "").strip().lower()
+
+
+def query_words(query):
+    """Split a fuzzy search query into normalized words, ignoring digits and punctuation."""
+    return _WORD.findall(normalize_name(query))
+
+
+def contact_names(contact):
+    """Return the set of normalized, non-empty first and last names of ``contact``."""
+    return {normalize_name(getattr(contact, field)) for field in NAME_FIELDS} - {""}
+
+
+def soundex(name):
+    """Return the four-character American Soundex code of ``name``, or "" if it has no letters.
+
+    >>> soundex("Johnson"), soundex("Jonson")
+    ('J525', 'J525')
+    """
+    letters = [char for char in normalize_name(name) if "a" <= char <= "z"]
+    if not letters:
+        return ""
+    code = [letters[0].upper()]
+    previous = _SOUNDEX_CODES.get(letters[0])
+    for char in letters[1:]:
+        digit = _SOUNDEX_CODES.get(char)
+        if digit and digit != previous:
+            code.append(digit)
+            if len(code) == 4:
+                break
+        # "h" and "w" do not separate letters with the same code; vowels do.
+        if char not in "hw":
+            previous = digit
+    return "".join(code).ljust(4, "0")
+
+
+def edit_distance(a, b, limit):
+    """Return the edit distance between ``a`` and ``b``, or ``limit + 1`` once it exceeds ``limit``.
+
+    Insertions, deletions, substitutions and transpositions of adjacent
+    characters each count as one edit. Rows of the distance table are
+    abandoned as soon as every entry is over ``limit``.
+    """
+    if abs(len(a) - len(b)) > limit:
+        return limit + 1
+    if a == b:
+        return 0
+    before_previous = None
+    previous = list(range(len(b) + 1))
+    for i, char in enumerate(a, 1):
+        current = [i]
+        for j, other in enumerate(b, 1):
+            distance = min(previous[j] + 1, current[j - 1] + 1, previous[j - 1] + (char != other))
+            if before_previous is not None and j > 1 and char == b[j - 2] and a[i - 2] == other:
+                distance = min(distance, before_previous[j - 2] + 1)
+            current.append(distance)
+        if min(current) > limit:
+            return limit + 1
+        before_previous, previous = previous, current
+    return min(previous[-1], limit + 1)
+
+
+def match_names(word, names, max_distance):
+    """Return a dict of each name in ``names`` that matches ``word`` to its edit distance.
+
+    ``names`` must already be normalized; names with a different Soundex
+    code than ``word`` never match.
+    """
+    code = soundex(word)
+    matches = {}
+    if not code:
+        return matches
+    for name in names:
+        if soundex(name) == code:
+            distance = edit_distance(word, name, max_distance)
+            if distance <= max_distance:
+                matches[name] = distance
+    return matches
+
+
+def name_score(names, matches):
+    """Return how far a contact with the normalized ``names`` is from a query, or None if it does not match.
+
+    ``matches`` holds one ``match_names`` result per query word. Every word
+    has to match one of the names; the score is the sum of the smallest
+    distance for each word.
+    """
+    total = 0
+    for word_matches in matches:
+        best = min((word_matches[name] for name in names if name in word_matches), default=None)
+        if best is None:
+            return None
+        total += best
+    return total
+
+
+class PhoneticIndex(_OrderedView):
+    """Map Soundex codes to the distinct first and last names with that code, and names to contacts.
+
+    The code of each name is computed once, when the first contact with
+    that name is added. Each name maps its contacts to their sequence
+    number, which follows list order (see ``_OrderedView``), so the first
+    contacts of a large group can be picked without knowing their positions.
+    """
+
+    def __init__(self, contacts=()):
+        super().__init__()
+        self._postings = {}
+        self._names = {}
+        for contact in contacts:
+            self.add(contact)
+
+    def add(self, contact):
+        names = contact_names(contact)
+        sequence = self._next_sequence(contact)
+        self._entry_of[contact] = (names, sequence)
+        for name in names:
+            posting = self._postings.get(name)
+            if posting is None:
+                posting = self._postings[name] = {}
+                self._names.setdefault(soundex(name), set()).add(name)
+            posting[contact] = sequence
+
+    def discard(self, contact):
+        entry = self._forget(contact)
+        if entry is None:
+            return
+        for name in entry[0]:
+            posting = self._postings[name]
+            del posting[contact]
+            if not posting:
+                del self._postings[name]
+                code = soundex(name)
+                self._names[code].discard(name)
+                if not self._names[code]:
+                    del self._names[code]
+
+    def names_like(self, word):
+        """Return the names that have the same Soundex code as ``word``."""
+        return self._names.get(soundex(word), ())
+
+    def postings(self, name):
+        """Return a dict of the contacts whose first or last name is the normalized ``name`` to their sequence."""
+        return self._postings.get(name, {})
@@ -0,0 +1,283 @@
+# indexes.py
+"""In-memory indexes that PhoneBook keeps in sync with its contact list."""
+import re
+from bisect import bisect_left, bisect_right
+from itertools import count
+
+from phonebook.contact import record_id
+from phonebook.contact_list import raw_records
+from phonebook.validation import email_key, phone_key
+
+IDENTITY_FIELDS = ('first_name', 'last_name', 'phone', 'email', 'address')
+
+
+def identity_key(first_name, last_name, phone, email=None, address=None):
+    """Return the normalized key used to detect duplicate contacts.
+
+    Missing values and empty strings are treated alike and surrounding
+    whitespace is ignored, so a contact typed on the CLI and the same
+    contact read from a CSV row produce the same key. Phones and emails are
+    compared by ``phone_key`` and ``email_key``, so contacts stored before
+    they were normalized still match.
+    """
+    return (
+        (first_name or "").strip(), (last_name or "").strip(), phone_key(phone),
+        email_key(email) or "", (address or "").strip(),
+    )
+
+
+class IdentityIndex:
+    """Count of contacts per identity key, for constant-time duplicate checks."""
+
+    def __init__(self, contacts=()):
+        self._counts = {}
+        for contact in raw_records(contacts):
+            self.add(contact)
+
+    @staticmethod
+    def key(contact):
+        if isinstance(contact, dict):
+            return identity_key(*(contact.get(field) for field in IDENTITY_FIELDS))
+        return identity_key(
+            contact.first_name, contact.last_name, contact.phone,
+            contact.email, contact.address
+        )
+
+    def add(self, contact):
+        key = self.key(contact)
+        self._counts[key] = self._counts.get(key, 0) + 1
+
+    def discard(self, contact):
+        key = self.key(contact)
+        count = self._counts.get(key, 0)
+        if count > 1:
+            self._counts[key] = count - 1
+        elif count:
+            del self._counts[key]
+
+    def __contains__(self, contact):
+        return self.key(contact) in self._counts
+
+    def __len__(self):
+        return len(self._counts)
+
+
+class IdIndex:
+    """Map each contact ID to its contact."""
+
+    def __init__(self, contacts=()):
+        self._contacts = {contact.id: contact for contact in contacts}
+
+    def add(self, contact):
+        self._contacts[contact.id] = contact
+
+    def discard(self, contact):
+        if self._contacts.get(contact.id) is contact:
+            del self._contacts[contact.id]
+
+    def get(self, contact_id):
+        return self._contacts.get(contact_id)
+
+    def __len__(self):
+        return len(self._contacts)
+
+
+def field_value(record, field):
+    """Return the lookup key of ``field`` for a contact or a stored contact dictionary."""
+    if isinstance(record, dict):
+        value = record_id(record) if field == "id" else record.get(field)
+    else:
+        value = getattr(record, field)
+    if field == "phone":
+        return phone_key(value)
+    if field == "email":
+        return email_key(value)
+    return value.strip() if isinstance(value, str) else value
+
+
+def record_values(record, fields):
+    """Return the values of ``fields`` of a contact or a stored contact dictionary as a tuple.
+
+    Unlike ``field_value`` the values are returned as stored, without
+    stripping, and missing values are None.
+    """
+    if isinstance(record, dict):
+        return tuple(map(record.get, fields))
+    return tuple(getattr(record, field) for field in fields)
+
+
+class FieldIndex:
+    """Hash index from the value of one field (e.g. phone) to the contacts with that value.
+
+    Most values belong to a single contact, so such entries hold the contact
+    itself and only values shared by several contacts get a list.
+    """
+
+    def __init__(self, field, contacts=()):
+        self.field = field
+        self._entries = {}
+        for contact in contacts:
+            self.add(contact)
+
+    def add(self, contact):
+        value = field_value(contact, self.field)
+        if not value:
+            return
+        entry = self._entries.get(value)
+        if entry is None:
+            self._entries[value] = contact
+        elif isinstance(entry, list):
+            entry.append(contact)
+        else:
+            self._entries[value] = [entry, contact]
+
+    def discard(self, contact):
+        value = field_value(contact, self.field)
+        entry = self._entries.get(value)
+        if entry is contact:
+            del self._entries[value]
+        elif isinstance(entry, list) and contact in entry:
+            entry.remove(contact)
+            if len(entry) == 1:
+                self._entries[value] = entry[0]
+
+    def get(self, value):
+        """Return the contacts whose field equals ``value``."""
+        entry = self._entries.get(value.strip() if isinstance(value, str) else value)
+        if entry is None:
+            return []
+        return list(entry) if isinstance(entry, list) else [entry]
+
+
+# Wildcards and character classes in fnmatch patterns; whatever lies between
+# them must appear literally in a matching field.
+_WILDCARDS = re.compile(r"\[!?\]?[^\]]*\]|[*?\[]")
+
+
+def trigrams(text):
+    """Return the set of lower-cased three-character substrings of ``text``."""
+    text = (text or "").lower()
+    return {text[i:i + 3] for i in range(len(text) - 2)}
+
+
+class TrigramIndex:
+    """Map every trigram of the searchable fields to the contacts containing it.
+
+    Trigrams are lower-cased, so the candidates for a query are a superset
+    of the matches whatever case rules the final match applies.
+    """
+
+    FIELDS = ('first_name', 'last_name', 'phone')
+
+    def __init__(self, contacts=()):
+        self._postings = {}
+        for contact in contacts:
+            self.add(contact)
+
+    def _trigrams(self, contact):
+        grams = set()
+        for field in self.FIELDS:
+            grams |= trigrams(getattr(contact, field))
+        return grams
+
+    def add(self, contact):
+        for gram in self._trigrams(contact):
+            self._postings.setdefault(gram, set()).add(contact)
+
+    def discard(self, contact):
+        for gram in self._trigrams(contact):
+            posting = self._postings.get(gram)
+            if posting is not None:
+                posting.discard(contact)
+                if not posting:
+                    del self._postings[gram]
+
+    def candidates(self, query):
+        """Return the contacts that may match the fnmatch-style ``query``.
+
+        Returns None when the query has no literal run of three or more
+        characters, in which case the caller has to scan every contact.
+        """
+        grams = set()
+        for literal in _WILDCARDS.split(query):
+            grams |= trigrams(literal)
+        if not grams:
+            return None
+        postings = sorted((self._postings.get(gram, ()) for gram in grams), key=len)
+        result = set(postings[0])
+        for posting in postings[1:]:
+            if not result:
+                break
+            result &= posting
+        return result
+
+
+def timestamp_of(contact, field):
+    """Return the ``field`` timestamp of ``contact`` in microseconds, or None if it is not ISO 8601.
+
+    Stored timestamps are kept as they are (see ``to_timestamp``), so a
+    contact with an unreadable one is left out of time-frame queries
+    instead of failing them.
+    """
+    try:
+        return getattr(contact, field.replace("_at", "_timestamp"))
+    except ValueError:
+        return None
+
+
+class TimestampIndex:
+    """Contacts kept sorted by one of their timestamps, for range queries.
+
+    ``field`` is ``"created_at"`` or ``"updated_at"``. Entries are keyed by
+    (timestamp, insertion sequence) so contacts with equal timestamps keep
+    the order in which they were added. Updates arrive as a ``discard``
+    followed by an ``add`` of the same contact, which keeps its sequence.
+    Contacts whose timestamp cannot be read are not indexed.
+    """
+
+    def __init__(self, field, contacts=()):
+        self.field = field
+        self._sequence = count()
+        self._key_of = {}
+        self._moving = {}
+        entries = []
+        for contact in contacts:
+            timestamp = timestamp_of(contact, field)
+            if timestamp is None:
+                continue
+            key = (timestamp, next(self._sequence))
+            self._key_of[contact] = key
+            entries.append((key, contact))
+        entries.sort(key=lambda entry: entry[0])
+        self._keys = [key for key, _ in entries]
+        self._contacts = [contact for _, contact in entries]
+
+    def add(self, contact):
+        sequence = self._moving.pop(contact, None)
+        # Anything else discarded since the previous add was deleted.
+        self._moving.clear()
+        timestamp = timestamp_of(contact, self.field)
+        if timestamp is None:
+            return
+        if sequence is None:
+            sequence = next(self._sequence)
+        key = (timestamp, sequence)
+        position = bisect_right(self._keys, key)
+        self._keys.insert(position, key)
+        self._contacts.insert(position, contact)
+        self._key_of[contact] = key
+
+    def discard(self, contact):
+        key = self._key_of.pop(contact, None)
+        if key is None:
+            return
+        self._moving[contact] = key[1]
+        position = bisect_left(self._keys, key)
+        del self._keys[position]
+        del self._contacts[position]
+
+    def between(self, start, end):
+        """Return the contacts with ``start <= timestamp <= end``, oldest first."""
+        low = bisect_left(self._keys, (start,))
+        high = bisect_right(self._keys, (end, float("inf")))
+        return self._contacts[low:high]
@@ -0,0 +1,139 @@
+# locking.py
+"""Locks that let several threads and processes share one phonebook.
+
+``ReadWriteLock`` coordinates threads of one process; ``FileLock`` is an
+advisory ``fcntl`` lock that coordinates processes. On platforms without
+``fcntl`` the file lock does nothing and only the in-process lock applies.
+"""
+import contextlib
+import os
+import threading
+
+try:
+    import fcntl
+except ImportError:  # pragma: no cover - Windows
+    fcntl = None
+
+
+class ReadWriteLock:
+    """Lock that admits many reading threads or a single writing thread.
+
+    The writing thread may take the lock again, for reading or writing, and
+    a reading thread may take it again for reading, so locked methods can
+    call each other. Waiting writers block new readers, so a steady stream
+    of reads cannot starve writes; a nested read does not wait for them,
+    since the writer is already waiting for the thread's outer read.
+    """
+
+    def __init__(self):
+        self._condition = threading.Condition()
+        self._readers = 0
+        self._writer = None
+        self._depth = 0
+        self._waiting_writers = 0
+        self._local = threading.local()
+
+    def reading(self):
+        """Return True if the current thread holds the lock for reading."""
+        return getattr(self._local, "depth", 0) > 0
+
+    @contextlib.contextmanager
+    def read(self):
+        if self._writer == threading.get_ident():
+            yield
+            return
+        if self.reading():
+            self._local.depth += 1
+            try:
+                yield
+            finally:
+                self._local.depth -= 1
+            return
+        with self._condition:
+            self._condition.wait_for(lambda: self._writer is None and not self._waiting_writers)
+            self._readers += 1
+        self._local.depth = 1
+        try:
+            yield
+        finally:
+            self._local.depth = 0
+            with self._condition:
+                self._readers -= 1
+                if not self._readers:
+                    self._condition.notify_all()
+
+    @contextlib.contextmanager
+    def write(self):
+        me = threading.get_ident()
+        with self._condition:
+            if self._writer != me:
+                self._waiting_writers += 1
+                try:
+                    self._condition.wait_for(lambda: self._writer is None and not self._readers)
+                finally:
+                    self._waiting_writers -= 1
+                self._writer = me
+            self._depth += 1
+        try:
+            yield
+        finally:
+            with self._condition:
+                self._depth -= 1
+                if not self._depth:
+                    self._writer = None
+                    self._condition.notify_all()
+
+
+class FileLock:
+    """Exclusive advisory lock on ``filename`` that also stores a generation number.
+
+    The lock is reentrant within a process, so code that already holds it
+    can call other code that takes it. The generation number is kept in the
+    lock file itself and is bumped by ``bump`` each time the protected data
+    changes, which lets holders of an older copy notice that it is stale.
+    """
+
+    def __init__(self, filename):
+        self.filename = filename
+        self._mutex = threading.RLock()
+        self._depth = 0
+        self._file = None
+
+    @contextlib.contextmanager
+    def hold(self):
+        with self._mutex:
+            if not self._depth:
+                directory = os.path.dirname(os.path.abspath(self.filename))
+                os.makedirs(directory, exist_ok=True)
+                self._file = open(self.filename, 'a+')
+                if fcntl is not None:
+                    fcntl.flock(self._file, fcntl.LOCK_EX)
+            self._depth += 1
+            try:
+                yield
+            finally:
+                self._depth -= 1
+                if not self._depth:
+                    # Closing the file releases the lock.
+                    self._file.close()
+                    self._file = None
+
+    def generation(self):
+        """Return the current generation number, 0 if the data was never written."""
+        try:
+            with open(self.filename, 'r') as f:
+                return int(f.read() or 0)
+        except (FileNotFoundError, ValueError):
+            return 0
+
+    def bump(self):
+        """Increment the generation number and return the new value.
+
+        Must be called while holding the lock.
+        """
+        generation = self.generation() + 1
+        self._file.seek(0)
+        self._file.truncate()
+        self._file.write(str(generation))
+        self._file.flush()
+        return generation
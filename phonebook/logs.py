@@ -0,0 +1,73 @@
+# logs.py
+"""Logging setup shared by the CLI and the server.
+
+Modules log through ``logging.getLogger(__name__)`` with %-style arguments,
+so a message below the configured level is never formatted. Operations on
+single contacts are logged at INFO; the per-contact records produced by
+bulk operations (load, import, batches) are DEBUG, and each bulk operation
+ends with one ``summary`` record at INFO instead.
+
+``configure_logging`` puts a ``QueueHandler`` on the root logger and writes
+the records from a background ``QueueListener`` thread, so an operation
+never waits for the terminal or a log file.
+"""
+import atexit
+import contextlib
+import logging
+import logging.handlers
+import queue
+import time
+
+LOG_FORMAT = '%(asctime)s - %(levelname)s - %(message)s'
+LOG_LEVELS = ('DEBUG', 'INFO', 'WARNING', 'ERROR', 'CRITICAL')
+
+_listener = None
+
+
+def configure_logging(level="INFO", stream=None):
+    """Send log records at ``level`` and above to ``stream`` (stderr by default) from a background thread.
+
+    Replaces any handlers already on the root logger, so calling it again
+    changes the level or destination.
+    """
+    global _listener
+    stop_logging()
+    handler = logging.StreamHandler(stream)
+    handler.setFormatter(logging.Formatter(LOG_FORMAT))
+    records = queue.SimpleQueue()
+    root = logging.getLogger()
+    for old_handler in root.handlers[:]:
+        root.removeHandler(old_handler)
+    root.addHandler(logging.handlers.QueueHandler(records))
+    root.setLevel(level)
+    _listener = logging.handlers.QueueListener(records, handler)
+    _listener.start()
+
+
+def stop_logging():
+    """Write out any queued records and stop the background writer."""
+    global _listener
+    if _listener is not None:
+        _listener.stop()
+        _listener = None
+
+
+atexit.register(stop_logging)
+
+
+@contextlib.contextmanager
+def summary(logger, operation, counts=None, level=logging.INFO):
+    """Log one record with the counts and duration of a bulk operation when the block ends.
+
+    The block receives ``counts`` (a new dictionary if none is given) to
+    fill in; nothing is logged if it raises.
+
+        with summary(logger, "Load") as counts:
+            counts["contacts"] = len(contacts)
+    """
+    counts = {} if counts is None else counts
+    start = time.perf_counter()
+    yield counts
+    if logger.isEnabledFor(level):
+        details = ", ".join(f"{value} {name}" for name, value in counts.items())
+        logger.log(level, "%s finished in %.3fs (%s)", operation, time.perf_counter() - start, details)
@@ -0,0 +1,285 @@
+# metrics.py
+"""Opt-in latency histograms and counters for PhoneBook operations.
+
+Every public method of a class decorated with ``instrumented`` is timed
+while ``METRICS`` is enabled, and the storage calls made by PhoneBook are
+timed as ``storage.load``, ``storage.save`` and ``storage.append``. Besides
+the latency of each operation, ``METRICS`` counts:
+
+- ``records_scanned``: contacts or stored records checked one by one in
+  Python by searches, filters and lookups (work done by an index or by
+  SQLite is not counted);
+- ``records_returned``: contacts returned or yielded by the operation;
+- ``bytes_written``: bytes written to the contacts file by saves and
+  appends.
+
+Counts go to the innermost operation running on the current thread.
+While metrics are disabled, which is the default, an instrumented method
+costs one extra function call.
+
+The collected metrics can be written as Prometheus text, for the node
+exporter's textfile collector, or as JSON:
+
+    METRICS.enable()
+    ...
+    METRICS.write("phonebook.prom")
+"""
+import contextlib
+import functools
+import inspect
+import json
+import os
+import threading
+import time
+
+# Upper bounds, in seconds, of the latency histogram buckets.
+LATENCY_BUCKETS = (0.0001, 0.0005, 0.001, 0.005, 0.01, 0.05, 0.1, 0.5, 1.0, 5.0, 10.0)
+METRIC_FORMATS = ("prometheus", "json")
+COUNTERS = ("records_scanned", "records_returned", "bytes_written")
+PREFIX = "phonebook"
+
+
+class Histogram:
+    """Count of observations falling at or below each of ``buckets``, plus their sum."""
+
+    def __init__(self, buckets=LATENCY_BUCKETS):
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, value):
+        for i, bound in enumerate(self.buckets):
+            if value <= bound:
+                break
+        else:
+            i = len(self.buckets)
+        self.counts[i] += 1
+        self.sum += value
+        self.count += 1
+
+    def cumulative(self):
+        """Return ``(bound, count)`` pairs of observations at or below each bound, ending with infinity."""
+        total = 0
+        pairs = []
+        for bound, count in zip(self.buckets + (float("inf"),), self.counts):
+            total += count
+            pairs.append((bound, total))
+        return pairs
+
+
+class Metrics:
+    """Thread-safe registry of per-operation latency histograms and counters."""
+
+    def __init__(self):
+        self.enabled = False
+        self._lock = threading.Lock()
+        self._local = threading.local()
+        self.reset()
+
+    def enable(self):
+        self.enabled = True
+
+    def disable(self):
+        self.enabled = False
+
+    def reset(self):
+        """Forget everything collected so far."""
+        with self._lock:
+            self._latency = {}
+            self._counters = {}
+
+    @contextlib.contextmanager
+    def operation(self, name):
+        """Time the block as operation ``name`` and send counts made inside it to that operation."""
+        if not self.enabled:
+            yield
+            return
+        start = time.perf_counter()
+        try:
+            with self.running(name):
+                yield
+        finally:
+            self.observe(name, time.perf_counter() - start)
+
+    @contextlib.contextmanager
+    def running(self, name):
+        """Send counts made inside the block to operation ``name`` without timing it."""
+        stack = self._stack()
+        stack.append(name)
+        try:
+            yield
+        finally:
+            stack.pop()
+
+    def observe(self, name, seconds):
+        """Record one call of operation ``name`` that took ``seconds``."""
+        with self._lock:
+            histogram = self._latency.get(name)
+            if histogram is None:
+                histogram = self._latency[name] = Histogram()
+            histogram.observe(seconds)
+
+    def count(self, name, value=1, operation=None):
+        """Add ``value`` to counter ``name`` of ``operation``, by default the innermost one running."""
+        if not self.enabled:
+            return
+        if operation is None:
+            operation = self.current() or "other"
+        key = (name, operation)
+        with self._lock:
+            self._counters[key] = self._counters.get(key, 0) + value
+
+    def current(self):
+        """Return the name of the innermost operation running on this thread, or None."""
+        stack = self._stack()
+        return stack[-1] if stack else None
+
+    def _stack(self):
+        stack = getattr(self._local, "stack", None)
+        if stack is None:
+            stack = self._local.stack = []
+        return stack
+
+    def snapshot(self):
+        """Return the collected metrics as a dict of operation name to its latency and counters."""
+        with self._lock:
+            operations = {}
+            for (counter, name), value in self._counters.items():
+                operations.setdefault(name, dict.fromkeys(COUNTERS, 0))[counter] = value
+            for name, histogram in self._latency.items():
+                operations.setdefault(name, dict.fromkeys(COUNTERS, 0)).update(
+                    calls=histogram.count,
+                    seconds=histogram.sum,
+                    buckets={str(bound): count for bound, count in histogram.cumulative()},
+                )
+            for values in operations.values():
+                values.setdefault("calls", 0)
+                values.setdefault("seconds", 0.0)
+                values.setdefault("buckets", {})
+        return dict(sorted(operations.items()))
+
+    def to_prometheus(self):
+        """Return the collected metrics in the Prometheus text exposition format."""
+        operations = self.snapshot()
+        lines = [
+            f"# HELP {PREFIX}_operation_duration_seconds Latency of PhoneBook operations.",
+            f"# TYPE {PREFIX}_operation_duration_seconds histogram",
+        ]
+        for name, values in operations.items():
+            if not values["calls"]:
+                continue
+            for bound, count in values["buckets"].items():
+                le = "+Inf" if bound == "inf" else bound
+                lines.append(f'{PREFIX}_operation_duration_seconds_bucket{{operation="{name}",le="{le}"}} {count}')
+            lines.append(f'{PREFIX}_operation_duration_seconds_sum{{operation="{name}"}} {values["seconds"]!r}')
+            lines.append(f'{PREFIX}_operation_duration_seconds_count{{operation="{name}"}} {values["calls"]}')
+        for counter in COUNTERS:
+            metric = f"{PREFIX}_{counter}_total"
+            lines += [f"# HELP {metric} {counter.replace('_', ' ').capitalize()} by PhoneBook operations.",
+                      f"# TYPE {metric} counter"]
+            lines += [f'{metric}{{operation="{name}"}} {values[counter]}'
+                      for name, values in operations.items() if values[counter]]
+        return "\n".join(lines) + "\n"
+
+    def to_json(self):
+        """Return the collected metrics as a JSON document."""
+        return json.dumps({"operations": self.snapshot()}, indent=2)
+
+    def write(self, filename, output_format=None):
+        """Write the collected metrics to ``filename``, replacing it atomically.
+
+        The format is ``output_format`` if given, else JSON for a ``.json``
+        file and Prometheus text for any other name.
+        """
+        from phonebook.storage import atomic_write
+
+        if output_format is None:
+            output_format = "json" if filename.endswith(".json") else "prometheus"
+        if output_format not in METRIC_FORMATS:
+            raise ValueError(f"Invalid metrics format: {output_format}")
+        text = self.to_json() if output_format == "json" else self.to_prometheus()
+        atomic_write(filename, text.encode())
+
+
+METRICS = Metrics()
+
+
+def file_size(filename):
+    """Return the size of ``filename`` in bytes, or 0 if it cannot be read."""
+    try:
+        return os.path.getsize(filename)
+    except (OSError, TypeError):
+        return 0
+
+
+def result_size(result):
+    """Return how many contacts an operation's ``result`` holds, or None if it is not a collection of contacts."""
+    if isinstance(result, (list, tuple)):
+        return len(result)
+    if isinstance(result, dict):
+        if all(isinstance(group, list) for group in result.values()):
+            return sum(len(group) for group in result.values())
+        return None
+    if result is None:
+        return 0
+    return None if isinstance(result, (int, str)) else 1
+
+
+def _timed(name, method):
+    if inspect.isgeneratorfunction(method):
+        @functools.wraps(method)
+        def wrapper(*args, **kwargs):
+            if not METRICS.enabled or METRICS.current() == name:
+                yield from method(*args, **kwargs)
+                return
+            # A generator is timed while it is consumed, as one call that
+            # ends when it is exhausted or closed; each contact it yields is
+            # counted as returned.
+            elapsed = 0.0
+            returned = 0
+            iterator = method(*args, **kwargs)
+            try:
+                while True:
+                    start = time.perf_counter()
+                    try:
+                        with METRICS.running(name):
+                            contact = next(iterator)
+                    except StopIteration:
+                        return
+                    finally:
+                        elapsed += time.perf_counter() - start
+                    returned += 1
+                    yield contact
+            finally:
+                iterator.close()
+                METRICS.observe(name, elapsed)
+                METRICS.count("records_returned", returned, operation=name)
+        return wrapper
+
+    @functools.wraps(method)
+    def wrapper(*args, **kwargs):
+        # An override calling the method it overrides is one operation.
+        if not METRICS.enabled or METRICS.current() == name:
+            return method(*args, **kwargs)
+        with METRICS.operation(name):
+            result = method(*args, **kwargs)
+        size = result_size(result)
+        if size is not None:
+            METRICS.count("records_returned", size, operation=name)
+        return result
+    return wrapper
+
+
+def instrumented(cls):
+    """Class decorator timing every public method defined by ``cls`` as an operation of the same name.
+
+    Properties, static and class methods and context managers made with
+    ``contextlib.contextmanager`` are left alone.
+    """
+    for name, member in list(vars(cls).items()):
+        if (name.startswith("_") or not inspect.isfunction(member)
+                or hasattr(member, "__wrapped__")):
+            continue
+        setattr(cls, name, _timed(name, member))
+    return cls
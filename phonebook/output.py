@@ -0,0 +1,119 @@
+# output.py
+"""Write contacts to a text stream as the CLI shows them.
+
+Besides the multi-line ``text`` layout, contacts can be written as a
+one-line-per-contact ``table``, as JSON Lines or as CSV. Everything goes
+through one in-memory buffer that is handed to the stream in large pieces,
+so writing a million contacts costs a few hundred ``write`` calls rather
+than several ``print`` calls per contact.
+"""
+import io
+import json
+
+OUTPUT_FORMATS = ("text", "table", "jsonl", "csv")
+OUTPUT_FIELDS = ("id", "first_name", "last_name", "phone", "email", "address", "created_at", "updated_at")
+# Characters collected before they are written to the stream.
+BUFFER_SIZE = 1 << 16
+SEPARATOR = "-" * 50
+_TABLE_ROW = "{:>7}  {:16}  {:15.15}  {:15.15}  {:16.16}  {:30.30}  {:.40}\n"
+_TABLE_HEADER = _TABLE_ROW.format("#", "ID", "First Name", "Last Name", "Phone", "Email", "Address")
+
+
+def _text(value):
+    return "" if value is None else str(value)
+
+
+class ContactWriter:
+    """Buffered writer of numbered contacts in one of ``OUTPUT_FORMATS``.
+
+    ``group_field`` names an extra leading field for grouped output: the
+    ``jsonl`` and ``csv`` formats then carry each contact's group value, and
+    the ``text`` and ``table`` formats print a heading whenever the group
+    changes. ``separator`` adds a dashed line after each contact in the
+    ``text`` format. Use the writer as a context manager, or call ``close``,
+    to write out what is still buffered.
+    """
+
+    def __init__(self, stream, output_format="text", separator=False, group_field=None):
+        if output_format not in OUTPUT_FORMATS:
+            raise ValueError(f"Invalid output format: {output_format}")
+        self.stream = stream
+        self.format = output_format
+        self.separator = separator
+        self.group_field = group_field
+        self.count = 0
+        self._buffer = io.StringIO()
+        self._group = object()
+        self._csv = None
+        if output_format == "csv":
+            # Imported here, like elsewhere in the package, so that actions
+            # which do not write CSV start without loading csv.
+            import csv
+
+            self._csv = csv.writer(self._buffer)
+            self._csv.writerow(((group_field,) if group_field else ()) + OUTPUT_FIELDS)
+
+    def write(self, number, contact, group=None):
+        """Write ``contact``, shown as number ``number``, belonging to ``group`` if output is grouped."""
+        buffer = self._buffer
+        if self.format == "jsonl":
+            record = contact.to_dict()
+            if self.group_field:
+                record = {self.group_field: group, **record}
+            buffer.write(json.dumps(record))
+            buffer.write("\n")
+        elif self.format == "csv":
+            values = tuple(getattr(contact, field) for field in OUTPUT_FIELDS)
+            self._csv.writerow(((group,) if self.group_field else ()) + values)
+        else:
+            if self.group_field and group != self._group:
+                self._write_group_heading(group)
+            elif self.format == "table" and not self.count:
+                buffer.write(_TABLE_HEADER)
+            if self.format == "table":
+                buffer.write(_TABLE_ROW.format(
+                    number, contact.id, _text(contact.first_name), _text(contact.last_name),
+                    _text(contact.phone), _text(contact.email), _text(contact.address)
+                ))
+            else:
+                buffer.write(
+                    f"Contact {number}:\n"
+                    f"  ID: {contact.id}\n"
+                    f"  First Name: {contact.first_name}\n"
+                    f"  Last Name: {contact.last_name}\n"
+                    f"  Phone: {contact.phone}\n"
+                    f"  Email: {contact.email}\n"
+                    f"  Address: {contact.address}\n"
+                    f"  Created At: {contact.created_at}\n"
+                    f"  Updated At: {contact.updated_at}\n"
+                    "\n"
+                )
+                if self.separator:
+                    buffer.write(SEPARATOR + "\n")
+        self.count += 1
+        if buffer.tell() >= BUFFER_SIZE:
+            self.flush()
+
+    def _write_group_heading(self, group):
+        if self.format == "table":
+            heading = f"\nGroup: {group}\n{_TABLE_HEADER}"
+        else:
+            heading = f"\nGroup: {group}\n{'=' * 50}\n"
+        self._buffer.write(heading)
+        self._group = group
+
+    def flush(self):
+        """Hand everything buffered so far to the stream."""
+        self.stream.write(self._buffer.getvalue())
+        self._buffer.seek(0)
+        self._buffer.truncate()
+
+    def close(self):
+        self.flush()
+        self.stream.flush()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
@@ -0,0 +1,102 @@
+# parallel_import.py
+"""Parse and validate large CSV files in several processes.
+
+The data part of the file is cut into byte ranges; each worker process
+reads the lines that start inside its range, parses them with ``csv``,
+validates and normalizes them, and sends back the contact fields of the
+valid rows. The caller receives the rows in file order, so duplicate
+checks and saving can happen in a single pass.
+
+Ranges are aligned on line breaks, so quoted fields that contain line
+breaks are not supported; import such files sequentially.
+"""
+import csv
+import io
+import itertools
+import locale
+import math
+import os
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+
+from phonebook.phonebook import csv_row_fields
+from phonebook.validation import normalize_many
+
+# Upper bound on the bytes a worker reads and parses in one task; large
+# files are split into more tasks than workers to balance the load.
+CHUNK_SIZE = 16 * 1024 * 1024
+# Ranges submitted per worker ahead of the one being consumed. Parsed rows
+# wait in the parent until they are consumed, so this bounds memory use
+# when the caller is slower than the workers.
+PENDING_PER_WORKER = 2
+
+
+def _line_start_at_or_after(f, offset):
+    """Return the offset of the first line that starts at or after ``offset``."""
+    f.seek(offset - 1)
+    f.readline()
+    return f.tell()
+
+
+def parse_range(csv_file, fieldnames, start, end, validator=None):
+    """Parse the lines starting in ``[start, end)`` of a CSV file.
+
+    Returns the fields of the valid rows and the number of invalid rows.
+    """
+    with open(csv_file, 'rb') as f:
+        begin = _line_start_at_or_after(f, start)
+        stop = _line_start_at_or_after(f, end)
+        if begin >= stop:
+            return [], 0
+        f.seek(begin)
+        text = f.read(stop - begin).decode(locale.getpreferredencoding(False))
+    rows = []
+    counts = {"invalid": 0}
+    reader = csv.DictReader(io.StringIO(text, newline=''), fieldnames=fieldnames)
+    for row in normalize_many(reader, counts):
+        fields = csv_row_fields(row, validator)
+        if fields is None:
+            counts["invalid"] += 1
+        else:
+            rows.append(fields)
+    return rows, counts["invalid"]
+
+
+def split_ranges(csv_file, workers):
+    """Return the header fields and the byte ranges to hand out to workers."""
+    with open(csv_file, 'rb') as f:
+        header = f.readline().decode(locale.getpreferredencoding(False))
+        data_start = f.tell()
+    size = os.path.getsize(csv_file) - data_start
+    chunks = max(workers, math.ceil(size / CHUNK_SIZE), 1)
+    step = math.ceil(size / chunks) or 1
+    ranges = [(offset, min(offset + step, data_start + size))
+              for offset in range(data_start, data_start + size, step)]
+    return next(csv.reader([header]), []), ranges
+
+
+def parallel_csv_rows(csv_file, workers, validator, counts):
+    """Yield the contact fields of every valid row of ``csv_file``, in file order.
+
+    Rows are parsed by ``workers`` processes; invalid rows are tallied in
+    ``counts``. ``validator`` must be picklable, e.g. a module-level function.
+    At most ``PENDING_PER_WORKER * workers`` ranges are submitted ahead of
+    the rows being consumed, so memory use does not grow with the file.
+    """
+    fieldnames, ranges = split_ranges(csv_file, workers)
+    if not ranges:
+        return
+    ranges = iter(ranges)
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        pending = deque()
+
+        def submit(count):
+            for start, end in itertools.islice(ranges, count):
+                pending.append(executor.submit(parse_range, csv_file, fieldnames, start, end, validator))
+
+        submit(PENDING_PER_WORKER * workers)
+        while pending:
+            rows, invalid = pending.popleft().result()
+            submit(1)
+            counts["invalid"] += invalid
+            yield from rows
@@ -1,144 +1,945 @@
 # phonebook.py
-import json
+import contextlib
+import heapq
+import itertools
 import logging
-from datetime import datetime
-import fnmatch
-import csv
+import threading
+from functools import partial
+from operator import itemgetter
 
-from phonebook.contact import Contact
+from phonebook.batch import UPDATE_FIELDS, Batch
+from phonebook.cache import MISSING, QUERY_CACHE_SIZE, QueryCache
+from phonebook.contact import Contact, to_micros
+from phonebook.contact_list import ContactList, raw_records, record_dict
+from phonebook.fuzzy import (
+    FUZZY_LIMIT, MAX_DISTANCE, NAME_FIELDS, PhoneticIndex, match_names, name_score, normalize_name, query_words
+)
+from phonebook.indexes import (
+    FieldIndex, IdentityIndex, IdIndex, TimestampIndex, TrigramIndex, field_value, identity_key, record_values,
+    timestamp_of
+)
+from phonebook.locking import ReadWriteLock
+from phonebook.logs import summary
+from phonebook.metrics import METRICS, file_size, instrumented
+from phonebook.storage import JSONStorage
+from phonebook.validation import (
+    email_key, normalize_contact, normalize_email, normalize_many, normalize_phone, phone_key
+)
+from phonebook.views import VIEW_FIELDS, GroupView, SortedView, parse_sort_key
 
-# Configure logging
-logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+# csv and fnmatch are imported inside the methods that use them so
+# that one-shot CLI actions which do not need them start faster.
 
+REQUIRED_FIELDS = ('first_name', 'last_name', 'phone')
+CSV_FIELDS = ('first_name', 'last_name', 'phone', 'email', 'address', 'created_at', 'updated_at')
+CSV_BUFFER_SIZE = 1 << 20
+# Contacts taken from the list at a time, under the read lock, by the iter_ methods.
+ITER_CHUNK_SIZE = 1000
+SEARCH_FIELDS = ('first_name', 'last_name', 'phone')
 
+logger = logging.getLogger(__name__)
+
+
+@instrumented
 class PhoneBook:
-    def __init__(self, filename="data/contacts.json"):
-        self.filename = filename
-        self.contacts = self.load_contacts()
-        logging.info("PhoneBook initialized")
+    INDEXES = {
+        "identity": IdentityIndex,
+        "id": IdIndex,
+        "phone": partial(FieldIndex, "phone"),
+        "email": partial(FieldIndex, "email"),
+        "trigram": TrigramIndex,
+        "created_at": partial(TimestampIndex, "created_at"),
+        "updated_at": partial(TimestampIndex, "updated_at"),
+    }
+
+    def __init__(self, filename="data/contacts.json", storage=None, lazy=False, cache_size=QUERY_CACHE_SIZE):
+        """Load the phonebook from ``storage`` (a JSON file by default).
+
+        With ``lazy=True`` loaded records stay as dictionaries until they are
+        accessed and indexes are only built when first needed, which keeps
+        one-shot operations on large phonebooks fast. Otherwise every index
+        is built on load.
+
+        A PhoneBook can be shared by several threads, and several processes
+        can use the same storage: every change is made while holding the
+        storage's file lock, and if another process has written since the
+        contacts were loaded they are reloaded first, so no update is lost.
+
+        The results of the last ``cache_size`` distinct searches, groupings and
+        time-frame filters are cached until the contacts next change (see
+        ``cache_stats``); pass 0 to disable the cache.
+        """
+        self.storage = storage if storage is not None else JSONStorage(filename)
+        self.filename = self.storage.filename
+        self.lazy = lazy
+        self._contacts = None
+        self._indexes = {}
+        self._positions = None
+        self._generation = None
+        self._cache = QueryCache(cache_size)
+        self._lock = ReadWriteLock()
+        self._load_mutex = threading.Lock()
+        if not lazy:
+            self._load()
+        logger.info("PhoneBook initialized")
+
+    @property
+    def contacts(self):
+        if self._contacts is None:
+            with self._load_mutex:
+                if self._contacts is None:
+                    self._load()
+        return self._contacts
+
+    def _load(self):
+        with summary(logger, "Load") as counts:
+            with self.storage.lock():
+                self._generation = self.storage.generation()
+                self._contacts = self.load_contacts()
+            self._indexes = {}
+            self._positions = None
+            self._cache.invalidate()
+            if not self.lazy:
+                for name in self.INDEXES:
+                    self._index(name)
+            counts["contacts"] = len(self._contacts)
+
+    def _discard_loaded(self):
+        """Forget the loaded contacts so they are read from storage again on next use."""
+        self._contacts = None
+        self._indexes = {}
+        self._positions = None
+        self._cache.invalidate()
+
+    def _is_stale(self):
+        """Return True if another process has changed the storage since the contacts were loaded."""
+        return self._contacts is not None and self.storage.generation() != self._generation
+
+    @contextlib.contextmanager
+    def _writing(self):
+        """Hold the locks for a read-modify-write and make sure the contacts are current.
+
+        Cached query results are invalidated when the block ends, whether or
+        not it changed anything.
+        """
+        with self._lock.write(), self.storage.lock():
+            if self._is_stale():
+                logger.info("Contacts changed on disk, reloading before writing")
+                self._load()
+            try:
+                yield
+            finally:
+                self._cache.invalidate()
+
+    @contextlib.contextmanager
+    def _reading(self):
+        """Hold the lock for a query, reloading the contacts first if they are stale.
+
+        A thread that already holds the lock for reading keeps the contacts
+        it is reading: reloading them would need the write lock, which waits
+        for that very thread to finish reading.
+        """
+        if self._is_stale() and not self._lock.reading():
+            with self._writing():
+                pass
+        with self._lock.read():
+            yield
+
+    def _cached(self, key, compute, *args):
+        """Return ``compute(*args)``, or the result cached for the query ``key``.
+
+        Must be called while holding the lock for reading, so the result
+        is cached in the generation it was computed in. Callers get a copy
+        of the cached result, which they are free to change.
+        """
+        result = self._cache.get(key)
+        if result is MISSING:
+            result = compute(*args)
+            self._cache.put(key, result)
+        if isinstance(result, dict):
+            return {value: list(contacts) for value, contacts in result.items()}
+        return list(result)
+
+    def cache_stats(self):
+        """Return the hit and miss counts and the size of the query result cache."""
+        return self._cache.stats()
 
     def save_contacts(self):
-        with open(self.filename, 'w') as f:
-            json.dump([contact.to_dict() for contact in self.contacts], f, indent=4)
-        logging.info("Contacts saved to file")
+        self._save([record_dict(record) for record in raw_records(self.contacts)])
+
+    def _save(self, records):
+        with METRICS.operation("storage.save"):
+            self.storage.save(records)
+            if METRICS.enabled:
+                METRICS.count("bytes_written", file_size(self.storage.filename))
 
     def load_contacts(self):
-        try:
-            with open(self.filename, 'r') as f:
-                logging.info("Contacts loaded from file")
-                return [Contact.from_dict(data) for data in json.load(f)]
-        except FileNotFoundError:
-            logging.warning("Contacts file not found, starting with an empty phonebook")
-            return []
+        with METRICS.operation("storage.load"):
+            records = self.storage.load()
+        if self.lazy:
+            return ContactList(records)
+        return [Contact.from_dict(data) for data in records]
+
+    def _index(self, name):
+        """Return the named index, building it from the contacts on first use."""
+        index = self._indexes.get(name)
+        if index is None:
+            index = self._indexes[name] = self.INDEXES[name](self.contacts)
+        return index
+
+    def _view(self, kind, key):
+        """Return the ``"group"`` or ``"sort"`` view for ``key``, building it on first use.
+
+        Views live alongside the indexes, so they are kept up to date by the
+        same add/discard calls and dropped when the contacts are reloaded.
+        """
+        name = (kind, key)
+        view = self._indexes.get(name)
+        if view is None:
+            factory = GroupView if kind == "group" else SortedView
+            view = self._indexes[name] = factory(key, self.contacts)
+        return view
+
+    def _index_add(self, contact):
+        for index in self._indexes.values():
+            index.add(contact)
+
+    def _index_discard(self, contact):
+        for index in self._indexes.values():
+            index.discard(contact)
+
+    def _position_of(self, contact):
+        if self._positions is None:
+            self._positions = {contact: i for i, contact in enumerate(self.contacts)}
+        return self._positions[contact]
+
+    def _in_list_order(self, contacts):
+        """Sort a subset of the contacts into the order of the contact list."""
+        if len(contacts) < 2:
+            return list(contacts)
+        return sorted(contacts, key=self._position_of)
+
+    def _find(self, field, value):
+        """Return the contacts whose ``field`` equals ``value``, in list order.
+
+        Uses the field's hash index when it has been built; lazily loaded
+        phonebooks compare the stored records instead, without turning the
+        ones that do not match into contacts.
+        """
+        with self._reading():
+            index = self._indexes.get(field)
+            if index is not None:
+                return self._in_list_order(index.get(value))
+            return self._scan(field, value)
+
+    def _scan(self, field, value):
+        """Compare ``field`` of every stored record with ``value``; the caller must hold the lock for reading."""
+        value = value.strip() if isinstance(value, str) else value
+        METRICS.count("records_scanned", len(self.contacts))
+        return [
+            self.contacts[i] for i, record in enumerate(raw_records(self.contacts))
+            if field_value(record, field) == value
+        ]
+
+    def get_by_id(self, contact_id):
+        """Return the contact with the given ID, or None."""
+        with self._reading():
+            index = self._indexes.get("id")
+            if index is not None:
+                return index.get(contact_id)
+            contacts = self._scan("id", contact_id)
+        return contacts[0] if contacts else None
+
+    def get_by_phone(self, phone):
+        """Return the contacts with this phone number, in any of the accepted layouts."""
+        return self._find("phone", phone_key(phone))
+
+    def get_by_email(self, email):
+        """Return the contacts with this email address, ignoring case."""
+        return self._find("email", email_key(email))
+
+    def index_of(self, contact_id):
+        """Return the current list position of the contact with ``contact_id``.
+
+        Raises ``KeyError`` if there is no such contact.
+        """
+        with self._reading():
+            index = self._indexes.get("id")
+            if index is not None:
+                contact = index.get(contact_id)
+                if contact is not None:
+                    return self._position_of(contact)
+            else:
+                for i, record in enumerate(raw_records(self.contacts)):
+                    if field_value(record, "id") == contact_id:
+                        METRICS.count("records_scanned", i + 1)
+                        return i
+                METRICS.count("records_scanned", len(self.contacts))
+        raise KeyError(f"No contact with ID {contact_id}")
+
+    def _commit(self, *entries):
+        """Persist the given mutations, falling back to a full save."""
+        if not entries or not self._append(list(entries)):
+            self.save_contacts()
+        self._generation = self.storage.generation()
+
+    def _append(self, entries):
+        with METRICS.operation("storage.append"):
+            size = file_size(self.storage.filename) if METRICS.enabled else 0
+            appended = self.storage.append(entries)
+            if appended and METRICS.enabled:
+                METRICS.count("bytes_written", file_size(self.storage.filename) - size)
+        return appended
 
     def add_contact(self, contact):
-        if self.is_duplicate(contact):
-            logging.warning("Attempted to add a duplicate contact")
-            print("This contact already exists in the phonebook.")
-            return
-        
-        self.contacts.append(contact)
-        self.save_contacts()
+        """Add ``contact`` unless it is a duplicate; raises ``ValueError`` if its phone or email is invalid."""
+        normalize_contact(contact)
+        with self._writing():
+            if self.is_duplicate(contact):
+                logger.warning("Attempted to add a duplicate contact")
+                print("This contact already exists in the phonebook.")
+                return
+
+            self._append_contact(contact)
+            self._commit({"op": "add", "contact": contact.to_dict()})
         
-        logging.info(
-            f"Contact added: {contact.first_name} {contact.last_name}, "
-            f"Phone: {contact.phone}, Email: {contact.email}, Address: {contact.address}"
-        )
+        logger.info("Contact added: %s %s, Phone: %s, Email: %s, Address: %s",
+                    contact.first_name, contact.last_name, contact.phone, contact.email, contact.address)
         print(f"Contact added: {contact.first_name} {contact.last_name}")
     
+    def _append_contact(self, contact):
+        self.contacts.append(contact)
+        self._index_add(contact)
+        if self._positions is not None:
+            self._positions[contact] = len(self.contacts) - 1
+
     def is_duplicate(self, contact):
-        for existing_contact in self.contacts:
-            if (existing_contact.first_name == contact.first_name and
-                existing_contact.last_name == contact.last_name and
-                existing_contact.phone == contact.phone and
-                existing_contact.email == contact.email and
-                existing_contact.address == contact.address):
-                return True
-        return False
+        return contact in self._index("identity")
 
     def update_contact(self, index, first_name=None, last_name=None, phone=None, email=None, address=None):
-        if 0 <= index < len(self.contacts):
-            self.contacts[index].update(first_name, last_name, phone, email, address)
-            self.save_contacts()
-            logging.info(f"Contact at index {index} updated")
+        phone, email = phone and normalize_phone(phone), email and normalize_email(email)
+        with self._writing():
+            if 0 <= index < len(self.contacts):
+                contact = self.contacts[index]
+                self._index_discard(contact)
+                contact.update(first_name, last_name, phone, email, address)
+                self._index_add(contact)
+                self._commit({"op": "update", "index": index, "contact": contact.to_dict()})
+                logger.info("Contact at index %s updated", index)
 
     def delete_contact(self, index):
-        if 0 <= index < len(self.contacts):
-            contact = self.contacts.pop(index)
-            self.save_contacts()
-            logging.info(
-                f"Contact deleted: {contact.first_name} {contact.last_name}, "
-                f"Phone: {contact.phone}, Email: {contact.email}, Address: {contact.address}"
-            )
+        with self._writing():
+            if 0 <= index < len(self.contacts):
+                contact = self.contacts.pop(index)
+                self._index_discard(contact)
+                self._positions = None
+                self._commit({"op": "delete", "index": index})
+                logger.info("Contact deleted: %s %s, Phone: %s, Email: %s, Address: %s",
+                            contact.first_name, contact.last_name, contact.phone, contact.email, contact.address)
+
+    def update_contact_by_id(self, contact_id, first_name=None, last_name=None, phone=None, email=None,
+                             address=None):
+        """Update the contact with ``contact_id``; raises ``KeyError`` if there is none."""
+        with self._writing():
+            self.update_contact(self.index_of(contact_id), first_name, last_name, phone, email, address)
+
+    def delete_contact_by_id(self, contact_id):
+        """Delete the contact with ``contact_id``; raises ``KeyError`` if there is none."""
+        with self._writing():
+            self.delete_contact(self.index_of(contact_id))
+
+    def delete_contacts_by_id(self, contact_ids):
+        """Delete the contacts with the given IDs in one batch.
+
+        Raises ``KeyError`` without deleting anything if an ID is unknown.
+        """
+        with self.batch() as batch:
+            for contact_id in contact_ids:
+                batch.delete(self.index_of(contact_id))
 
     def delete_contacts(self, indices):
-        indices = sorted(indices, reverse=True)
-        for index in indices:
-            self.delete_contact(index)
-        logging.info(f"Contacts deleted at indices: {indices}")
+        """Delete the contacts at ``indices`` in one batch, saving once.
+
+        Raises ``IndexError`` without deleting anything if an index is out of
+        range.
+        """
+        with self.batch() as batch:
+            for index in indices:
+                batch.delete(index)
+
+    @contextlib.contextmanager
+    def batch(self):
+        """Collect changes in a ``Batch`` and apply them together when the block ends.
+
+        Deletes are applied in a single pass over the contact list and all
+        changes are persisted at once. If the block raises, nothing is
+        changed; if applying the changes fails, the contacts are reloaded
+        from storage so memory and storage stay in step. The phonebook stays
+        locked for writing until the block ends.
+
+            with phonebook.batch() as batch:
+                batch.update(0, phone="(123) 456-7890")
+                batch.delete(3)
+        """
+        with self._writing():
+            batch = Batch()
+            yield batch
+            if batch:
+                with summary(logger, "Batch", batch.counts), METRICS.operation("batch"):
+                    self._apply_batch(batch)
+
+    def _apply_batch(self, batch):
+        contacts = self.contacts
+        for index in batch.indices():
+            if not 0 <= index < len(contacts):
+                raise IndexError(f"Contact index out of range: {index}")
+        entries = []
+        try:
+            for index, fields in sorted(batch.updates.items()):
+                if index in batch.deletes:
+                    continue
+                contact = contacts[index]
+                self._index_discard(contact)
+                contact.update(**fields)
+                self._index_add(contact)
+                entries.append({"op": "update", "index": index, "contact": contact.to_dict()})
+                batch.counts["updated"] += 1
+            if batch.deletes:
+                for index in batch.deletes:
+                    self._index_discard(contacts[index])
+                if isinstance(contacts, ContactList):
+                    contacts.delete_indices(batch.deletes)
+                else:
+                    contacts[:] = [contact for i, contact in enumerate(contacts) if i not in batch.deletes]
+                self._positions = None
+                # Journal deletes from the end so each index is still valid on replay.
+                entries.extend({"op": "delete", "index": index} for index in sorted(batch.deletes, reverse=True))
+                batch.counts["deleted"] = len(batch.deletes)
+            for contact in batch.adds:
+                if self.is_duplicate(contact):
+                    batch.counts["skipped"] += 1
+                    continue
+                self._append_contact(contact)
+                entries.append({"op": "add", "contact": contact.to_dict()})
+                batch.counts["added"] += 1
+            if entries:
+                self._commit(*entries)
+        except BaseException:
+            logger.error("Applying the batch failed, reloading contacts from storage")
+            self._discard_loaded()
+            raise
 
     def list_contacts(self):
-        logging.info("Listing all contacts")
-        return self.contacts
+        """Return a snapshot of the contacts, in list order."""
+        with self._reading():
+            contacts = list(self.contacts)
+        logger.info("Listing all contacts")
+        return contacts
 
     def sort_contacts(self, key):
-        self.contacts.sort(key=lambda contact: getattr(contact, key))
-        self.save_contacts()
-        logging.info(f"Contacts sorted by {key}")
+        """Return the contacts sorted by ``key``, leaving the stored order unchanged.
+
+        ``key`` is a comma-separated list of fields, each optionally prefixed
+        with ``-`` for descending order, e.g. ``"last_name,-created_at"``.
+        Contacts that compare equal keep their list order; missing values
+        sort after present ones (before them when descending). The sorted
+        view is kept up to date afterwards, so sorting by the same key again
+        is immediate.
+        """
+        sort_key = parse_sort_key(key)
+        with self._reading():
+            contacts = self._view("sort", sort_key).contacts()
+        logger.info("Contacts sorted by %s", key)
+        return contacts
 
     def group_contacts(self, key):
-        grouped = {}
-        for contact in self.contacts:
-            group_key = getattr(contact, key)
-            if group_key not in grouped:
-                grouped[group_key] = []
-            grouped[group_key].append(contact)
-        logging.info(f"Contacts grouped by {key}")
+        """Return a dict of ``key`` value to the contacts with that value, in list order."""
+        if key not in VIEW_FIELDS:
+            raise ValueError(f"Invalid contact field: {key}")
+        with self._reading():
+            grouped = self._cached(("group", key), lambda: self._view("group", key).groups())
+        logger.info("Contacts grouped by %s", key)
         return grouped
 
     def search_contacts(self, query):
-        results = []
-        for contact in self.contacts:
-            if (
-                fnmatch.fnmatch(contact.first_name, f"*{query}*")
-                or fnmatch.fnmatch(contact.last_name, f"*{query}*")
-                or fnmatch.fnmatch(contact.phone, f"*{query}*")
-            ):
-                results.append(contact)
-        logging.info(f"Contacts searched with query: {query}")
+        """Find contacts whose first name, last name or phone contains ``query``.
+
+        ``query`` may contain fnmatch wildcards. When the trigram index is
+        available only the contacts it returns as candidates are checked;
+        queries without three consecutive literal characters (and lazily
+        loaded phonebooks, where building the index would cost more than a
+        single scan) fall back to checking every contact.
+        """
+        with self._reading():
+            results = self._cached(("search", query), self._search, query)
+        logger.info("Contacts searched with query: %s", query)
         return results
 
-    def filter_contacts_by_time_frame(self, start_date, end_date):
+    def _search(self, query):
+        index = self._indexes.get("trigram")
+        candidates = index.candidates(query) if index is not None else None
+        if candidates is None:
+            return list(self._scan_search(query))
+        METRICS.count("records_scanned", len(candidates))
+        matches = _search_matcher(query)
+        return self._in_list_order([
+            contact for contact in candidates
+            if any(value is not None and matches(value) for value in record_values(contact, SEARCH_FIELDS))
+        ])
+
+    def _scan_search(self, query):
+        """Yield the contacts matching a search ``query`` in list order, checking every stored record.
+
+        Lazily loaded records that do not match stay dictionaries. The
+        caller must hold the lock for reading while it iterates.
+        """
+        matches = _search_matcher(query)
+        contacts = self.contacts
+        scanned = 0
+        try:
+            for record in raw_records(contacts):
+                scanned += 1
+                if any(value is not None and matches(value) for value in record_values(record, SEARCH_FIELDS)):
+                    yield contacts[scanned - 1]
+        finally:
+            METRICS.count("records_scanned", scanned)
+
+    def iter_contacts(self, offset=0, limit=None):
+        """Yield the contacts in list order, skipping the first ``offset`` and stopping after ``limit``.
+
+        Contacts are taken from the list ``ITER_CHUNK_SIZE`` at a time under
+        the read lock, which is released while the caller consumes them, and
+        lazily loaded records only become contacts once they are reached.
+        A change made by another thread between two chunks may shift the
+        contacts that follow.
+        """
+        position = offset
+        stop = None if limit is None else offset + limit
+        while stop is None or position < stop:
+            end = position + ITER_CHUNK_SIZE if stop is None else min(position + ITER_CHUNK_SIZE, stop)
+            with self._reading():
+                chunk = self.contacts[position:end]
+            if not chunk:
+                return
+            yield from chunk
+            position += len(chunk)
+
+    def iter_search_contacts(self, query, offset=0, limit=None):
+        """Yield the contacts ``search_contacts`` finds, skipping the first ``offset`` and stopping after ``limit``.
+
+        A cached or indexed search is answered as by ``search_contacts``. A
+        lazily loaded phonebook without a trigram index scans its stored
+        records instead and stops as soon as the requested contacts are
+        found, so the first page of a common query costs little more than
+        reading that page.
+        """
+        stop = None if limit is None else offset + limit
+        key = ("search", query)
+        with self._reading():
+            results = self._cache.get(key)
+            if results is MISSING:
+                if "trigram" in self._indexes or stop is None:
+                    results = self._search(query)
+                    self._cache.put(key, results)
+                else:
+                    results = list(itertools.islice(self._scan_search(query), stop))
+        logger.info("Contacts searched with query: %s", query)
+        yield from itertools.islice(results, offset, stop)
+
+    def fuzzy_search_contacts(self, query, limit=FUZZY_LIMIT, max_distance=MAX_DISTANCE):
+        """Find the ``limit`` contacts whose names best match ``query``, allowing for misspellings.
+
+        Every word of ``query`` has to sound like (have the same Soundex code
+        as) the contact's first or last name and be at most ``max_distance``
+        edits away from it. Results are ranked by the total number of edits,
+        then by list order.
+
+        Phonebooks that are not loaded lazily build a ``PhoneticIndex`` the
+        first time and keep it up to date, so a search only compares the
+        query with names that sound alike and only visits the contacts with
+        those names. Lazily loaded phonebooks scan the stored records instead.
+        """
+        words = query_words(query)
+        if not words or limit <= 0:
+            return []
+        with self._reading():
+            index = self._indexes.get("phonetic")
+            if index is None and not self.lazy:
+                index = self._indexes["phonetic"] = PhoneticIndex(self.contacts)
+            if index is None:
+                results = self._fuzzy_scan(words, limit, max_distance)
+            else:
+                results = self._fuzzy_lookup(index, words, limit, max_distance)
+        logger.info("Contacts fuzzy searched with query: %s", query)
+        return results
+
+    def _fuzzy_lookup(self, index, words, limit, max_distance):
+        matches = [match_names(word, index.names_like(word), max_distance) for word in words]
+        if not all(matches):
+            return []
+        names_at = []
+        for word_matches in matches:
+            names = {}
+            for name, distance in word_matches.items():
+                names.setdefault(distance, []).append(name)
+            names_at.append(names)
+        levels = {}
+
+        def level(word, distance):
+            # The contacts, mapped to their sequence, with a name that is
+            # ``distance`` edits from the word.
+            if (word, distance) not in levels:
+                contacts = levels[word, distance] = {}
+                for name in names_at[word][distance]:
+                    contacts.update(index.postings(name))
+            return levels[word, distance]
+
+        # Try every combination of distances, one per word, in order of
+        # their total: contacts matching at a lower total rank first. Each
+        # combination only needs an intersection of the matching contacts,
+        # and the search stops once there are enough results.
+        combinations = sorted(itertools.product(*(sorted(names) for names in names_at)), key=sum)
         results = []
-        start_date = datetime.fromisoformat(start_date)
-        end_date = datetime.fromisoformat(end_date)
-        for contact in self.contacts:
-            created_at = datetime.fromisoformat(contact.created_at)
-            if start_date <= created_at <= end_date:
-                results.append(contact)
-        logging.info(f"Contacts filtered by time frame: {start_date} to {end_date}")
+        for _, group in itertools.groupby(combinations, key=sum):
+            candidates = {}
+            for combination in group:
+                contacts = sorted((level(word, distance) for word, distance in enumerate(combination)), key=len)
+                if len(contacts) == 1:
+                    candidates.update(contacts[0])
+                    continue
+                common = contacts[0].keys()
+                for other in contacts[1:]:
+                    common = common & other.keys()
+                candidates.update((contact, contacts[0][contact]) for contact in common)
+            for contact in results:
+                candidates.pop(contact, None)
+            METRICS.count("records_scanned", len(candidates))
+            best = heapq.nsmallest(limit - len(results), candidates.items(), key=itemgetter(1))
+            results += [contact for contact, _ in best]
+            if len(results) >= limit:
+                break
         return results
 
-    def import_contacts_from_csv(self, csv_file):
-        with open(csv_file, mode='r') as file:
-            reader = csv.DictReader(file)
-            for row in reader:
-                contact = Contact(
-                    first_name=row['first_name'],
-                    last_name=row['last_name'],
-                    phone=row['phone'],
-                    email=row.get('email'),
-                    address=row.get('address')
-                )
-                self.add_contact(contact)
-        logging.info(f"Contacts imported from CSV file: {csv_file}")
+    def _fuzzy_scan(self, words, limit, max_distance):
+        normalized = {}
+        for record in raw_records(self.contacts):
+            for field in NAME_FIELDS:
+                value = field_value(record, field)
+                if value not in normalized:
+                    normalized[value] = normalize_name(value)
+        names = set(normalized.values()) - {""}
+        matches = [match_names(word, names, max_distance) for word in words]
+        if not all(matches):
+            return []
+        first = matches[0]
+        scored = []
+        for i, record in enumerate(raw_records(self.contacts)):
+            first_name = normalized[field_value(record, "first_name")]
+            last_name = normalized[field_value(record, "last_name")]
+            # Most records match no word; skip them without scoring.
+            if first_name in first or last_name in first:
+                score = name_score((first_name, last_name), matches)
+                if score is not None:
+                    scored.append((score, i))
+        METRICS.count("records_scanned", len(self.contacts))
+        return [self.contacts[i] for _, i in heapq.nsmallest(limit, scored)]
+
+    def filter_contacts_by_time_frame(self, start_date, end_date, field="created_at"):
+        """Return contacts whose ``field`` timestamp lies between the two dates, oldest first.
+
+        ``field`` is ``"created_at"`` or ``"updated_at"``; both bounds are
+        inclusive ISO 8601 dates or timestamps. The sorted timestamp index
+        answers the query with two binary searches when it is available.
+        """
+        if field not in ("created_at", "updated_at"):
+            raise ValueError(f"Cannot filter contacts by {field}")
+        start = to_micros(start_date)
+        end = to_micros(end_date)
+        with self._reading():
+            results = self._cached(("filter", field, start, end), self._filter, field, start, end)
+        logger.info("Contacts filtered by %s from %s to %s", field, start_date, end_date)
+        return results
+
+    def _filter(self, field, start, end):
+        index = self._indexes.get(field)
+        if index is not None:
+            return index.between(start, end)
+        METRICS.count("records_scanned", len(self.contacts))
+        matches = []
+        for contact in self.contacts:
+            timestamp = timestamp_of(contact, field)
+            if timestamp is not None and start <= timestamp <= end:
+                matches.append((timestamp, contact))
+        matches.sort(key=lambda match: match[0])
+        return [contact for _, contact in matches]
+
+    def _new_contacts(self, rows, counts):
+        """Yield a Contact for every row of contact fields that is not a duplicate.
+
+        Duplicate rows are tallied in ``counts``. Callers must record each
+        yielded contact (for example with ``_append_contact``) before asking
+        for the next one, so duplicates within the file are detected too.
+        """
+        for fields in rows:
+            contact = Contact(*fields)
+            if self.is_duplicate(contact):
+                counts["skipped"] += 1
+                continue
+            yield contact
+
+    def import_contacts_from_csv(self, csv_file, batch_size=None, validator=None, stream=False, workers=None):
+        """Import contacts from a CSV file (gzip-compressed if it ends in ``.gz``).
+
+        Rows are validated, normalized and checked for duplicates as they are
+        read, and the phonebook is saved once every ``batch_size`` imported
+        rows (or once at the end when no batch size is given) rather than after
+        every row. Rows with an invalid phone or email are rejected, and the
+        others are stored with the canonical phone and email (see
+        ``phonebook.validation``), so they are checked for duplicates against
+        the existing contacts in the same form. ``validator`` is an optional
+        callable that receives each normalized row and raises ``ValueError``
+        to reject it. Returns the number of imported, skipped
+        (duplicate) and invalid rows.
+
+        With ``stream=True`` imported contacts are written straight to storage
+        in a single save and never collected in memory; only the keys needed
+        for duplicate checks are kept. The loaded contacts are then discarded
+        and read back from storage the next time they are needed.
+
+        With ``workers`` set, parsing and validation are spread over that many
+        processes (see ``phonebook.parallel_import``); duplicate checks and
+        saving still happen here, in file order.
+        """
+        counts = {"imported": 0, "skipped": 0, "invalid": 0}
+        with summary(logger, f"Import from {csv_file}", counts), self._writing():
+            self._import_rows(read_csv_fields(csv_file, validator, workers, counts), counts, batch_size, stream)
+        return counts
+
+    def _import_rows(self, rows, counts, batch_size, stream):
+        contacts = self._new_contacts(rows, counts)
+        if stream:
+            self._stream_import(contacts, counts)
+            return
+        pending = []
+        try:
+            for contact in contacts:
+                self._append_contact(contact)
+                counts["imported"] += 1
+                pending.append({"op": "add", "contact": contact.to_dict()})
+                if batch_size and len(pending) >= batch_size:
+                    self._commit(*pending)
+                    pending = []
+            if pending:
+                self._commit(*pending)
+        except BaseException:
+            # Only the batches committed so far are in storage.
+            logger.error("Import failed, reloading contacts from storage")
+            self._discard_loaded()
+            raise
+
+    def _stream_import(self, contacts, counts):
+        identity = self._index("identity")
+
+        def imported_records():
+            for contact in contacts:
+                identity.add(contact)
+                counts["imported"] += 1
+                yield contact.to_dict()
+
+        existing = (record_dict(record) for record in raw_records(self.contacts))
+        try:
+            self._save(itertools.chain(existing, imported_records()))
+        finally:
+            # The identity index holds the imported rows whether or not the
+            # save went through, so it is rebuilt from storage either way.
+            self._discard_loaded()
+
+    def upsert_contacts_from_csv(self, csv_file, key="email", delete_missing=False, validator=None, workers=None):
+        """Bring the phonebook in line with a CSV feed, matching rows to contacts by a natural key.
+
+        ``key`` names the fields that identify a contact, such as ``"email"``
+        or ``"first_name,last_name"`` (see ``parse_natural_key``). A row whose
+        key matches no contact is inserted. A row whose key matches a contact
+        is first compared with it as a whole, through their identity keys, so
+        an unchanged row costs one tuple comparison and is neither written nor
+        re-indexed; otherwise the contact is updated with the row's non-empty
+        fields. Rows are read, validated and normalized as by
+        ``import_contacts_from_csv``; rows with an empty key, or with a key
+        already seen earlier in the feed, are skipped. So are rows whose key
+        matches more than one contact, since it is not known which of them
+        the row describes, and updates that would make a contact a duplicate
+        of another; both are logged as warnings.
+
+        With ``delete_missing``, contacts whose key is not in the feed are
+        deleted; contacts with an empty key are kept. All changes are applied
+        as one batch, so the work done and the records persisted by journaling
+        storage grow with the number of changed contacts, not with the size
+        of the feed. Returns the number of inserted, updated, unchanged,
+        deleted, skipped and invalid rows.
+        """
+        key_fields = parse_natural_key(key) if isinstance(key, str) else tuple(key)
+        counts = {"inserted": 0, "updated": 0, "unchanged": 0, "deleted": 0, "skipped": 0, "invalid": 0}
+        with summary(logger, f"Upsert from {csv_file}", counts):
+            with self.batch() as batch:
+                rows = read_csv_fields(csv_file, validator, workers, counts)
+                self._upsert_rows(batch, rows, key_fields, delete_missing, counts)
+            counts["inserted"] = batch.counts["added"]
+            counts["skipped"] += batch.counts["skipped"]
+            counts["deleted"] = batch.counts["deleted"]
+        return counts
+
+    def _upsert_rows(self, batch, rows, key_fields, delete_missing, counts):
+        # Contacts are kept as stored records until they have to change.
+        # Phones and emails are stored normalized, so an unchanged row
+        # usually equals the stored values as they are and needs no further
+        # work; records stored before normalization are compared by key.
+        matches = {}
+        others = []
+        for position, record in enumerate(raw_records(self.contacts)):
+            record_key = tuple(field_value(record, field) for field in key_fields)
+            if record_key in matches:
+                others.append((record_key, position))
+            else:
+                matches[record_key] = (position, record)
+        ambiguous = {record_key for record_key, _ in others}
+        key_positions = [UPDATE_FIELDS.index(field) for field in key_fields]
+        seen = set()
+        # Identities given to contacts by the updates of this feed.
+        claimed = set()
+        for row in rows:
+            row_key = tuple((row[i] or "").strip() for i in key_positions)
+            if not all(row_key) or row_key in seen:
+                counts["skipped"] += 1
+                continue
+            seen.add(row_key)
+            if row_key in ambiguous:
+                logger.warning("Skipped row with key %s: it matches more than one contact", row_key)
+                counts["skipped"] += 1
+                continue
+            match = matches.get(row_key)
+            if match is None:
+                batch.add(Contact(*row))
+                continue
+            position, record = match
+            current = record_values(record, UPDATE_FIELDS)
+            if row == current:
+                counts["unchanged"] += 1
+                continue
+            current = identity_key(*current)
+            changes = {
+                field: value for field, value, old in zip(UPDATE_FIELDS, identity_key(*row), current)
+                if value and value != old
+            }
+            if not changes:
+                counts["unchanged"] += 1
+                continue
+            updated = dict(zip(UPDATE_FIELDS, current), **changes)
+            identity = identity_key(*updated.values())
+            if identity in claimed or self.is_duplicate(updated):
+                logger.warning("Skipped row with key %s: the update would duplicate another contact", row_key)
+                counts["skipped"] += 1
+                continue
+            claimed.add(identity)
+            batch.update(position, **changes)
+            counts["updated"] += 1
+        if delete_missing:
+            missing = itertools.chain(((key, position) for key, (position, _) in matches.items()), others)
+            for record_key, position in missing:
+                if all(record_key) and record_key not in seen:
+                    batch.delete(position)
+
+    def iter_csv_rows(self):
+        """Yield each contact as a tuple of values in ``CSV_FIELDS`` order."""
+        for record in raw_records(self.contacts):
+            if isinstance(record, dict):
+                yield tuple(record.get(field) for field in CSV_FIELDS)
+            else:
+                yield tuple(getattr(record, field) for field in CSV_FIELDS)
 
     def export_contacts_to_csv(self, csv_file):
-        """Export contacts to a CSV file."""
-        with open(csv_file, mode='w', newline='') as file:
-            fieldnames = ['first_name', 'last_name', 'phone', 'email', 'address', 'created_at', 'updated_at']
-            writer = csv.DictWriter(file, fieldnames=fieldnames)
-            writer.writeheader()
-            for contact in self.contacts:
-                writer.writerow(contact.to_dict())
-        logging.info(f"Contacts exported to CSV file: {csv_file}")
\ No newline at end of file
+        """Export contacts to a CSV file, gzip-compressed if the name ends in ``.gz``.
+
+        Rows are produced one at a time and written through a large buffer,
+        so no per-contact dictionaries are built.
+        """
+        import csv
+
+        with self._reading(), _open_text(csv_file, 'w') as file:
+            writer = csv.writer(file)
+            writer.writerow(CSV_FIELDS)
+            writer.writerows(self.iter_csv_rows())
+        logger.info("Contacts exported to CSV file: %s", csv_file)
+
+
+def _search_matcher(query):
+    """Return a function that tells whether a field value contains the fnmatch pattern ``query``."""
+    import fnmatch
+    import re
+
+    return re.compile(fnmatch.translate(f"*{query}*")).match
+
+
+def parse_natural_key(key):
+    """Parse an upsert key such as ``"email"`` or ``"first_name,last_name"`` into a tuple of fields.
+
+    Raises ``ValueError`` for fields that are not contact fields.
+    """
+    fields = tuple(field.strip() for field in key.split(','))
+    for field in fields:
+        if field not in UPDATE_FIELDS:
+            raise ValueError(f"Invalid contact field: {field}")
+    return fields
+
+
+def csv_row_fields(row, validator=None):
+    """Return the contact fields of a CSV row as a tuple, or None if the row is invalid."""
+    if not all((row.get(field) or "").strip() for field in REQUIRED_FIELDS):
+        return None
+    if validator:
+        try:
+            validator(row)
+        except ValueError:
+            return None
+    return (row['first_name'], row['last_name'], row['phone'], row.get('email'), row.get('address'))
+
+
+def csv_rows(file, validator, counts):
+    """Yield the contact fields of every valid row in a CSV file, tallying invalid rows in ``counts``."""
+    import csv
+
+    for row in normalize_many(csv.DictReader(file), counts):
+        fields = csv_row_fields(row, validator)
+        if fields is None:
+            counts["invalid"] += 1
+        else:
+            yield fields
+
+
+def read_csv_fields(csv_file, validator, workers, counts):
+    """Yield the contact fields of every valid row of ``csv_file``, in file order.
+
+    With ``workers`` set, uncompressed files are parsed by that many
+    processes (see ``phonebook.parallel_import``). Invalid rows are tallied
+    in ``counts``.
+    """
+    if workers and not csv_file.endswith('.gz'):
+        from phonebook.parallel_import import parallel_csv_rows
+
+        yield from parallel_csv_rows(csv_file, workers, validator, counts)
+        return
+    if workers:
+        logger.warning("Compressed CSV files cannot be split between workers, importing sequentially")
+    with _open_text(csv_file, 'r') as file:
+        yield from csv_rows(file, validator, counts)
+
+
+def _open_text(path, mode):
+    """Open a CSV file for buffered text I/O, transparently handling gzip compression."""
+    if path.endswith('.gz'):
+        import gzip
+        import io
+
+        compressed = gzip.GzipFile(path, mode + 'b')
+        buffered = (io.BufferedReader if mode == 'r' else io.BufferedWriter)(compressed, CSV_BUFFER_SIZE)
+        return io.TextIOWrapper(buffered, newline='')
+    return open(path, mode, newline='', buffering=CSV_BUFFER_SIZE)
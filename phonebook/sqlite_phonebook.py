@@ -0,0 +1,407 @@
+# sqlite_phonebook.py
+import contextlib
+import heapq
+import logging
+import sqlite3
+from datetime import datetime
+from itertools import islice
+
+from phonebook.cache import QUERY_CACHE_SIZE, QueryCache
+from phonebook.contact import Contact, record_id
+from phonebook.fuzzy import (
+    FUZZY_LIMIT, MAX_DISTANCE, contact_names, match_names, name_score, normalize_name, query_words
+)
+from phonebook.indexes import IdentityIndex
+from phonebook.locking import ReadWriteLock
+from phonebook.metrics import METRICS, instrumented
+from phonebook.phonebook import PhoneBook
+from phonebook.views import VIEW_FIELDS, parse_sort_key
+from phonebook.storage import JSONStorage
+from phonebook.validation import normalize_email, normalize_phone
+
+logger = logging.getLogger(__name__)
+
+# Rows committed at a time by streaming imports that do not set a batch size.
+STREAM_BATCH_SIZE = 10000
+
+FIELDS = ('first_name', 'last_name', 'phone', 'email', 'address', 'created_at', 'updated_at')
+# Columns selected to build a Contact: its stable ID and its fields.
+COLUMNS = ('contact_id',) + FIELDS
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS contacts (
+    id INTEGER PRIMARY KEY,
+    contact_id TEXT,
+    position INTEGER NOT NULL,
+    identity TEXT NOT NULL,
+    first_name TEXT NOT NULL,
+    last_name TEXT NOT NULL,
+    phone TEXT NOT NULL,
+    email TEXT,
+    address TEXT,
+    created_at TEXT NOT NULL,
+    updated_at TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_contacts_position ON contacts (position);
+CREATE INDEX IF NOT EXISTS idx_contacts_identity ON contacts (identity);
+CREATE INDEX IF NOT EXISTS idx_contacts_first_name ON contacts (first_name);
+CREATE INDEX IF NOT EXISTS idx_contacts_last_name ON contacts (last_name);
+CREATE INDEX IF NOT EXISTS idx_contacts_phone ON contacts (phone);
+CREATE INDEX IF NOT EXISTS idx_contacts_created_at ON contacts (created_at);
+CREATE INDEX IF NOT EXISTS idx_contacts_updated_at ON contacts (updated_at);
+"""
+
+# Created after older databases have been given the contact_id column.
+ID_SCHEMA = """
+CREATE UNIQUE INDEX IF NOT EXISTS idx_contacts_contact_id ON contacts (contact_id);
+CREATE INDEX IF NOT EXISTS idx_contacts_email ON contacts (email);
+"""
+
+
+def _identity(contact):
+    return "\x1f".join(IdentityIndex.key(contact))
+
+
+def _contact(row):
+    return Contact.from_dict(dict(zip(('id',) + FIELDS, row)))
+
+
+def _glob_pattern(query):
+    """Translate an fnmatch-style ``*query*`` pattern into SQLite GLOB syntax."""
+    return f"*{query}*".replace("[!", "[^")
+
+
+@instrumented
+class SQLitePhoneBook(PhoneBook):
+    """PhoneBook backed by an SQLite database instead of an in-memory list.
+
+    Contacts are only turned into ``Contact`` objects when a query returns
+    them; searches, time-frame filters, sorting and grouping run as indexed
+    SQL. The ``position`` column preserves the list order that the
+    index-based operations (update, delete) refer to.
+
+    SQLite already serializes writers from different processes and every
+    query sees the latest committed data, so only threads of this process
+    need coordinating.
+    """
+
+    def __init__(self, filename="data/contacts.db", cache_size=QUERY_CACHE_SIZE):
+        self.filename = filename
+        self.connection = sqlite3.connect(filename, check_same_thread=False)
+        self.connection.executescript(SCHEMA)
+        self._add_contact_ids()
+        self.connection.executescript(ID_SCHEMA)
+        self._lock = ReadWriteLock()
+        self._cache = QueryCache(cache_size)
+        self._data_version = None
+        logger.info("SQLite PhoneBook initialized")
+
+    def _add_contact_ids(self):
+        """Give every row of a database created before contacts had IDs its stable ID."""
+        columns = {row[1] for row in self.connection.execute("PRAGMA table_info(contacts)")}
+        if "contact_id" not in columns:
+            self.connection.execute("ALTER TABLE contacts ADD COLUMN contact_id TEXT")
+        rows = self.connection.execute(
+            f"SELECT id, {', '.join(FIELDS)} FROM contacts WHERE contact_id IS NULL"
+        ).fetchall()
+        if rows:
+            with self.connection:
+                self.connection.executemany(
+                    "UPDATE contacts SET contact_id = ? WHERE id = ?",
+                    [(record_id(dict(zip(FIELDS, row[1:]))), row[0]) for row in rows]
+                )
+            logger.info("Assigned IDs to %s contacts", len(rows))
+
+    def _select(self, where="", params=(), order_by="position"):
+        cursor = self.connection.execute(
+            f"SELECT {', '.join(COLUMNS)} FROM contacts {where} ORDER BY {order_by}", params
+        )
+        return [_contact(row) for row in cursor]
+
+    def _id_at(self, index):
+        if index < 0:
+            return None
+        row = self.connection.execute(
+            "SELECT id FROM contacts ORDER BY position LIMIT 1 OFFSET ?", (index,)
+        ).fetchone()
+        return row[0] if row else None
+
+    @staticmethod
+    def _check_key(key):
+        # The same fields as PhoneBook.group_contacts accepts.
+        if key not in VIEW_FIELDS:
+            raise ValueError(f"Invalid contact field: {key}")
+
+    @property
+    def contacts(self):
+        return self._select()
+
+    def _is_stale(self):
+        # Commits made through other connections change the data version;
+        # cached query results then have to be dropped.
+        version = self.connection.execute("PRAGMA data_version").fetchone()[0]
+        stale, self._data_version = version != self._data_version, version
+        return stale
+
+    @contextlib.contextmanager
+    def _writing(self):
+        with self._lock.write():
+            try:
+                yield
+            finally:
+                self._cache.invalidate()
+
+    def save_contacts(self):
+        self.connection.commit()
+
+    def load_contacts(self):
+        return self.contacts
+
+    def _commit(self, *entries):
+        self.connection.commit()
+
+    def _append_contact(self, contact):
+        self.connection.execute(
+            f"INSERT INTO contacts (position, identity, {', '.join(COLUMNS)}) "
+            f"VALUES ((SELECT COALESCE(MAX(position), 0) + 1 FROM contacts), ?, {', '.join('?' * len(COLUMNS))})",
+            (_identity(contact), contact.id, *(getattr(contact, field) for field in FIELDS))
+        )
+
+    def is_duplicate(self, contact):
+        row = self.connection.execute(
+            "SELECT 1 FROM contacts WHERE identity = ? LIMIT 1", (_identity(contact),)
+        ).fetchone()
+        return row is not None
+
+    def update_contact(self, index, first_name=None, last_name=None, phone=None, email=None, address=None):
+        phone, email = phone and normalize_phone(phone), email and normalize_email(email)
+        with self._writing():
+            row_id = self._id_at(index)
+            if row_id is None:
+                return
+            self._update_row(row_id, first_name, last_name, phone, email, address)
+            self._commit()
+        logger.info("Contact at index %s updated", index)
+
+    def _update_row(self, row_id, *values, **fields):
+        row = self.connection.execute(
+            f"SELECT {', '.join(COLUMNS)} FROM contacts WHERE id = ?", (row_id,)
+        ).fetchone()
+        contact = _contact(row)
+        contact.update(*values, **fields)
+        self.connection.execute(
+            f"UPDATE contacts SET identity = ?, {', '.join(f'{field} = ?' for field in FIELDS)} WHERE id = ?",
+            (_identity(contact), *(getattr(contact, field) for field in FIELDS), row_id)
+        )
+
+    def delete_contact(self, index):
+        with self._writing():
+            row_id = self._id_at(index)
+            if row_id is None:
+                return
+            self.connection.execute("DELETE FROM contacts WHERE id = ?", (row_id,))
+            self._commit()
+        logger.info("Contact at index %s deleted", index)
+
+    def _row_id(self, contact_id):
+        row = self.connection.execute("SELECT id FROM contacts WHERE contact_id = ?", (contact_id,)).fetchone()
+        if row is None:
+            raise KeyError(f"No contact with ID {contact_id}")
+        return row[0]
+
+    def _find(self, field, value):
+        column = "contact_id" if field == "id" else field
+        with self._reading():
+            return self._select(f"WHERE {column} = ?", (value.strip(),))
+
+    def get_by_id(self, contact_id):
+        contacts = self._find("id", contact_id)
+        return contacts[0] if contacts else None
+
+    def index_of(self, contact_id):
+        row = self.connection.execute(
+            "SELECT COUNT(*) FROM contacts WHERE position < (SELECT position FROM contacts WHERE id = ?)",
+            (self._row_id(contact_id),)
+        ).fetchone()
+        return row[0]
+
+    def update_contact_by_id(self, contact_id, first_name=None, last_name=None, phone=None, email=None,
+                             address=None):
+        phone, email = phone and normalize_phone(phone), email and normalize_email(email)
+        with self._writing():
+            self._update_row(self._row_id(contact_id), first_name, last_name, phone, email, address)
+            self._commit()
+        logger.info("Contact %s updated", contact_id)
+
+    def delete_contact_by_id(self, contact_id):
+        with self._writing():
+            self.connection.execute("DELETE FROM contacts WHERE id = ?", (self._row_id(contact_id),))
+            self._commit()
+        logger.info("Contact %s deleted", contact_id)
+
+    def _apply_batch(self, batch):
+        ids = [row[0] for row in self.connection.execute("SELECT id FROM contacts ORDER BY position")]
+        for index in batch.indices():
+            if not 0 <= index < len(ids):
+                raise IndexError(f"Contact index out of range: {index}")
+        try:
+            for index, fields in sorted(batch.updates.items()):
+                if index not in batch.deletes:
+                    self._update_row(ids[index], **fields)
+                    batch.counts["updated"] += 1
+            self.connection.executemany(
+                "DELETE FROM contacts WHERE id = ?", [(ids[index],) for index in batch.deletes]
+            )
+            batch.counts["deleted"] = len(batch.deletes)
+            for contact in batch.adds:
+                if self.is_duplicate(contact):
+                    batch.counts["skipped"] += 1
+                    continue
+                self._append_contact(contact)
+                batch.counts["added"] += 1
+            self._commit()
+        except BaseException:
+            self.connection.rollback()
+            raise
+
+    def list_contacts(self):
+        with self._reading():
+            contacts = self.contacts
+        logger.info("Listing all contacts")
+        return contacts
+
+    def iter_contacts(self, offset=0, limit=None):
+        # Only the first page skips rows with OFFSET; the following pages
+        # continue after the last position read, which is an index lookup.
+        select = f"SELECT position, {', '.join(COLUMNS)} FROM contacts"
+        remaining = limit
+        last_position = None
+        while remaining is None or remaining > 0:
+            size = STREAM_BATCH_SIZE if remaining is None else min(STREAM_BATCH_SIZE, remaining)
+            with self._reading():
+                if last_position is None:
+                    rows = self.connection.execute(
+                        f"{select} ORDER BY position LIMIT ? OFFSET ?", (size, offset)
+                    ).fetchall()
+                else:
+                    rows = self.connection.execute(
+                        f"{select} WHERE position > ? ORDER BY position LIMIT ?", (last_position, size)
+                    ).fetchall()
+            if not rows:
+                return
+            yield from (_contact(row[1:]) for row in rows)
+            last_position = rows[-1][0]
+            if remaining is not None:
+                remaining -= len(rows)
+
+    def iter_search_contacts(self, query, offset=0, limit=None):
+        results = self.search_contacts(query)
+        yield from islice(results, offset, None if limit is None else offset + limit)
+
+    def sort_contacts(self, key):
+        terms = []
+        for field, descending in parse_sort_key(key):
+            column = "contact_id" if field == "id" else field
+            direction = " DESC" if descending else ""
+            # Missing values sort as in PhoneBook.sort_contacts.
+            terms += [f"{column} IS NULL{direction}", f"{column}{direction}"]
+        order_by = ", ".join(terms)
+        with self._reading():
+            contacts = self._select(order_by=f"{order_by}, position")
+        logger.info("Contacts sorted by %s", key)
+        return contacts
+
+    def group_contacts(self, key):
+        self._check_key(key)
+        with self._reading():
+            grouped = self._cached(("group", key), self._group, key)
+        logger.info("Contacts grouped by %s", key)
+        return grouped
+
+    def _group(self, key):
+        # Groups come in order of their first contact, as from PhoneBook.
+        grouped = {}
+        for contact in self._select():
+            grouped.setdefault(getattr(contact, key), []).append(contact)
+        return grouped
+
+    def search_contacts(self, query):
+        pattern = _glob_pattern(query)
+        with self._reading():
+            results = self._cached(
+                ("search", query), self._select,
+                "WHERE first_name GLOB ? OR last_name GLOB ? OR phone GLOB ?", (pattern, pattern, pattern)
+            )
+        logger.info("Contacts searched with query: %s", query)
+        return results
+
+    def fuzzy_search_contacts(self, query, limit=FUZZY_LIMIT, max_distance=MAX_DISTANCE):
+        # Names are matched in Python against the distinct names in the
+        # table; only the rows with a matching name are then fetched.
+        words = query_words(query)
+        if not words or limit <= 0:
+            return []
+        with self._reading():
+            rows = self.connection.execute("SELECT first_name FROM contacts UNION SELECT last_name FROM contacts")
+            normalized = {name: normalize_name(name) for (name,) in rows}
+            matches = [match_names(word, set(normalized.values()) - {""}, max_distance) for word in words]
+            if not all(matches):
+                return []
+            names = [name for name, normalized_name in normalized.items() if normalized_name in matches[0]]
+            placeholders = ", ".join("?" * len(names))
+            contacts = self._select(f"WHERE first_name IN ({placeholders}) OR last_name IN ({placeholders})", names * 2)
+        METRICS.count("records_scanned", len(contacts))
+        scored = []
+        for position, contact in enumerate(contacts):
+            score = name_score(contact_names(contact), matches)
+            if score is not None:
+                scored.append((score, position, contact))
+        logger.info("Contacts fuzzy searched with query: %s", query)
+        return [contact for _, _, contact in heapq.nsmallest(limit, scored, key=lambda item: item[:2])]
+
+    def filter_contacts_by_time_frame(self, start_date, end_date, field="created_at"):
+        if field not in ("created_at", "updated_at"):
+            raise ValueError(f"Cannot filter contacts by {field}")
+        start = datetime.fromisoformat(start_date).isoformat()
+        end = datetime.fromisoformat(end_date).isoformat()
+        with self._reading():
+            results = self._cached(
+                ("filter", field, start, end), self._select,
+                f"WHERE {field} BETWEEN ? AND ?", (start, end), f"{field}, position"
+            )
+        logger.info("Contacts filtered by %s from %s to %s", field, start_date, end_date)
+        return results
+
+    def import_contacts_from_csv(self, csv_file, batch_size=None, validator=None, stream=False, workers=None):
+        # Imported rows are inserted straight into the database, so streaming
+        # only needs to bound how many uncommitted rows are held at once.
+        if stream:
+            batch_size = batch_size or STREAM_BATCH_SIZE
+        return super().import_contacts_from_csv(csv_file, batch_size=batch_size, validator=validator,
+                                                workers=workers)
+
+    def iter_csv_rows(self):
+        return self.connection.execute(f"SELECT {', '.join(FIELDS)} FROM contacts ORDER BY position")
+
+    def migrate_from_json(self, json_filename):
+        """Copy every contact from a JSON phonebook file into this empty database.
+
+        Contacts keep their order and timestamps. Returns the number of
+        contacts copied.
+        """
+        if self.connection.execute("SELECT 1 FROM contacts LIMIT 1").fetchone():
+            raise ValueError(f"The database '{self.filename}' already contains contacts.")
+        records = JSONStorage(json_filename).load()
+        rows = []
+        for position, data in enumerate(records, start=1):
+            contact = Contact.from_dict(data)
+            rows.append((position, _identity(contact), contact.id, *(getattr(contact, field) for field in FIELDS)))
+        with self.connection:
+            self.connection.executemany(
+                f"INSERT INTO contacts (position, identity, {', '.join(COLUMNS)}) "
+                f"VALUES (?, ?, {', '.join('?' * len(COLUMNS))})",
+                rows
+            )
+        self._cache.invalidate()
+        logger.info("%s contacts migrated from %s to %s", len(rows), json_filename, self.filename)
+        return len(rows)
@@ -0,0 +1,342 @@
+# storage.py
+import contextlib
+import json
+import logging
+import os
+
+from phonebook.formats import decode_records, read_records, write_columnar, write_json_lines
+from phonebook.locking import FileLock
+
+logger = logging.getLogger(__name__)
+
+
+@contextlib.contextmanager
+def atomic_open(filename, mode='wb'):
+    """Open a temporary file that replaces ``filename`` when the block exits.
+
+    Readers see either the old or the new file, never a partially written
+    one. If the block raises, ``filename`` is left untouched.
+    """
+    import tempfile
+
+    directory = os.path.dirname(os.path.abspath(filename))
+    fd, tmp_name = tempfile.mkstemp(dir=directory, prefix=f".{os.path.basename(filename)}.", suffix=".tmp")
+    try:
+        with os.fdopen(fd, mode) as f:
+            yield f
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_name, filename)
+    except BaseException:
+        if os.path.exists(tmp_name):
+            os.remove(tmp_name)
+        raise
+
+
+def atomic_write(filename, data):
+    """Write ``data`` (bytes) to ``filename`` atomically."""
+    with atomic_open(filename) as f:
+        f.write(data)
+
+
+def write_json_array(f, records):
+    """Write ``records`` to the text file ``f`` as an indented JSON array.
+
+    The output matches ``json.dump(list(records), f, indent=4)``, but
+    records are encoded one at a time so ``records`` may be a generator of
+    any length.
+    """
+    separator = "[\n    "
+    for record in records:
+        f.write(separator)
+        f.write(json.dumps(record, indent=4).replace("\n", "\n    "))
+        separator = ",\n    "
+    f.write("[]" if separator.startswith("[") else "\n]")
+
+
+class Storage:
+    """Base class for the places a PhoneBook can persist its contacts.
+
+    ``load`` returns the stored contacts as a list of dictionaries and
+    ``save`` replaces them with the records from any iterable, so callers
+    can stream records that are never held in memory together. Backends
+    that can persist a single mutation more cheaply than a full save
+    override ``append``.
+
+    Every store has an advisory lock file, ``<filename>.lock``, that also
+    holds a generation number. ``save`` and ``append`` take the lock and
+    bump the generation, so a process that loaded an older generation can
+    tell that it must reload before writing.
+    """
+
+    def __init__(self, filename):
+        self.filename = filename
+        self._file_lock = FileLock(filename + ".lock")
+
+    def lock(self):
+        """Hold the inter-process lock, e.g. around a read-modify-write of the contacts."""
+        return self._file_lock.hold()
+
+    def generation(self):
+        """Return a number that changes every time the stored contacts change."""
+        return self._file_lock.generation()
+
+    def load(self):
+        raise NotImplementedError
+
+    def save(self, records):
+        raise NotImplementedError
+
+    def append(self, entries):
+        """Persist mutation ``entries`` without a full save.
+
+        Returns False when the caller must fall back to ``save`` instead.
+        """
+        return False
+
+
+class JSONStorage(Storage):
+    """Store all contacts as one JSON document, rewritten on every save.
+
+    Files in any format from ``phonebook.formats`` are recognized on load,
+    so switching between the file-based backends needs no conversion step.
+    A journal left next to the file by ``JournalStorage`` is replayed on
+    load and removed by the next save, which then holds its changes.
+    """
+
+    def __init__(self, filename):
+        super().__init__(filename)
+        self.journal_filename = filename + ".log"
+        self._journaled = 0
+
+    def load(self):
+        with self.lock():
+            try:
+                records, self.file_format = read_records(self.filename)
+            except FileNotFoundError:
+                records, self.file_format = [], None
+            self._journaled = JournalStorage(self.filename).replay(records)
+        if self.file_format is None and not self._journaled:
+            logger.warning("Contacts file not found, starting with an empty phonebook")
+            return records
+        logger.debug("Contacts loaded from file (%s) and %s journal entries", self.file_format, self._journaled)
+        return records
+
+    def save(self, records):
+        with self.lock():
+            with atomic_open(self.filename, 'w') as f:
+                write_json_array(f, records)
+            self._saved()
+        logger.info("Contacts saved to file")
+
+    def _saved(self):
+        """Finish a save made under the lock: drop the journal and bump the generation."""
+        # The saved records already include the journal's changes, so it must
+        # not be replayed on top of them, even if the file is byte for byte the
+        # snapshot the journal was written against.
+        try:
+            os.remove(self.journal_filename)
+        except FileNotFoundError:
+            pass
+        self._journaled = 0
+        self._file_lock.bump()
+
+
+class JSONLinesStorage(JSONStorage):
+    """Store contacts as JSON Lines: one minified JSON object per line.
+
+    The file is about a third smaller than the indented JSON array and is
+    written and read one record at a time. Mutations that only add contacts
+    are appended to the end of the file instead of rewriting it.
+    """
+
+    def save(self, records):
+        with self.lock():
+            with atomic_open(self.filename, 'w') as f:
+                write_json_lines(f, records)
+            self._saved()
+            self.file_format = "jsonl"
+        logger.info("Contacts saved to file")
+
+    def append(self, entries):
+        # Appending is only safe on a file that is already in this format and
+        # holds every change; a replayed journal is folded in by a full save.
+        if (getattr(self, "file_format", None) != "jsonl" or self._journaled
+                or any(entry["op"] != "add" for entry in entries)):
+            return False
+        with self.lock(), open(self.filename, 'a') as f:
+            write_json_lines(f, (entry["contact"] for entry in entries))
+            f.flush()
+            os.fsync(f.fileno())
+            self._file_lock.bump()
+        logger.info("%s contacts appended to file", len(entries))
+        return True
+
+
+class ColumnarStorage(JSONStorage):
+    """Store contacts in the binary columnar format, read back through ``mmap``.
+
+    Each save rewrites the whole file and holds every record's fields in
+    memory while doing so; loading decodes one column at a time.
+    """
+
+    def save(self, records):
+        with self.lock():
+            with atomic_open(self.filename, 'wb') as f:
+                write_columnar(f, records)
+            self._saved()
+            self.file_format = "columnar"
+        logger.info("Contacts saved to file")
+
+
+class JournalStorage(Storage):
+    """Store contacts as a JSON snapshot plus an append-only mutation log.
+
+    Each mutation appends one JSON line to ``<filename>.log``; loading reads
+    the snapshot and replays the log on top of it. Once the log holds
+    ``compact_threshold`` entries, ``append`` asks for a full save, which
+    writes a fresh snapshot atomically and starts an empty log.
+
+    The first line of the log records a digest of the snapshot it applies
+    to, so a log left behind by a crash during compaction is ignored instead
+    of being replayed twice. The snapshot uses the same format as
+    ``JSONStorage``, so either backend can open the other's file.
+    """
+
+    def __init__(self, filename, compact_threshold=1000, fsync=True):
+        super().__init__(filename)
+        self.journal_filename = filename + ".log"
+        self.compact_threshold = compact_threshold
+        self.fsync = fsync
+        self._snapshot_digest = None
+        self._entry_count = 0
+
+    @staticmethod
+    def _digest(data):
+        import hashlib
+
+        return hashlib.sha256(data).hexdigest()
+
+    @staticmethod
+    def _digest_file(filename):
+        import hashlib
+
+        digest = hashlib.sha256()
+        with open(filename, 'rb') as f:
+            for chunk in iter(lambda: f.read(1 << 20), b""):
+                digest.update(chunk)
+        return digest.hexdigest()
+
+    def _header(self):
+        return json.dumps({"snapshot": self._snapshot_digest}) + "\n"
+
+    def load(self):
+        with self.lock():
+            try:
+                with open(self.filename, 'rb') as f:
+                    data = f.read()
+                records = decode_records(data)
+            except FileNotFoundError:
+                data = b""
+                records = []
+            self._snapshot_digest = self._digest(data)
+            self._entry_count = self._replay(records)
+        if not data and not self._entry_count:
+            logger.warning("Contacts file not found, starting with an empty phonebook")
+        else:
+            logger.debug("Contacts loaded from snapshot and %s journal entries", self._entry_count)
+        return records
+
+    def replay(self, records):
+        """Apply the journal to ``records`` read from the current snapshot and return the number of entries applied.
+
+        Used by the other file-based backends, which share the snapshot; the
+        caller must hold the lock.
+        """
+        try:
+            with open(self.journal_filename, 'rb') as f:
+                f.readline()
+                if not f.read(1):
+                    return 0
+        except FileNotFoundError:
+            return 0
+        try:
+            self._snapshot_digest = self._digest_file(self.filename)
+        except FileNotFoundError:
+            self._snapshot_digest = self._digest(b"")
+        return self._replay(records)
+
+    def _replay(self, records):
+        try:
+            with open(self.journal_filename, 'rb') as f:
+                lines = f.readlines()
+        except FileNotFoundError:
+            return 0
+        try:
+            header = json.loads(lines[0]) if lines else {}
+        except json.JSONDecodeError:
+            header = {}
+        if header.get("snapshot") != self._snapshot_digest:
+            logger.warning("Discarding journal that does not match the current snapshot")
+            atomic_write(self.journal_filename, self._header().encode())
+            return 0
+        count = 0
+        valid_size = len(lines[0])
+        for line in lines[1:]:
+            try:
+                if not line.endswith(b"\n"):
+                    raise ValueError("incomplete line")
+                entry = json.loads(line)
+            except ValueError:
+                # A torn final line from an interrupted append; drop it so
+                # that later appends start on a clean line.
+                logger.warning("Discarding incomplete journal entry")
+                with open(self.journal_filename, 'r+b') as f:
+                    f.truncate(valid_size)
+                break
+            self.apply(records, entry)
+            valid_size += len(line)
+            count += 1
+        return count
+
+    @staticmethod
+    def apply(records, entry):
+        """Apply a single journal entry to a list of contact dictionaries."""
+        op = entry["op"]
+        if op == "add":
+            records.append(entry["contact"])
+        elif op == "update":
+            records[entry["index"]] = entry["contact"]
+        elif op == "delete":
+            del records[entry["index"]]
+        else:
+            raise ValueError(f"Unknown journal operation: {op}")
+
+    def save(self, records):
+        with self.lock():
+            with atomic_open(self.filename, 'w') as f:
+                write_json_array(f, records)
+            self._snapshot_digest = self._digest_file(self.filename)
+            atomic_write(self.journal_filename, self._header().encode())
+            self._entry_count = 0
+            self._file_lock.bump()
+        logger.info("Contacts snapshot saved and journal compacted")
+
+    def append(self, entries):
+        if self._entry_count + len(entries) > self.compact_threshold:
+            return False
+        if self._snapshot_digest is None:
+            self.load()
+        lines = "".join(json.dumps(entry) + "\n" for entry in entries)
+        with self.lock():
+            if not os.path.exists(self.journal_filename):
+                lines = self._header() + lines
+            with open(self.journal_filename, 'a') as f:
+                f.write(lines)
+                f.flush()
+                if self.fsync:
+                    os.fsync(f.fileno())
+            self._file_lock.bump()
+        self._entry_count += len(entries)
+        logger.info("%s journal entries appended", len(entries))
+        return True
@@ -0,0 +1,129 @@
+# validation.py
+"""Validation and normalization of phone numbers and email addresses.
+
+Phone numbers are accepted in the usual North American layouts, such as
+"(123) 456-7890", "123-456-7890", "123.456.7890" or "+1 123 456 7890", and
+as international numbers starting with "+". Each is reduced to its E.164
+form, "+" followed by the country code and the number, and stored in one
+canonical layout: "(123) 456-7890" for North American numbers and the E.164
+form for all others. Email addresses are stripped and lower-cased.
+
+PhoneBook normalizes every contact it adds or updates, and its phone and
+email indexes and duplicate detection key stored values by ``phone_key``
+and ``email_key``, so records stored before normalization match too:
+"123-456-7890" and "(123) 456-7890" are the same number.
+"""
+import re
+
+# Country code of ten-digit numbers that are written without one.
+DEFAULT_COUNTRY_CODE = "1"
+PHONE_PATTERN = re.compile(r"\+?[\d\s().-]+")
+# Numbers already in the canonical layout are recognized with this alone.
+CANONICAL_PHONE_PATTERN = re.compile(r"\(\d{3}\) \d{3}-\d{4}")
+EMAIL_PATTERN = re.compile(r"[\w.-]+@[\w.-]+\.\w+")
+_NON_DIGITS = re.compile(r"\D")
+
+PHONE_ERROR = (
+    "Phone number must have 10 digits, as in (###) ###-#### or ###-###-####, "
+    "or start with + and a country code. Please provide a valid phone number."
+)
+EMAIL_ERROR = "Invalid email address. Please provide a valid email address."
+
+
+def to_e164(phone):
+    """Return the E.164 form of ``phone``; raises ``ValueError`` if it is not a phone number.
+
+    >>> to_e164("123-456-7890"), to_e164("+44 20 7946 0958")
+    ('+11234567890', '+442079460958')
+    """
+    phone = (phone or "").strip()
+    if not PHONE_PATTERN.fullmatch(phone):
+        raise ValueError(PHONE_ERROR)
+    digits = _NON_DIGITS.sub("", phone)
+    if phone.startswith("+"):
+        if 8 <= len(digits) <= 15:
+            return "+" + digits
+    elif len(digits) == 10:
+        return "+" + DEFAULT_COUNTRY_CODE + digits
+    elif len(digits) == 11 and digits.startswith(DEFAULT_COUNTRY_CODE):
+        return "+" + digits
+    raise ValueError(PHONE_ERROR)
+
+
+def format_phone(e164):
+    """Return the canonical layout of a number in E.164 form."""
+    if len(e164) == 12 and e164.startswith("+" + DEFAULT_COUNTRY_CODE):
+        return f"({e164[2:5]}) {e164[5:8]}-{e164[8:]}"
+    return e164
+
+
+def normalize_phone(phone):
+    """Return ``phone`` in the canonical layout; raises ``ValueError`` if it is not a phone number."""
+    if phone and CANONICAL_PHONE_PATTERN.fullmatch(phone):
+        return phone
+    return format_phone(to_e164(phone))
+
+
+def normalize_email(email):
+    """Return ``email`` stripped and lower-cased; raises ``ValueError`` if it is not an email address.
+
+    Missing and empty addresses are returned as they are.
+    """
+    if not email:
+        return email
+    email = email.strip().lower()
+    if email and not EMAIL_PATTERN.fullmatch(email):
+        raise ValueError(EMAIL_ERROR)
+    return email
+
+
+def validate_phone(phone):
+    """Raise ``ValueError`` unless ``phone`` is a phone number in one of the accepted layouts."""
+    normalize_phone(phone)
+
+
+def validate_email(email):
+    """Raise ``ValueError`` unless ``email`` is empty or a valid email address."""
+    normalize_email(email)
+
+
+def phone_key(phone):
+    """Return the lookup key of ``phone``: its canonical layout, or the stripped value if it is not valid."""
+    try:
+        return normalize_phone(phone)
+    except ValueError:
+        return (phone or "").strip()
+
+
+def email_key(email):
+    """Return the lookup key of ``email``: lower-cased if it is valid, else the stripped value."""
+    # Stored addresses are normally in this form already, valid or not.
+    if email and email == email.strip() and email == email.lower():
+        return email
+    try:
+        return normalize_email(email)
+    except ValueError:
+        return (email or "").strip()
+
+
+def normalize_contact(contact):
+    """Normalize the phone and email of ``contact`` in place; raises ``ValueError`` if either is invalid."""
+    contact.phone = normalize_phone(contact.phone)
+    contact.email = normalize_email(contact.email)
+
+
+def normalize_many(rows, counts):
+    """Yield the rows of ``rows`` with their ``phone`` and ``email`` normalized, skipping invalid ones.
+
+    This is the bulk import path; skipped rows are tallied as
+    ``counts["invalid"]``.
+    """
+    for row in rows:
+        try:
+            row["phone"] = normalize_phone(row.get("phone"))
+            if row.get("email"):
+                row["email"] = normalize_email(row["email"])
+        except ValueError:
+            counts["invalid"] += 1
+            continue
+        yield row
@@ -0,0 +1,157 @@
+# views.py
+"""Group-by and sorted views that PhoneBook keeps up to date like its indexes.
+
+A view is built the first time a grouping or ordering is asked for and is
+then updated on every add, update and delete, so asking again costs no more
+than copying the result.
+"""
+from bisect import bisect_left
+from functools import total_ordering
+from itertools import count
+
+VIEW_FIELDS = ('id', 'first_name', 'last_name', 'phone', 'email', 'address', 'created_at', 'updated_at')
+
+
+def parse_sort_key(key):
+    """Parse a sort key such as ``"last_name,-created_at"`` into ``(field, descending)`` pairs.
+
+    Fields are compared in the order given; a leading ``-`` sorts that
+    field in descending order. Raises ``ValueError`` for unknown fields.
+    """
+    fields = []
+    for part in key.split(','):
+        part = part.strip()
+        descending = part.startswith('-')
+        field = part.lstrip('-')
+        if field not in VIEW_FIELDS:
+            raise ValueError(f"Invalid contact field: {field}")
+        fields.append((field, descending))
+    return tuple(fields)
+
+
+def _comparable(value):
+    # Missing values sort after all others (in ascending order) instead of
+    # failing to compare.
+    return (value is None, value)
+
+
+@total_ordering
+class _Descending:
+    """Wrap a value so that it compares in reverse order."""
+
+    __slots__ = ('value',)
+
+    def __init__(self, value):
+        self.value = value
+
+    def __eq__(self, other):
+        return self.value == other.value
+
+    def __lt__(self, other):
+        return other.value < self.value
+
+
+class _OrderedView:
+    """Base for views that keep contacts with equal keys in list order.
+
+    Contacts are only ever appended to the list, so list order is the order
+    in which they were added; each contact gets an increasing sequence
+    number when it is added. Updates reach a view as a ``discard`` followed
+    by an ``add`` of the same contact, which keeps its number.
+    """
+
+    def __init__(self):
+        self._sequence = count()
+        self._entry_of = {}
+        self._moving = {}
+
+    def _next_sequence(self, contact):
+        sequence = self._moving.pop(contact, None)
+        # Anything else discarded since the previous add was deleted.
+        self._moving.clear()
+        return next(self._sequence) if sequence is None else sequence
+
+    def _forget(self, contact):
+        entry = self._entry_of.pop(contact, None)
+        if entry is not None:
+            self._moving[contact] = entry[-1]
+        return entry
+
+
+class SortedView(_OrderedView):
+    """Contacts kept sorted by a key parsed with ``parse_sort_key``."""
+
+    def __init__(self, key, contacts=()):
+        super().__init__()
+        self.key = key
+        entries = []
+        for contact in contacts:
+            entry = (self._sort_key(contact), next(self._sequence))
+            self._entry_of[contact] = entry
+            entries.append((entry, contact))
+        entries.sort(key=lambda item: item[0])
+        self._entries = [entry for entry, _ in entries]
+        self._contacts = [contact for _, contact in entries]
+
+    def _sort_key(self, contact):
+        return tuple(
+            _Descending(_comparable(getattr(contact, field))) if descending
+            else _comparable(getattr(contact, field))
+            for field, descending in self.key
+        )
+
+    def add(self, contact):
+        entry = (self._sort_key(contact), self._next_sequence(contact))
+        position = bisect_left(self._entries, entry)
+        self._entries.insert(position, entry)
+        self._contacts.insert(position, contact)
+        self._entry_of[contact] = entry
+
+    def discard(self, contact):
+        entry = self._forget(contact)
+        if entry is None:
+            return
+        position = bisect_left(self._entries, entry)
+        del self._entries[position]
+        del self._contacts[position]
+
+    def contacts(self):
+        """Return the contacts in sorted order."""
+        return list(self._contacts)
+
+
+class GroupView(_OrderedView):
+    """Contacts grouped by the value of one field, each group in list order."""
+
+    def __init__(self, field, contacts=()):
+        super().__init__()
+        self.field = field
+        self._groups = {}
+        for contact in contacts:
+            self.add(contact)
+
+    def add(self, contact):
+        value = getattr(contact, self.field)
+        sequence = self._next_sequence(contact)
+        sequences, members = self._groups.setdefault(value, ([], []))
+        position = bisect_left(sequences, sequence)
+        sequences.insert(position, sequence)
+        members.insert(position, contact)
+        self._entry_of[contact] = (value, sequence)
+
+    def discard(self, contact):
+        entry = self._forget(contact)
+        if entry is None:
+            return
+        value, sequence = entry
+        sequences, members = self._groups[value]
+        position = bisect_left(sequences, sequence)
+        del sequences[position]
+        del members[position]
+        if not sequences:
+            del self._groups[value]
+
+    def groups(self):
+        """Return a dict of group value to contacts, in order of each group's first contact."""
+        ordered = sorted(self._groups.items(), key=lambda item: item[1][0][0])
+        return {value: list(members) for value, (_, members) in ordered}
@@ -0,0 +1,206 @@
+# server.py
+"""Long-running PhoneBook server and the client used by ``cli.py --server``.
+
+The server keeps one PhoneBook loaded and answers requests on a Unix domain
+socket. Each request and response is one line of JSON:
+
+    {"action": "search", "args": {"query": "John"}}
+    {"ok": true, "output": "...text the CLI would have printed..."}
+
+Actions are executed by the same functions as the CLI, so validation and
+messages are identical. Read-only actions run in parallel worker threads;
+actions that modify the phonebook wait for them and run one at a time.
+"""
+import argparse
+import asyncio
+import contextlib
+import contextvars
+import io
+import json
+import logging
+import os
+import socket
+import sys
+from concurrent.futures import ThreadPoolExecutor
+
+import cli
+
+SOCKET_PATH = cli.SOCKET_PATH
+READ_ACTIONS = {"list", "get", "export", "group", "sort", "search", "filter", "stats"}
+WRITE_ACTIONS = {"add", "update", "delete", "delete_batch", "update_batch", "import"}
+SERVER_ACTIONS = READ_ACTIONS | WRITE_ACTIONS
+# Arguments holding file paths, which clients resolve before sending since
+# the server may run in a different working directory.
+PATH_ARGUMENTS = ("path",)
+WORKER_THREADS = 8
+
+logger = logging.getLogger(__name__)
+
+_request_output = contextvars.ContextVar("request_output", default=None)
+
+
+class _RequestStdout(io.TextIOBase):
+    """Stand-in for sys.stdout that sends output to the current request's buffer."""
+
+    def __init__(self, stdout):
+        self._stdout = stdout
+
+    def write(self, text):
+        buffer = _request_output.get()
+        return (buffer if buffer is not None else self._stdout).write(text)
+
+    def flush(self):
+        self._stdout.flush()
+
+
+class ReadWriteLock:
+    """Asyncio lock that admits many readers or a single writer.
+
+    Waiting writers block new readers, so a steady stream of reads cannot
+    starve writes.
+    """
+
+    def __init__(self):
+        self._condition = asyncio.Condition()
+        self._readers = 0
+        self._writer = False
+        self._waiting_writers = 0
+
+    @contextlib.asynccontextmanager
+    async def read(self):
+        async with self._condition:
+            await self._condition.wait_for(lambda: not self._writer and not self._waiting_writers)
+            self._readers += 1
+        try:
+            yield
+        finally:
+            async with self._condition:
+                self._readers -= 1
+                self._condition.notify_all()
+
+    @contextlib.asynccontextmanager
+    async def write(self):
+        async with self._condition:
+            self._waiting_writers += 1
+            await self._condition.wait_for(lambda: not self._writer and not self._readers)
+            self._waiting_writers -= 1
+            self._writer = True
+        try:
+            yield
+        finally:
+            async with self._condition:
+                self._writer = False
+                self._condition.notify_all()
+
+
+class PhoneBookServer:
+    """Serve CLI actions against one resident PhoneBook."""
+
+    def __init__(self, phonebook, workers=WORKER_THREADS):
+        self.phonebook = phonebook
+        self.lock = ReadWriteLock()
+        self._parser = cli.build_parser()
+        # A dedicated pool, so actions never wait behind other users of the
+        # event loop's default executor.
+        self._executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="phonebook")
+
+    def _run_action(self, action, args):
+        buffer = io.StringIO()
+        _request_output.set(buffer)
+        cli.ACTIONS[action](args, self.phonebook)
+        return buffer.getvalue()
+
+    async def execute(self, request):
+        """Execute one request and return the response dictionary."""
+        action = request.get("action")
+        if action not in SERVER_ACTIONS:
+            return {"ok": False, "error": f"Unsupported action: {action}"}
+        args = self._parser.parse_args([action])
+        for name, value in (request.get("args") or {}).items():
+            setattr(args, name, value)
+        lock = self.lock.read() if action in READ_ACTIONS else self.lock.write()
+        try:
+            async with lock:
+                # Each action runs in a copy of the current context, so its
+                # output buffer stays separate from concurrent requests.
+                context = contextvars.copy_context()
+                output = await asyncio.get_running_loop().run_in_executor(
+                    self._executor, context.run, self._run_action, action, args
+                )
+        except Exception as e:
+            logger.error("Request %s failed: %s", action, e)
+            return {"ok": False, "error": str(e)}
+        return {"ok": True, "output": output}
+
+    async def handle_client(self, reader, writer):
+        try:
+            while line := await reader.readline():
+                try:
+                    response = await self.execute(json.loads(line))
+                except json.JSONDecodeError as e:
+                    response = {"ok": False, "error": f"Invalid request: {e}"}
+                writer.write(json.dumps(response).encode() + b"\n")
+                await writer.drain()
+        finally:
+            writer.close()
+
+    async def serve(self, socket_path=SOCKET_PATH, ready=None):
+        """Serve requests on ``socket_path`` until cancelled."""
+        if os.path.exists(socket_path):
+            if is_running(socket_path):
+                raise RuntimeError(f"A PhoneBook server is already listening on {socket_path}")
+            os.remove(socket_path)
+        if not isinstance(sys.stdout, _RequestStdout):
+            sys.stdout = _RequestStdout(sys.stdout)
+        server = await asyncio.start_unix_server(self.handle_client, path=socket_path, limit=1 << 24)
+        logger.info("PhoneBook server listening on %s", socket_path)
+        try:
+            async with server:
+                if ready is not None:
+                    ready.set()
+                await server.serve_forever()
+        finally:
+            self._executor.shutdown(wait=False)
+            if os.path.exists(socket_path):
+                os.remove(socket_path)
+
+
+def is_running(socket_path=SOCKET_PATH):
+    """Return True if a server is accepting connections on ``socket_path``."""
+    with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as client:
+        try:
+            client.connect(socket_path)
+        except OSError:
+            return False
+    return True
+
+
+def send_request(action, args, socket_path=SOCKET_PATH):
+    """Send one request to a running server and return its response dictionary.
+
+    Raises ``OSError`` if no server is listening on ``socket_path``.
+    """
+    args = dict(args)
+    for name in PATH_ARGUMENTS:
+        if args.get(name):
+            args[name] = os.path.abspath(args[name])
+    with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as client:
+        client.connect(socket_path)
+        with client.makefile("rwb") as stream:
+            stream.write(json.dumps({"action": action, "args": args}).encode() + b"\n")
+            stream.flush()
+            return json.loads(stream.readline())
+
+
+def request_args(args):
+    """Return the command-line arguments that are forwarded to the server."""
+    args = vars(args) if isinstance(args, argparse.Namespace) else dict(args)
+    return {name: value for name, value in args.items()
+            if name not in ("action", "server", "socket", "storage", "log_level", "profile", "metrics")}
+
+
+def serve(args, phonebook):
+    """Run the PhoneBook server until interrupted."""
+    print(f"Serving the phonebook on {args.socket}. Press Ctrl+C to stop.")
+    with contextlib.suppress(KeyboardInterrupt):
+        asyncio.run(PhoneBookServer(phonebook).serve(args.socket))
@@ -0,0 +1,36 @@
+import unittest
+
+from phonebook.cache import MISSING, QueryCache
+
+# test_cache.py
+
+class TestQueryCache(unittest.TestCase):
+
+    def test_least_recently_used_entry_is_evicted(self):
+        cache = QueryCache(maxsize=2)
+        cache.put("a", 1)
+        cache.put("b", 2)
+        self.assertEqual(cache.get("a"), 1)
+        cache.put("c", 3)
+        self.assertIs(cache.get("b"), MISSING)
+        self.assertEqual((cache.get("a"), cache.get("c")), (1, 3))
+        self.assertEqual(cache.stats()["evictions"], 1)
+
+    def test_invalidate_makes_entries_stale(self):
+        cache = QueryCache()
+        cache.put("a", [])
+        self.assertEqual(cache.get("a"), [])
+        cache.invalidate()
+        self.assertIsNone(cache.get("a", None))
+        stats = cache.stats()
+        self.assertEqual((stats["hits"], stats["misses"], stats["entries"], stats["generation"]), (1, 1, 0, 1))
+        self.assertEqual(stats["hit_rate"], 0.5)
+
+    def test_size_zero_disables_caching(self):
+        cache = QueryCache(maxsize=0)
+        cache.put("a", 1)
+        self.assertIs(cache.get("a"), MISSING)
+        self.assertEqual(cache.stats()["misses"], 1)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -1,12 +1,18 @@
+import csv
+import io
+import json
+import os
+import tempfile
 import unittest
 from unittest.mock import MagicMock, patch
+from phonebook.metrics import METRICS
 from phonebook.phonebook import PhoneBook, Contact
 
 # test_cli.py
 from cli import (
     validate_phone, validate_email, add_contact, update_contact, delete_contact,
-    delete_contacts, list_contacts, import_contacts, export_contacts, sort_contacts,
-    group_contacts, search_contacts, filter_contacts
+    delete_contacts, update_contacts, get_contacts, list_contacts, import_contacts, export_contacts, sort_contacts,
+    group_contacts, search_contacts, filter_contacts, show_stats, main, build_parser
 )
 
 class TestCLI(unittest.TestCase):
@@ -14,13 +20,23 @@ class TestCLI(unittest.TestCase):
     def setUp(self):
         self.phonebook = MagicMock(spec=PhoneBook)
         self.args = MagicMock()
+        self.args.id = None
+        self.args.ids = None
+        self.args.fuzzy = False
+        self.args.format = "text"
+        self.args.offset = 0
+        self.args.limit = None
 
     def test_validate_phone_valid(self):
         validate_phone("(123) 456-7890")  # Should not raise an exception
 
+    def test_validate_phone_other_layouts(self):
+        validate_phone("123-456-7890")
+        validate_phone("+44 20 7946 0958")
+
     def test_validate_phone_invalid(self):
         with self.assertRaises(ValueError):
-            validate_phone("123-456-7890")
+            validate_phone("456-7890")
 
     def test_validate_email_valid(self):
         validate_email("test@example.com")  # Should not raise an exception
@@ -78,23 +94,136 @@ class TestCLI(unittest.TestCase):
         delete_contacts(self.args, self.phonebook)
         self.phonebook.delete_contacts.assert_called_once_with([0, 1, 2])
 
+    def test_update_and_delete_by_id(self):
+        self.args.id = "0123456789abcdef"
+        self.args.index = None
+        self.args.first_name = "Jane"
+        self.args.last_name = self.args.phone = self.args.email = self.args.address = None
+        update_contact(self.args, self.phonebook)
+        self.phonebook.update_contact_by_id.assert_called_once_with("0123456789abcdef", "Jane", None, None, None, None)
+        delete_contact(self.args, self.phonebook)
+        self.phonebook.delete_contact_by_id.assert_called_once_with("0123456789abcdef")
+        self.args.ids = "a1, b2"
+        delete_contacts(self.args, self.phonebook)
+        self.phonebook.delete_contacts_by_id.assert_called_once_with(["a1", "b2"])
+
+    def test_get_contacts_by_phone(self):
+        self.args.phone = "(123) 456-7890"
+        self.phonebook.get_by_phone.return_value = [Contact("John", "Doe", "(123) 456-7890")]
+        with patch('sys.stdout', new_callable=io.StringIO) as stdout:
+            get_contacts(self.args, self.phonebook)
+        self.phonebook.get_by_phone.assert_called_once_with("(123) 456-7890")
+        self.assertIn("  First Name: John\n", stdout.getvalue())
+        self.args.format = "jsonl"
+        with patch('sys.stdout', new_callable=io.StringIO) as stdout:
+            get_contacts(self.args, self.phonebook)
+        self.assertEqual(json.loads(stdout.getvalue())["phone"], "(123) 456-7890")
+
     def test_delete_contacts_missing_indices(self):
         self.args.indices = None
         with self.assertRaises(ValueError):
             delete_contacts(self.args, self.phonebook)
 
+    @patch('builtins.print')
+    def test_update_contacts_from_csv_and_jsonl(self, mock_print):
+        with tempfile.TemporaryDirectory() as tmpdir:
+            files = {
+                "updates.csv": "index,first_name,phone\n2,Jane,\n1,,(123) 456-7899\n",
+                "updates.jsonl": '{"index": 2, "first_name": "Jane"}\n{"index": 1, "phone": "(123) 456-7899"}\n',
+            }
+            for name, content in files.items():
+                with self.subTest(name=name):
+                    self.phonebook.reset_mock()
+                    self.args.path = os.path.join(tmpdir, name)
+                    with open(self.args.path, "w") as f:
+                        f.write(content)
+                    update_contacts(self.args, self.phonebook)
+                    batch = self.phonebook.batch.return_value.__enter__.return_value
+                    batch.update.assert_any_call(1, first_name="Jane", last_name=None, phone=None,
+                                                 email=None, address=None)
+                    batch.update.assert_any_call(0, first_name=None, last_name=None, phone="(123) 456-7899",
+                                                 email=None, address=None)
+
+    @patch('builtins.print')
+    def test_update_contacts_rejects_invalid_row(self, mock_print):
+        with tempfile.TemporaryDirectory() as tmpdir:
+            self.args.path = os.path.join(tmpdir, "updates.csv")
+            with open(self.args.path, "w") as f:
+                f.write("index,phone\n1,(123) 456-7899\n2,123\n")
+            update_contacts(self.args, self.phonebook)
+        mock_print.assert_called_once()
+        self.assertIn("Row 2", mock_print.call_args[0][0])
+        self.assertIn("No contacts were updated", mock_print.call_args[0][0])
+
     def test_list_contacts(self):
-        self.args = MagicMock()
-        list_contacts(self.args, self.phonebook)
-        self.phonebook.list_contacts.assert_called_once()
+        self.args.offset = 20
+        self.args.limit = 10
+        self.phonebook.iter_contacts.return_value = iter([Contact("John", "Doe", "(123) 456-7890")])
+        with patch('sys.stdout', new_callable=io.StringIO) as stdout:
+            list_contacts(self.args, self.phonebook)
+        self.phonebook.iter_contacts.assert_called_once_with(offset=20, limit=10)
+        self.assertIn("Contact 21:\n  ID: ", stdout.getvalue())
+        self.assertIn("  First Name: John\n", stdout.getvalue())
+
+    def test_output_formats(self):
+        contacts = [Contact("John", "Doe", "(123) 456-7890", "john@example.com"),
+                    Contact("Jane", "Roe", "(234) 567-8901")]
+        outputs = {}
+        for output_format in ("table", "jsonl", "csv"):
+            self.args.format = output_format
+            self.phonebook.iter_contacts.return_value = iter(contacts)
+            with patch('sys.stdout', new_callable=io.StringIO) as stdout:
+                list_contacts(self.args, self.phonebook)
+            outputs[output_format] = stdout.getvalue().splitlines()
+        self.assertEqual(len(outputs["table"]), 3)
+        self.assertRegex(outputs["table"][1], r"^\s+1\s+\w{16}\s+John\s+Doe\s+\(123\) 456-7890\s+john@example.com")
+        self.assertEqual([json.loads(line)["first_name"] for line in outputs["jsonl"]], ["John", "Jane"])
+        rows = list(csv.DictReader(outputs["csv"]))
+        self.assertEqual([(row["first_name"], row["email"]) for row in rows],
+                         [("John", "john@example.com"), ("Jane", "")])
+
+    def test_group_contacts_pages_across_groups(self):
+        self.args.key = "last_name"
+        self.args.format = "jsonl"
+        self.args.offset = 1
+        self.args.limit = 2
+        self.phonebook.group_contacts.return_value = {
+            "Doe": [Contact("John", "Doe", "(123) 456-7890"), Contact("Jane", "Doe", "(234) 567-8901")],
+            "Roe": [Contact("Rick", "Roe", "(345) 678-9012")],
+        }
+        with patch('sys.stdout', new_callable=io.StringIO) as stdout:
+            group_contacts(self.args, self.phonebook)
+        records = [json.loads(line) for line in stdout.getvalue().splitlines()]
+        self.assertEqual([(r["last_name"], r["first_name"]) for r in records], [("Doe", "Jane"), ("Roe", "Rick")])
 
     @patch('builtins.print')
     def test_import_contacts_success(self, mock_print):
         self.args.path = "contacts.csv"
+        self.args.batch_size = None
+        self.args.stream = False
+        self.args.workers = None
+        self.args.key = None
         import_contacts(self.args, self.phonebook)
-        self.phonebook.import_contacts_from_csv.assert_called_once_with("contacts.csv")
+        self.phonebook.import_contacts_from_csv.assert_called_once_with(
+            "contacts.csv", batch_size=None, stream=False, workers=None
+        )
         mock_print.assert_called_with("Contacts imported from contacts.csv.")
 
+    @patch('builtins.print')
+    def test_import_contacts_upsert(self, mock_print):
+        self.args.path = "contacts.csv"
+        self.args.workers = None
+        self.args.key = "email"
+        self.args.delete_missing = True
+        self.phonebook.upsert_contacts_from_csv.return_value = {
+            "inserted": 1, "updated": 2, "unchanged": 3, "deleted": 4, "skipped": 0, "invalid": 0
+        }
+        import_contacts(self.args, self.phonebook)
+        self.phonebook.upsert_contacts_from_csv.assert_called_once_with(
+            "contacts.csv", key="email", delete_missing=True, workers=None
+        )
+        mock_print.assert_any_call("Inserted: 1, updated: 2, unchanged: 3, deleted: 4, skipped: 0, invalid: 0")
+
     @patch('builtins.print')
     def test_import_contacts_invalid_path(self, mock_print):
         self.args.path = "contacts.txt"
@@ -108,6 +237,12 @@ class TestCLI(unittest.TestCase):
         self.phonebook.export_contacts_to_csv.assert_called_once_with("contacts.csv")
         mock_print.assert_called_with("Contacts exported to contacts.csv.")
 
+    @patch('builtins.print')
+    def test_export_contacts_gzip(self, mock_print):
+        self.args.path = "contacts.csv.gz"
+        export_contacts(self.args, self.phonebook)
+        self.phonebook.export_contacts_to_csv.assert_called_once_with("contacts.csv.gz")
+
     @patch('builtins.print')
     def test_export_contacts_invalid_path(self, mock_print):
         self.args.path = "contacts.txt"
@@ -124,16 +259,107 @@ class TestCLI(unittest.TestCase):
         group_contacts(self.args, self.phonebook)
         self.phonebook.group_contacts.assert_called_once_with("last_name")
 
+    @patch('builtins.print')
+    def test_show_stats(self, mock_print):
+        self.phonebook.cache_stats.return_value = {
+            "hits": 3, "misses": 1, "hit_rate": 0.75, "entries": 1, "maxsize": 128, "evictions": 0, "generation": 2
+        }
+        show_stats(self.args, self.phonebook)
+        mock_print.assert_called_once_with(
+            "Query cache: 3 hits, 1 misses (75.0% hit rate), 1 of 128 entries in use, 0 evictions, generation 2"
+        )
+
     def test_search_contacts(self):
         self.args.query = "John"
         search_contacts(self.args, self.phonebook)
-        self.phonebook.search_contacts.assert_called_once_with("John")
+        self.phonebook.iter_search_contacts.assert_called_once_with("John", offset=0, limit=None)
+
+    def test_fuzzy_search_contacts(self):
+        self.args.query = "Jonson"
+        self.args.fuzzy = True
+        self.args.limit = None
+        search_contacts(self.args, self.phonebook)
+        self.phonebook.fuzzy_search_contacts.assert_called_once_with("Jonson", limit=10)
+        self.phonebook.search_contacts.assert_not_called()
+
+    def test_fuzzy_search_with_zero_limit_shows_none(self):
+        self.args.query = "Jonson"
+        self.args.fuzzy = True
+        self.args.limit = 0
+        with patch('sys.stdout', new_callable=io.StringIO):
+            search_contacts(self.args, self.phonebook)
+        self.phonebook.fuzzy_search_contacts.assert_called_once_with("Jonson", limit=0)
 
     def test_filter_contacts(self):
         self.args.start_date = "2023-01-01"
         self.args.end_date = "2023-12-31"
+        self.args.date_field = "created_at"
         filter_contacts(self.args, self.phonebook)
-        self.phonebook.filter_contacts_by_time_frame.assert_called_once_with("2023-01-01", "2023-12-31")
+        self.phonebook.filter_contacts_by_time_frame.assert_called_once_with(
+            "2023-01-01", "2023-12-31", field="created_at"
+        )
+
+    def test_filter_contacts_by_updated_at(self):
+        self.args.start_date = "2023-01-01"
+        self.args.end_date = "2023-12-31"
+        self.args.date_field = "updated_at"
+        filter_contacts(self.args, self.phonebook)
+        self.phonebook.filter_contacts_by_time_frame.assert_called_once_with(
+            "2023-01-01", "2023-12-31", field="updated_at"
+        )
+
+    def test_machine_readable_output_has_no_messages(self):
+        self.args.format = "jsonl"
+        self.args.query = "Nobody"
+        self.args.start_date = "2023-01-01"
+        self.args.end_date = "2023-12-31"
+        self.args.date_field = "created_at"
+        self.phonebook.iter_search_contacts.return_value = iter([])
+        self.phonebook.filter_contacts_by_time_frame.return_value = []
+        with patch('sys.stdout', new_callable=io.StringIO) as stdout:
+            search_contacts(self.args, self.phonebook)
+            filter_contacts(self.args, self.phonebook)
+        self.assertEqual(stdout.getvalue(), "")
+
+    def test_negative_offset_and_limit_are_rejected(self):
+        parser = build_parser()
+        self.assertEqual(parser.parse_args(["list", "--offset", "2", "--limit", "0"]).offset, 2)
+        for option in ("--offset", "--limit"):
+            with self.assertRaises(SystemExit), patch('sys.stderr', new_callable=io.StringIO):
+                parser.parse_args(["list", option, "-1"])
+
+    def test_workers_must_be_positive(self):
+        parser = build_parser()
+        self.assertEqual(parser.parse_args(["import", "--workers", "2"]).workers, 2)
+        for workers in ("0", "-1"):
+            with self.assertRaises(SystemExit), patch('sys.stderr', new_callable=io.StringIO):
+                parser.parse_args(["import", "--workers", workers])
+
+    def test_metrics_are_rejected_with_server(self):
+        argv = ["cli.py", "list", "--server", "--metrics", "phonebook.prom"]
+        with patch('sys.argv', argv), patch('cli.run_on_server') as run_on_server, \
+                patch('sys.stderr', new_callable=io.StringIO) as stderr, self.assertRaises(SystemExit):
+            main()
+        run_on_server.assert_not_called()
+        self.assertIn("--metrics cannot be used with --server", stderr.getvalue())
+
+    def test_main_writes_metrics_and_profile(self):
+        with tempfile.TemporaryDirectory() as tmpdir:
+            metrics_file = os.path.join(tmpdir, "phonebook.prom")
+            profile_file = os.path.join(tmpdir, "list.prof")
+            argv = ["cli.py", "list", "--metrics", metrics_file, "--profile", profile_file, "--format", "jsonl"]
+            phonebook = PhoneBook(storage=MagicMock(filename=os.path.join(tmpdir, "contacts.json"),
+                                                   load=MagicMock(return_value=[])), lazy=True)
+            try:
+                with patch('sys.argv', argv), patch('cli.configure_logging'), \
+                        patch('cli.create_phonebook', return_value=phonebook):
+                    main()
+            finally:
+                METRICS.disable()
+                METRICS.reset()
+            with open(metrics_file) as f:
+                self.assertIn('phonebook_operation_duration_seconds_count{operation="iter_contacts"} 1', f.read())
+            self.assertGreater(os.path.getsize(profile_file), 0)
 
 if __name__ == '__main__':
     unittest.main()
\ No newline at end of file
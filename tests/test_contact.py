@@ -0,0 +1,46 @@
+import unittest
+
+from phonebook.contact import Contact
+
+# test_contact.py
+
+class TestContact(unittest.TestCase):
+
+    def test_timestamps_round_trip(self):
+        for timestamp in ("2024-09-18T20:49:42.622977", "2024-09-18T20:49:42", "2024-09-18T20:49:42+02:00"):
+            contact = Contact("John", "Doe", "(123) 456-7890", created_at=timestamp, updated_at=timestamp)
+            self.assertEqual(contact.to_dict()["created_at"], timestamp)
+            self.assertEqual(contact.updated_at, timestamp)
+
+    def test_timestamps_stored_as_integers(self):
+        contact = Contact("John", "Doe", "(123) 456-7890", created_at="1970-01-01T00:00:01")
+        self.assertEqual(contact._created_at, 1_000_000)
+
+    def test_from_dict_to_dict_compatible(self):
+        data = {
+            "id": "0123456789abcdef", "first_name": "John", "last_name": "Doe", "phone": "(123) 456-7890",
+            "email": None, "address": "123 Main St",
+            "created_at": "2024-01-01T00:00:00", "updated_at": "2024-01-02T00:00:00.500000",
+        }
+        self.assertEqual(Contact.from_dict(data).to_dict(), data)
+
+    def test_ids_are_unique_and_stable(self):
+        self.assertNotEqual(Contact("John", "Doe", "(123) 456-7890").id, Contact("John", "Doe", "(123) 456-7890").id)
+        legacy = {"first_name": "John", "last_name": "Doe", "phone": "(123) 456-7890",
+                  "created_at": "2024-01-01T00:00:00"}
+        contact = Contact.from_dict(legacy)
+        self.assertEqual(contact.id, Contact.from_dict(legacy).id)
+        contact.update(phone="(987) 654-3210")
+        self.assertEqual(Contact.from_dict(contact.to_dict()).id, Contact.from_dict(legacy).id)
+
+    def test_update_refreshes_updated_at(self):
+        contact = Contact("John", "Doe", "(123) 456-7890", updated_at="2000-01-01T00:00:00")
+        contact.update(phone="(987) 654-3210")
+        self.assertGreater(contact.updated_at, "2000-01-01T00:00:00")
+
+    def test_uses_slots(self):
+        contact = Contact("John", "Doe", "(123) 456-7890")
+        self.assertFalse(hasattr(contact, "__dict__"))
+
+if __name__ == '__main__':
+    unittest.main()
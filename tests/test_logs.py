@@ -0,0 +1,62 @@
+import io
+import logging
+import os
+import tempfile
+import unittest
+from unittest.mock import patch
+
+from phonebook.logs import configure_logging, stop_logging, summary
+from phonebook.phonebook import Contact, PhoneBook
+
+# test_logs.py
+
+class TestLogs(unittest.TestCase):
+
+    def setUp(self):
+        root = logging.getLogger()
+        self.saved = root.handlers[:], root.level
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.filename = os.path.join(self.tmpdir.name, "contacts.json")
+        self.print_patcher = patch('builtins.print')
+        self.print_patcher.start()
+
+    def tearDown(self):
+        stop_logging()
+        root = logging.getLogger()
+        root.handlers, level = self.saved
+        root.setLevel(level)
+        self.print_patcher.stop()
+        self.tmpdir.cleanup()
+
+    def test_records_are_written_by_background_listener(self):
+        stream = io.StringIO()
+        configure_logging("WARNING", stream)
+        logger = logging.getLogger("phonebook.test")
+        logger.info("hidden %s", "info")
+        logger.warning("shown %s", "warning")
+        stop_logging()
+        self.assertNotIn("hidden", stream.getvalue())
+        self.assertIn("WARNING - shown warning", stream.getvalue())
+
+    def test_summary_logs_counts_once(self):
+        logger = logging.getLogger("phonebook.test")
+        with self.assertLogs(logger, logging.INFO) as logs:
+            with summary(logger, "Import", {"imported": 0}) as counts:
+                counts["imported"] += 2
+        [message] = logs.output
+        self.assertRegex(message, r"Import finished in \d+\.\d{3}s \(2 imported\)")
+
+    def test_bulk_operations_log_one_summary_at_info(self):
+        phonebook = PhoneBook(self.filename)
+        with phonebook.batch() as batch:
+            for i in range(20):
+                batch.add(Contact("John", f"Doe{i}", "(123) 456-7890"))
+        with self.assertLogs("phonebook", logging.INFO) as logs:
+            PhoneBook(self.filename)
+            PhoneBook(self.filename).delete_contacts(range(10))
+        self.assertEqual(len([message for message in logs.output if "Contact created" in message]), 0)
+        self.assertTrue(any("Load finished" in message and "20 contacts" in message for message in logs.output))
+        self.assertTrue(any("Batch finished" in message and "10 deleted" in message for message in logs.output))
+
+if __name__ == '__main__':
+    unittest.main()
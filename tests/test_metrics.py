@@ -0,0 +1,100 @@
+import json
+import os
+import tempfile
+import unittest
+from unittest.mock import patch
+
+from phonebook.metrics import METRICS, Histogram, Metrics, instrumented
+from phonebook.phonebook import Contact, PhoneBook
+
+# test_metrics.py
+
+@instrumented
+class Finder:
+
+    def find(self, names):
+        return [name for name in names if name.startswith("J")]
+
+    def iter_found(self, names):
+        yield from self.find(names)
+
+
+@instrumented
+class SubFinder(Finder):
+
+    def find(self, names):
+        return super().find(names)
+
+
+class TestMetrics(unittest.TestCase):
+
+    def setUp(self):
+        METRICS.reset()
+        METRICS.enable()
+
+    def tearDown(self):
+        METRICS.disable()
+        METRICS.reset()
+
+    def test_histogram_buckets_are_cumulative(self):
+        histogram = Histogram(buckets=(0.1, 1.0))
+        for value in (0.05, 0.5, 0.7, 3.0):
+            histogram.observe(value)
+        self.assertEqual(histogram.cumulative(), [(0.1, 1), (1.0, 3), (float("inf"), 4)])
+        self.assertAlmostEqual(histogram.sum, 4.25)
+
+    def test_counts_go_to_innermost_operation(self):
+        metrics = Metrics()
+        metrics.count("records_scanned", 5)
+        metrics.enable()
+        with metrics.operation("outer"):
+            metrics.count("records_scanned", 2)
+            with metrics.operation("inner"):
+                metrics.count("records_scanned", 3)
+        operations = metrics.snapshot()
+        self.assertEqual((operations["outer"]["calls"], operations["outer"]["records_scanned"]), (1, 2))
+        self.assertEqual(operations["inner"]["records_scanned"], 3)
+        self.assertIsNone(metrics.current())
+
+    def test_instrumented_methods_count_results(self):
+        names = ["John", "Alice", "Jane"]
+        self.assertEqual(SubFinder().find(names), ["John", "Jane"])
+        self.assertEqual(next(Finder().iter_found(names)), "John")
+        operations = METRICS.snapshot()
+        self.assertEqual((operations["find"]["calls"], operations["find"]["records_returned"]), (2, 4))
+        self.assertEqual((operations["iter_found"]["calls"], operations["iter_found"]["records_returned"]), (1, 1))
+
+    def test_disabled_metrics_collect_nothing(self):
+        METRICS.disable()
+        Finder().find(["John"])
+        self.assertEqual(METRICS.snapshot(), {})
+
+    def test_phonebook_operations_are_measured(self):
+        with tempfile.TemporaryDirectory() as tmpdir, patch('builtins.print'):
+            filename = os.path.join(tmpdir, "contacts.json")
+            phonebook = PhoneBook(filename, lazy=True)
+            phonebook.add_contact(Contact("John", "Doe", "(123) 456-7890"))
+            phonebook.add_contact(Contact("Alice", "Smith", "(234) 567-8901"))
+            self.assertEqual(len(phonebook.search_contacts("Doe")), 1)
+            operations = METRICS.snapshot()
+            self.assertEqual(operations["add_contact"]["calls"], 2)
+            self.assertEqual(operations["storage.save"]["calls"], 2)
+            self.assertGreater(operations["storage.save"]["bytes_written"], os.path.getsize(filename))
+            self.assertEqual((operations["search_contacts"]["records_scanned"],
+                              operations["search_contacts"]["records_returned"]), (2, 1))
+
+    def test_export_formats(self):
+        Finder().find(["John"])
+        with tempfile.TemporaryDirectory() as tmpdir:
+            prometheus = os.path.join(tmpdir, "phonebook.prom")
+            METRICS.write(prometheus)
+            with open(prometheus) as f:
+                text = f.read()
+            METRICS.write(os.path.join(tmpdir, "phonebook.json"))
+            with open(os.path.join(tmpdir, "phonebook.json")) as f:
+                document = json.load(f)
+        self.assertIn('phonebook_operation_duration_seconds_bucket{operation="find",le="+Inf"} 1\n', text)
+        self.assertIn('phonebook_records_returned_total{operation="find"} 1\n', text)
+        self.assertEqual(document["operations"]["find"]["calls"], 1)
+        with self.assertRaises(ValueError):
+            METRICS.write(prometheus, "xml")
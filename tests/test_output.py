@@ -0,0 +1,50 @@
+import io
+import unittest
+from unittest.mock import patch
+
+from phonebook.contact import Contact
+from phonebook.output import ContactWriter
+
+# test_output.py
+
+class TestContactWriter(unittest.TestCase):
+
+    def setUp(self):
+        self.contacts = [Contact("John", "Doe", "(123) 456-7890"), Contact("Jane", "Roe", "(234) 567-8901")]
+
+    def test_text_matches_contact_listing(self):
+        stream = io.StringIO()
+        with ContactWriter(stream, separator=True) as writer:
+            writer.write(3, self.contacts[0])
+        lines = stream.getvalue().splitlines()
+        self.assertEqual(lines[:3], ["Contact 3:", f"  ID: {self.contacts[0].id}", "  First Name: John"])
+        self.assertEqual(lines[-2:], ["", "-" * 50])
+        self.assertEqual(writer.count, 1)
+
+    def test_grouped_output_writes_headings_and_group_field(self):
+        stream = io.StringIO()
+        with ContactWriter(stream, "table", group_field="last_name") as writer:
+            for number, contact in enumerate(self.contacts, 1):
+                writer.write(number, contact, group=contact.last_name)
+        output = stream.getvalue()
+        self.assertEqual(output.count("First Name"), 2)
+        self.assertIn("Group: Doe\n", output)
+        stream = io.StringIO()
+        with ContactWriter(stream, "csv", group_field="last_name") as writer:
+            writer.write(1, self.contacts[0], group="Doe")
+        self.assertTrue(stream.getvalue().startswith("last_name,id,first_name,"))
+        self.assertIn("\r\nDoe,", stream.getvalue())
+
+    def test_output_is_buffered(self):
+        stream = io.StringIO()
+        with patch('phonebook.output.BUFFER_SIZE', 300):
+            writer = ContactWriter(stream, "jsonl")
+            writer.write(1, self.contacts[0])
+            self.assertEqual(stream.getvalue(), "")
+            writer.write(2, self.contacts[1])
+            self.assertEqual(len(stream.getvalue().splitlines()), 2)
+        writer.close()
+
+    def test_rejects_unknown_format(self):
+        with self.assertRaises(ValueError):
+            ContactWriter(io.StringIO(), "xml")
@@ -0,0 +1,691 @@
+import json
+import os
+import tempfile
+import threading
+import time
+import unittest
+from concurrent.futures import ProcessPoolExecutor
+from unittest.mock import patch
+
+from phonebook.phonebook import PhoneBook, Contact
+from phonebook.storage import JSONStorage, JournalStorage
+
+# test_phonebook.py
+
+def add_contacts_in_process(filename, journal, worker, count):
+    """Add ``count`` contacts from a separate PhoneBook, as another CLI process would."""
+    storage = JournalStorage(filename, fsync=False) if journal else JSONStorage(filename)
+    phonebook = PhoneBook(storage=storage, lazy=True)
+    with patch('builtins.print'):
+        for i in range(count):
+            phonebook.add_contact(Contact(f"Worker{worker}", f"Contact{i}", "(123) 456-7890"))
+
+class TestPhoneBook(unittest.TestCase):
+
+    def setUp(self):
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.filename = os.path.join(self.tmpdir.name, "contacts.json")
+        self.phonebook = PhoneBook(self.filename)
+        self.print_patcher = patch('builtins.print')
+        self.print_patcher.start()
+
+    def tearDown(self):
+        self.print_patcher.stop()
+        self.tmpdir.cleanup()
+
+    def make_contact(self, first_name="John", last_name="Doe", phone="(123) 456-7890",
+                     email="john.doe@example.com", address="123 Main St"):
+        return Contact(first_name, last_name, phone, email, address)
+
+    def test_add_duplicate_is_skipped(self):
+        self.phonebook.add_contact(self.make_contact())
+        self.phonebook.add_contact(self.make_contact())
+        self.assertEqual(len(self.phonebook.contacts), 1)
+
+    def test_duplicate_ignores_missing_vs_empty_fields(self):
+        self.phonebook.add_contact(self.make_contact(email=None, address=None))
+        self.assertTrue(self.phonebook.is_duplicate(self.make_contact(email="", address=" ")))
+
+    def test_duplicate_index_built_on_load(self):
+        self.phonebook.add_contact(self.make_contact())
+        reloaded = PhoneBook(self.filename)
+        self.assertTrue(reloaded.is_duplicate(self.make_contact()))
+
+    def test_update_keeps_duplicate_index_in_sync(self):
+        self.phonebook.add_contact(self.make_contact())
+        self.phonebook.update_contact(0, phone="(987) 654-3210")
+        self.assertFalse(self.phonebook.is_duplicate(self.make_contact()))
+        self.assertTrue(self.phonebook.is_duplicate(self.make_contact(phone="(987) 654-3210")))
+
+    def test_delete_keeps_duplicate_index_in_sync(self):
+        self.phonebook.add_contact(self.make_contact())
+        self.phonebook.delete_contact(0)
+        self.assertFalse(self.phonebook.is_duplicate(self.make_contact()))
+        self.phonebook.add_contact(self.make_contact())
+        self.assertEqual(len(self.phonebook.contacts), 1)
+
+    def write_csv(self, rows):
+        path = os.path.join(self.tmpdir.name, "import.csv")
+        with open(path, "w") as f:
+            f.write("first_name,last_name,phone,email,address\n")
+            f.writelines(row + "\n" for row in rows)
+        return path
+
+    def test_import_reports_counts(self):
+        path = self.write_csv([
+            "John,Doe,(123) 456-7890,john.doe@example.com,123 Main St",
+            "John,Doe,(123) 456-7890,john.doe@example.com,123 Main St",
+            "Jane,,(234) 567-8901,jane@example.com,456 Oak St",
+            "Alice,Johnson,(345) 678-9012,,",
+        ])
+        counts = self.phonebook.import_contacts_from_csv(path)
+        self.assertEqual(counts, {"imported": 2, "skipped": 1, "invalid": 1})
+        self.assertEqual(len(PhoneBook(self.filename).contacts), 2)
+
+    def test_import_saves_once_per_batch(self):
+        path = self.write_csv([f"John,Doe,(123) 456-{i:04d},," for i in range(5)])
+        with patch.object(PhoneBook, "save_contacts") as mock_save:
+            self.phonebook.import_contacts_from_csv(path, batch_size=2)
+        self.assertEqual(mock_save.call_count, 3)
+
+    def test_import_rejects_rows_failing_validator(self):
+        path = self.write_csv(["John,Doe,bad,,", "Jane,Doe,(123) 456-7890,,"])
+        def validator(row):
+            if row["phone"] == "bad":
+                raise ValueError("bad phone")
+        counts = self.phonebook.import_contacts_from_csv(path, validator=validator)
+        self.assertEqual(counts["invalid"], 1)
+        self.assertEqual(counts["imported"], 1)
+
+    def test_failed_import_keeps_contacts_in_step_with_storage(self):
+        path = self.write_csv([f"John,Doe,(123) 456-{i:04d},," for i in range(5)])
+        def validator(row):
+            if row["phone"] == "(123) 456-0003":
+                raise OSError("read failed")
+        phonebook = PhoneBook(storage=JournalStorage(self.filename, fsync=False))
+        with self.assertRaises(OSError):
+            phonebook.import_contacts_from_csv(path, validator=validator, batch_size=2)
+        self.assertEqual(len(phonebook.contacts), 2)
+        phonebook.add_contact(self.make_contact(first_name="Jane"))
+        phonebook.update_contact(2, last_name="Smith")
+        reloaded = PhoneBook(storage=JournalStorage(self.filename))
+        self.assertEqual([(c.first_name, c.last_name) for c in reloaded.contacts],
+                         [("John", "Doe"), ("John", "Doe"), ("Jane", "Smith")])
+
+    def test_import_normalizes_phone_and_email(self):
+        self.phonebook.add_contact(self.make_contact())
+        path = self.write_csv([
+            "John,Doe,123-456-7890,John.Doe@Example.com,123 Main St",
+            "Jane,Doe,+44 20 7946 0958,,",
+            "Bob,Doe,456-7890,,",
+            "Alice,Doe,(345) 678-9012,alice@,",
+        ])
+        counts = self.phonebook.import_contacts_from_csv(path)
+        self.assertEqual(counts, {"imported": 1, "skipped": 1, "invalid": 2})
+        self.assertEqual(self.phonebook.contacts[-1].phone, "+442079460958")
+
+    def test_phone_and_email_keys_ignore_layout_and_case(self):
+        self.phonebook.add_contact(self.make_contact(phone="123.456.7890", email="John.Doe@Example.com"))
+        self.phonebook.add_contact(self.make_contact())
+        self.assertEqual(len(self.phonebook.contacts), 1)
+        self.assertEqual(self.phonebook.contacts[0].phone, "(123) 456-7890")
+        with self.phonebook.batch() as batch:
+            batch.add(self.make_contact(phone="1 (123) 456 7890"))
+        self.assertEqual(batch.counts["skipped"], 1)
+        lazy = PhoneBook(self.filename, lazy=True)
+        for phonebook in (self.phonebook, lazy):
+            with self.subTest(lazy=phonebook.lazy):
+                self.assertEqual(len(phonebook.get_by_phone("+11234567890")), 1)
+                self.assertEqual(len(phonebook.get_by_email(" JOHN.DOE@example.com")), 1)
+        with self.assertRaises(ValueError):
+            self.phonebook.add_contact(self.make_contact(phone="555-0100"))
+        with self.assertRaises(ValueError):
+            self.phonebook.update_contact(0, email="john.doe")
+
+    def test_upsert_inserts_updates_and_skips_unchanged_rows(self):
+        self.phonebook.add_contact(self.make_contact())
+        self.phonebook.add_contact(self.make_contact(first_name="Jane", email="jane@example.com"))
+        jane = self.phonebook.contacts[1]
+        updated_at = self.phonebook.contacts[0].updated_at
+        path = self.write_csv([
+            "John,Doe,(123) 456-7890,john.doe@example.com,123 Main St",
+            "Jane,Doe,987-654-3210,Jane@Example.com,",
+            "Alice,Doe,(345) 678-9012,alice@example.com,",
+            "Alice,Twice,(345) 678-9012,alice@example.com,",
+            "Bob,Doe,(456) 789-0123,,",
+        ])
+        counts = self.phonebook.upsert_contacts_from_csv(path, key="email")
+        self.assertEqual(counts, {"inserted": 1, "updated": 1, "unchanged": 1, "deleted": 0, "skipped": 2,
+                                  "invalid": 0})
+        reloaded = PhoneBook(self.filename)
+        self.assertEqual([(c.first_name, c.last_name, c.phone) for c in reloaded.contacts], [
+            ("John", "Doe", "(123) 456-7890"), ("Jane", "Doe", "(987) 654-3210"), ("Alice", "Doe", "(345) 678-9012")
+        ])
+        self.assertEqual(reloaded.contacts[0].updated_at, updated_at)
+        self.assertEqual(reloaded.contacts[1].id, jane.id)
+
+    def test_contacts_stored_before_normalization_are_matched(self):
+        with open(self.filename, "w") as f:
+            json.dump([{"first_name": "Ann", "last_name": "Lee", "phone": "123-456-7890", "email": "Ann@X.com"}], f)
+        path = self.write_csv(["Ann,Lee,(123) 456-7890,ann@x.com,"])
+        for lazy in (False, True):
+            with self.subTest(lazy=lazy):
+                phonebook = PhoneBook(self.filename, lazy=lazy)
+                self.assertEqual(len(phonebook.get_by_phone("123-456-7890")), 1)
+                self.assertEqual(len(phonebook.get_by_email("Ann@X.com")), 1)
+                phonebook._index("phone")
+                self.assertEqual(len(phonebook.get_by_phone("(123) 456-7890")), 1)
+                self.assertTrue(phonebook.is_duplicate(Contact("Ann", "Lee", "123-456-7890", "ann@x.com")))
+                phonebook.add_contact(Contact("Ann", "Lee", "(123) 456-7890", "ann@x.com"))
+                self.assertEqual(len(phonebook.contacts), 1)
+                counts = phonebook.upsert_contacts_from_csv(path, key="email")
+                self.assertEqual((counts["inserted"], counts["unchanged"]), (0, 1))
+
+    def test_upsert_skips_keys_shared_by_several_contacts(self):
+        self.phonebook.add_contact(self.make_contact(first_name="Alice", email="shared@example.com"))
+        self.phonebook.add_contact(self.make_contact(first_name="Ivan", email="shared@example.com"))
+        path = self.write_csv(["Ivan,Doe,(555) 000-1111,shared@example.com,"])
+        lazy = PhoneBook(self.filename, lazy=True)
+        with self.assertLogs("phonebook.phonebook", "WARNING"):
+            counts = lazy.upsert_contacts_from_csv(path, key="email", delete_missing=True)
+        self.assertEqual((counts["updated"], counts["skipped"], counts["deleted"]), (0, 1, 0))
+        self.assertEqual([(c.first_name, c.phone) for c in PhoneBook(self.filename).contacts],
+                         [("Alice", "(123) 456-7890"), ("Ivan", "(123) 456-7890")])
+
+    def test_upsert_deletes_missing_contacts(self):
+        self.phonebook.add_contact(self.make_contact())
+        self.phonebook.add_contact(self.make_contact(first_name="Jane", email="jane@example.com"))
+        self.phonebook.add_contact(self.make_contact(first_name="Keep", email=None))
+        path = self.write_csv(["Jane,Doe,(555) 000-1111,jane@example.com,"])
+        lazy = PhoneBook(self.filename, lazy=True)
+        counts = lazy.upsert_contacts_from_csv(path, key="email", delete_missing=True)
+        self.assertEqual((counts["updated"], counts["deleted"]), (1, 1))
+        self.assertEqual([(c.first_name, c.phone) for c in PhoneBook(self.filename).contacts],
+                         [("Jane", "(555) 000-1111"), ("Keep", "(123) 456-7890")])
+        counts = lazy.upsert_contacts_from_csv(path, key="first_name,last_name", delete_missing=True)
+        self.assertEqual((counts["unchanged"], counts["deleted"]), (1, 1))
+        with self.assertRaises(ValueError):
+            lazy.upsert_contacts_from_csv(path, key="nickname")
+
+    def test_journal_storage_persists_mutations(self):
+        phonebook = PhoneBook(storage=JournalStorage(self.filename, fsync=False))
+        phonebook.add_contact(self.make_contact())
+        phonebook.add_contact(self.make_contact(first_name="Jane"))
+        phonebook.update_contact(1, last_name="Smith")
+        phonebook.delete_contact(0)
+        reloaded = PhoneBook(storage=JournalStorage(self.filename))
+        self.assertEqual([(c.first_name, c.last_name) for c in reloaded.contacts], [("Jane", "Smith")])
+
+    def test_lazy_load_defers_contact_creation(self):
+        self.phonebook.add_contact(self.make_contact())
+        self.phonebook.add_contact(self.make_contact(first_name="Jane"))
+        phonebook = PhoneBook(self.filename, lazy=True)
+        phonebook.add_contact(self.make_contact(first_name="Jane"))
+        phonebook.add_contact(self.make_contact(first_name="Alice"))
+        self.assertEqual(len(phonebook.contacts), 3)
+        self.assertIsInstance(next(phonebook.contacts.raw()), dict)
+        phonebook.delete_contact(0)
+        self.assertEqual([c.first_name for c in PhoneBook(self.filename).contacts], ["Jane", "Alice"])
+
+    def test_lazy_contacts_materialize_on_access(self):
+        self.phonebook.add_contact(self.make_contact())
+        phonebook = PhoneBook(self.filename, lazy=True)
+        self.assertIsInstance(phonebook.contacts[0], Contact)
+        self.assertEqual([c.first_name for c in phonebook.list_contacts()], ["John"])
+
+    def add_search_fixture(self):
+        self.phonebook.add_contact(self.make_contact())
+        self.phonebook.add_contact(self.make_contact(first_name="Alice", last_name="Johnson", phone="(345) 678-9012"))
+        self.phonebook.add_contact(self.make_contact(first_name="Bob", last_name="Brown", phone="(456) 789-0123"))
+
+    def test_iter_contacts_pages_in_list_order(self):
+        for i in range(5):
+            self.phonebook.add_contact(self.make_contact(first_name=f"Name{i}"))
+        lazy = PhoneBook(self.filename, lazy=True)
+        with patch('phonebook.phonebook.ITER_CHUNK_SIZE', 2):
+            for phonebook in (self.phonebook, lazy):
+                self.assertEqual([c.first_name for c in phonebook.iter_contacts()], [f"Name{i}" for i in range(5)])
+                self.assertEqual([c.first_name for c in phonebook.iter_contacts(offset=1, limit=3)],
+                                 ["Name1", "Name2", "Name3"])
+                self.assertEqual(list(phonebook.iter_contacts(offset=5)), [])
+        lazy = PhoneBook(self.filename, lazy=True)
+        self.assertEqual(len(list(lazy.iter_contacts(limit=2))), 2)
+        self.assertEqual([isinstance(record, Contact) for record in lazy.contacts.raw()], [True] * 2 + [False] * 3)
+
+    def test_iter_search_contacts_stops_scanning_early(self):
+        self.add_search_fixture()
+        lazy = PhoneBook(self.filename, lazy=True)
+        self.assertEqual([c.first_name for c in lazy.iter_search_contacts("o", offset=1, limit=1)], ["Alice"])
+        self.assertIsInstance(list(lazy.contacts.raw())[2], dict)
+        self.assertEqual([c.first_name for c in lazy.iter_search_contacts("o", offset=1)], ["Alice", "Bob"])
+        self.assertEqual([c.first_name for c in self.phonebook.iter_search_contacts("o", limit=2)], ["John", "Alice"])
+
+    def test_search_uses_index_and_matches_scan(self):
+        self.add_search_fixture()
+        lazy = PhoneBook(self.filename, lazy=True)
+        for query in ["John", "ohn", "Jo", "o", "(345", "J*n", "[AB]*o", "Bro?n", "678-9", "[!J]ohnson", "john", "xyz"]:
+            expected = [c.first_name for c in lazy.search_contacts(query)]
+            self.assertEqual([c.first_name for c in self.phonebook.search_contacts(query)], expected, query)
+        self.assertEqual([c.first_name for c in self.phonebook.search_contacts("ohn")], ["John", "Alice"])
+
+    def test_search_index_follows_mutations(self):
+        self.add_search_fixture()
+        self.phonebook.update_contact(2, last_name="Johnston")
+        self.phonebook.delete_contact(0)
+        self.phonebook.add_contact(self.make_contact(first_name="Johnny", last_name="Cash"))
+        self.assertEqual([c.first_name for c in self.phonebook.search_contacts("John")],
+                         ["Alice", "Bob", "Johnny"])
+
+    def test_query_results_are_cached_until_contacts_change(self):
+        self.add_search_fixture()
+        first = self.phonebook.search_contacts("ohn")
+        first.clear()
+        self.assertEqual([c.first_name for c in self.phonebook.search_contacts("ohn")], ["John", "Alice"])
+        self.phonebook.group_contacts("last_name")
+        self.phonebook.group_contacts("last_name")["Doe"].clear()
+        self.assertEqual(len(self.phonebook.group_contacts("last_name")["Doe"]), 1)
+        stats = self.phonebook.cache_stats()
+        self.assertEqual((stats["hits"], stats["misses"]), (3, 2))
+        self.phonebook.add_contact(self.make_contact(first_name="Johnny", last_name="Cash"))
+        self.assertEqual([c.first_name for c in self.phonebook.search_contacts("ohn")], ["John", "Alice", "Johnny"])
+        self.assertEqual(self.phonebook.cache_stats()["misses"], 3)
+        with self.phonebook.batch() as batch:
+            batch.delete(0)
+        self.assertEqual([c.first_name for c in self.phonebook.search_contacts("ohn")], ["Alice", "Johnny"])
+
+    def test_query_cache_can_be_disabled(self):
+        phonebook = PhoneBook(self.filename, cache_size=0)
+        phonebook.add_contact(self.make_contact())
+        phonebook.filter_contacts_by_time_frame("2000-01-01", "2100-01-01")
+        phonebook.filter_contacts_by_time_frame("2000-01-01", "2100-01-01")
+        stats = phonebook.cache_stats()
+        self.assertEqual((stats["hits"], stats["misses"], stats["entries"]), (0, 2, 0))
+
+    def add_fuzzy_fixture(self):
+        for first_name, last_name in [("John", "Johnson"), ("Jon", "Smith"), ("Jane", "Jonson"),
+                                      ("Bob", "Johnston"), ("Alice", "Smyth")]:
+            self.phonebook.add_contact(self.make_contact(first_name=first_name, last_name=last_name))
+
+    def test_fuzzy_search_ranks_misspelled_names(self):
+        self.add_fuzzy_fixture()
+        lazy = PhoneBook(self.filename, lazy=True)
+        for query, expected in [("Jonson", ["Jane", "John"]), ("jon smith", ["Jon"]), ("Smiht", ["Jon", "Alice"]),
+                                ("Jhon", ["John", "Jon"]), ("Zzyzx", []), ("", [])]:
+            for phonebook in (self.phonebook, lazy):
+                results = phonebook.fuzzy_search_contacts(query)
+                self.assertEqual([c.first_name for c in results], expected, query)
+        self.assertEqual([c.first_name for c in self.phonebook.fuzzy_search_contacts("Jhon", limit=1)], ["John"])
+
+    def test_fuzzy_index_follows_mutations(self):
+        self.add_fuzzy_fixture()
+        self.phonebook.fuzzy_search_contacts("Jonson")
+        self.phonebook.update_contact(0, last_name="Jonsen")
+        self.phonebook.delete_contact(2)
+        self.phonebook.add_contact(self.make_contact(first_name="Joan", last_name="Johnson"))
+        lazy = PhoneBook(self.filename, lazy=True)
+        for phonebook in (self.phonebook, lazy):
+            results = phonebook.fuzzy_search_contacts("Jonson")
+            self.assertEqual([(c.first_name, c.last_name) for c in results],
+                             [("John", "Jonsen"), ("Joan", "Johnson")])
+
+    def add_timestamp_fixture(self):
+        for first_name, created_at in [("John", "2023-06-01T10:00:00"), ("Jane", "2023-01-01T00:00:00"),
+                                       ("Alice", "2024-02-01T08:00:00"), ("Bob", "2023-12-31T00:00:00")]:
+            self.phonebook.add_contact(Contact(first_name, "Doe", "(123) 456-7890",
+                                               created_at=created_at, updated_at=created_at))
+
+    def test_filter_uses_index_and_matches_scan(self):
+        self.add_timestamp_fixture()
+        lazy = PhoneBook(self.filename, lazy=True)
+        for phonebook in (self.phonebook, lazy):
+            results = phonebook.filter_contacts_by_time_frame("2023-01-01", "2023-12-31")
+            self.assertEqual([c.first_name for c in results], ["Jane", "John", "Bob"])
+
+    def test_unreadable_timestamps_are_left_out_of_filters(self):
+        with open(self.filename, "w") as f:
+            json.dump([{"first_name": "Ann", "last_name": "Lee", "phone": "(123) 456-7890",
+                        "created_at": "last Tuesday", "updated_at": "2023-06-01T10:00:00"},
+                       {"first_name": "Bob", "last_name": "Lee", "phone": "(234) 567-8901",
+                        "created_at": "2023-06-01T10:00:00", "updated_at": "2023-06-01T10:00:00"}], f)
+        for phonebook in (PhoneBook(self.filename), PhoneBook(self.filename, lazy=True)):
+            with self.subTest(lazy=phonebook.lazy):
+                created = phonebook.filter_contacts_by_time_frame("2023-01-01", "2023-12-31", "created_at")
+                self.assertEqual([c.first_name for c in created], ["Bob"])
+                phonebook.update_contact(0, last_name="Smith")
+                self.assertEqual(phonebook.contacts[0].created_at, "last Tuesday")
+
+    def test_filter_by_updated_at_follows_updates(self):
+        self.add_timestamp_fixture()
+        self.phonebook.update_contact(2, phone="(987) 654-3210")
+        created = self.phonebook.filter_contacts_by_time_frame("2024-01-01", "2024-12-31", "created_at")
+        self.assertEqual([c.first_name for c in created], ["Alice"])
+        self.assertEqual(self.phonebook.filter_contacts_by_time_frame("2024-01-01", "2024-12-31", "updated_at"), [])
+        recent = self.phonebook.filter_contacts_by_time_frame("2025-01-01", "9999-12-31", "updated_at")
+        self.assertEqual([c.first_name for c in recent], ["Alice"])
+
+    def test_filter_keeps_order_of_equal_timestamps_after_update(self):
+        for first_name in ("John", "Jane", "Alice"):
+            self.phonebook.add_contact(Contact(first_name, "Doe", "(123) 456-7890", created_at="2023-06-01T10:00:00"))
+        self.phonebook.filter_contacts_by_time_frame("2023-01-01", "2023-12-31", "created_at")
+        self.phonebook.update_contact(0, phone="(987) 654-3210")
+        created = self.phonebook.filter_contacts_by_time_frame("2023-01-01", "2023-12-31", "created_at")
+        self.assertEqual([c.first_name for c in created], ["John", "Jane", "Alice"])
+
+    def test_filter_rejects_unknown_field(self):
+        with self.assertRaises(ValueError):
+            self.phonebook.filter_contacts_by_time_frame("2023-01-01", "2023-12-31", "first_name")
+
+    def test_stream_import_writes_to_storage(self):
+        self.phonebook.add_contact(self.make_contact())
+        path = self.write_csv([
+            "John,Doe,(123) 456-7890,john.doe@example.com,123 Main St",
+            "Jane,Doe,(234) 567-8901,,",
+            "Jane,Doe,(234) 567-8901,,",
+            ",Doe,(234) 567-8901,,",
+        ])
+        counts = self.phonebook.import_contacts_from_csv(path, stream=True)
+        self.assertEqual(counts, {"imported": 1, "skipped": 2, "invalid": 1})
+        self.assertEqual([c.first_name for c in self.phonebook.contacts], ["John", "Jane"])
+        self.assertTrue(self.phonebook.is_duplicate(self.make_contact(first_name="Jane", phone="(234) 567-8901",
+                                                                      email=None, address=None)))
+        self.assertEqual(len(PhoneBook(self.filename).contacts), 2)
+
+    def test_failed_stream_import_forgets_read_rows(self):
+        path = self.write_csv(["Ann,Lee,123-456-7890,,", "Bob,Lee,(234) 567-8901,,"])
+        def validator(row):
+            if row["first_name"] == "Bob":
+                raise OSError("read failed")
+        with self.assertRaises(OSError):
+            self.phonebook.import_contacts_from_csv(path, validator=validator, stream=True)
+        self.assertEqual(len(self.phonebook.contacts), 0)
+        self.assertFalse(self.phonebook.is_duplicate(Contact("Ann", "Lee", "(123) 456-7890")))
+        self.phonebook.add_contact(Contact("Ann", "Lee", "123-456-7890"))
+        self.assertEqual(len(PhoneBook(self.filename).contacts), 1)
+
+    def test_gzip_export_import_round_trip(self):
+        self.add_search_fixture()
+        path = os.path.join(self.tmpdir.name, "export.csv.gz")
+        self.phonebook.export_contacts_to_csv(path)
+        other = PhoneBook(os.path.join(self.tmpdir.name, "other.json"))
+        counts = other.import_contacts_from_csv(path, stream=True)
+        self.assertEqual(counts["imported"], 3)
+        self.assertEqual([c.to_dict()["phone"] for c in other.contacts],
+                         [c.phone for c in self.phonebook.contacts])
+
+    def test_export_writes_header_and_rows(self):
+        self.phonebook.add_contact(self.make_contact(email=None))
+        path = os.path.join(self.tmpdir.name, "export.csv")
+        self.phonebook.export_contacts_to_csv(path)
+        with open(path) as f:
+            lines = f.read().splitlines()
+        self.assertEqual(lines[0], "first_name,last_name,phone,email,address,created_at,updated_at")
+        self.assertTrue(lines[1].startswith("John,Doe,(123) 456-7890,,123 Main St,"))
+
+    def test_parallel_import_matches_sequential(self):
+        rows = [f"Name{i % 7},Doe,(123) 456-{i % 50:04d},,\"{i} Main St, Apt 1\"" for i in range(200)]
+        rows += ["Bad,,(123) 456-7890,,", "Name0,Doe,(123) 456-0000,,\"0 Main St, Apt 1\""]
+        path = self.write_csv(rows)
+        sequential = PhoneBook(os.path.join(self.tmpdir.name, "sequential.json"))
+        expected = sequential.import_contacts_from_csv(path)
+        with patch("phonebook.parallel_import.CHUNK_SIZE", 512):
+            counts = self.phonebook.import_contacts_from_csv(path, workers=2)
+        self.assertEqual(counts, expected)
+        self.assertEqual([c.address for c in self.phonebook.contacts], [c.address for c in sequential.contacts])
+
+    def test_parallel_import_bounds_pending_ranges(self):
+        from concurrent.futures import ThreadPoolExecutor
+        from phonebook.parallel_import import parallel_csv_rows
+
+        submitted = []
+
+        class CountingExecutor(ThreadPoolExecutor):
+            def submit(self, *args, **kwargs):
+                submitted.append(args[3])
+                return super().submit(*args, **kwargs)
+
+        path = self.write_csv([f"Name{i},Doe,(123) 456-{i:04d},," for i in range(500)])
+        with patch("phonebook.parallel_import.CHUNK_SIZE", 256), \
+                patch("phonebook.parallel_import.ProcessPoolExecutor", CountingExecutor):
+            rows = parallel_csv_rows(path, 2, None, {"invalid": 0})
+            self.assertEqual(next(rows)[0], "Name0")
+            self.assertEqual(len(submitted), 5)
+            self.assertEqual([fields[0] for fields in rows], [f"Name{i}" for i in range(1, 500)])
+        self.assertEqual(submitted, sorted(submitted))
+
+    def add_batch_fixture(self, storage=None):
+        if storage is not None:
+            self.phonebook = PhoneBook(storage=storage)
+        for i in range(6):
+            self.phonebook.add_contact(self.make_contact(first_name=f"Name{i}"))
+
+    def test_batch_applies_changes_with_one_save(self):
+        self.add_batch_fixture()
+        with patch.object(self.phonebook.storage, 'save', wraps=self.phonebook.storage.save) as save:
+            with self.phonebook.batch() as batch:
+                batch.delete(1)
+                batch.delete(4)
+                batch.update(2, first_name="Updated")
+                batch.update(4, first_name="Ignored")
+                batch.add(self.make_contact(first_name="New"))
+                batch.add(self.make_contact(first_name="Name0"))
+        self.assertEqual(save.call_count, 1)
+        self.assertEqual(batch.counts, {"added": 1, "updated": 1, "deleted": 2, "skipped": 1})
+        expected = ["Name0", "Updated", "Name3", "Name5", "New"]
+        self.assertEqual([c.first_name for c in self.phonebook.contacts], expected)
+        self.assertEqual([c.first_name for c in PhoneBook(self.filename).contacts], expected)
+        self.assertEqual([c.first_name for c in self.phonebook.search_contacts("Name")],
+                         ["Name0", "Name3", "Name5"])
+
+    def test_batch_is_journaled_and_replayed(self):
+        self.add_batch_fixture(JournalStorage(self.filename, fsync=False))
+        self.phonebook.delete_contacts([0, 3, 5])
+        with self.phonebook.batch() as batch:
+            batch.update(0, phone="(123) 456-7899")
+        reloaded = PhoneBook(storage=JournalStorage(self.filename))
+        self.assertEqual([c.first_name for c in reloaded.contacts], ["Name1", "Name2", "Name4"])
+        self.assertEqual(reloaded.contacts[0].phone, "(123) 456-7899")
+
+    def test_batch_is_discarded_on_error(self):
+        self.add_batch_fixture()
+        with self.assertRaises(RuntimeError):
+            with self.phonebook.batch() as batch:
+                batch.delete(0)
+                raise RuntimeError("abort")
+        with self.assertRaises(IndexError):
+            self.phonebook.delete_contacts([1, 6])
+        self.assertEqual(len(self.phonebook.contacts), 6)
+        self.assertEqual(len(PhoneBook(self.filename).contacts), 6)
+
+    def test_failed_save_reloads_contacts(self):
+        self.add_batch_fixture()
+        with patch.object(self.phonebook.storage, 'save', side_effect=OSError("disk full")):
+            with self.assertRaises(OSError):
+                self.phonebook.delete_contacts([0, 1])
+        self.assertEqual(len(self.phonebook.contacts), 6)
+
+    def test_contacts_are_found_by_id_phone_and_email(self):
+        self.add_batch_fixture()
+        self.phonebook.add_contact(self.make_contact(first_name="Other", phone="(555) 000-1111", email="o@example.com"))
+        other = self.phonebook.contacts[-1]
+        lazy = PhoneBook(self.filename, lazy=True)
+        for phonebook in (self.phonebook, lazy):
+            with self.subTest(lazy=phonebook.lazy):
+                self.assertEqual(phonebook.get_by_id(other.id).first_name, "Other")
+                self.assertIsNone(phonebook.get_by_id("missing"))
+                self.assertEqual([c.first_name for c in phonebook.get_by_phone(" (555) 000-1111")], ["Other"])
+                self.assertEqual(len(phonebook.get_by_email("john.doe@example.com")), 6)
+                self.assertEqual(phonebook.index_of(other.id), 6)
+                with self.assertRaises(KeyError):
+                    phonebook.index_of("missing")
+
+    def test_ids_survive_sort_and_delete(self):
+        self.add_batch_fixture()
+        ids = {c.first_name: c.id for c in self.phonebook.contacts}
+        self.phonebook.sort_contacts("first_name")
+        self.phonebook.delete_contact_by_id(ids["Name0"])
+        self.phonebook.update_contact_by_id(ids["Name3"], phone="(123) 456-7899")
+        self.phonebook.delete_contacts_by_id([ids["Name1"], ids["Name5"]])
+        reloaded = PhoneBook(self.filename)
+        self.assertEqual({c.first_name: c.id for c in reloaded.contacts},
+                         {name: ids[name] for name in ("Name2", "Name3", "Name4")})
+        self.assertEqual(reloaded.get_by_id(ids["Name3"]).phone, "(123) 456-7899")
+        self.assertEqual(reloaded.get_by_phone("(123) 456-7899"), [reloaded.get_by_id(ids["Name3"])])
+        with self.assertRaises(KeyError):
+            self.phonebook.delete_contacts_by_id([ids["Name2"], ids["Name0"]])
+        self.assertEqual(len(PhoneBook(self.filename).contacts), 3)
+
+    def add_view_fixture(self):
+        for first_name, last_name, email in [("John", "Doe", None), ("Alice", "Smith", "a@example.com"),
+                                             ("Bob", "Doe", "b@example.com"), ("Carol", "Lee", None)]:
+            self.phonebook.add_contact(self.make_contact(first_name, last_name, email=email))
+
+    def names(self, contacts):
+        return [contact.first_name for contact in contacts]
+
+    def test_sort_is_a_view(self):
+        self.add_view_fixture()
+        with patch.object(self.phonebook.storage, 'save') as save:
+            self.assertEqual(self.names(self.phonebook.sort_contacts("first_name")),
+                             ["Alice", "Bob", "Carol", "John"])
+        save.assert_not_called()
+        self.assertEqual(self.names(self.phonebook.contacts), ["John", "Alice", "Bob", "Carol"])
+        self.assertEqual(self.names(self.phonebook.sort_contacts("last_name,-first_name")),
+                         ["John", "Bob", "Carol", "Alice"])
+        self.assertEqual(self.names(self.phonebook.sort_contacts("-email")), ["John", "Carol", "Bob", "Alice"])
+        with self.assertRaises(ValueError):
+            self.phonebook.sort_contacts("first_name,unknown")
+
+    def test_views_follow_mutations(self):
+        self.add_view_fixture()
+        self.phonebook.sort_contacts("last_name,first_name")
+        self.phonebook.group_contacts("last_name")
+        self.phonebook.update_contact(0, last_name="Smith")
+        self.phonebook.delete_contact(1)
+        self.phonebook.add_contact(self.make_contact("Dave", "Doe"))
+        with self.phonebook.batch() as batch:
+            batch.update(1, first_name="Bobby")
+            batch.add(self.make_contact("Eve", "Lee"))
+        self.assertEqual(self.names(self.phonebook.contacts), ["John", "Bobby", "Carol", "Dave", "Eve"])
+        expected_sort = ["Bobby", "Dave", "Carol", "Eve", "John"]
+        expected_groups = {"Smith": ["John"], "Doe": ["Bobby", "Dave"], "Lee": ["Carol", "Eve"]}
+        for phonebook in (self.phonebook, PhoneBook(self.filename)):
+            self.assertEqual(self.names(phonebook.sort_contacts("last_name,first_name")), expected_sort)
+            grouped = phonebook.group_contacts("last_name")
+            self.assertEqual({key: self.names(group) for key, group in grouped.items()}, expected_groups)
+            self.assertEqual(list(grouped), list(expected_groups))
+
+class TestConcurrentPhoneBook(unittest.TestCase):
+
+    def setUp(self):
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.filename = os.path.join(self.tmpdir.name, "contacts.json")
+        self.print_patcher = patch('builtins.print')
+        self.print_patcher.start()
+
+    def tearDown(self):
+        self.print_patcher.stop()
+        self.tmpdir.cleanup()
+
+    def test_stale_phonebook_reloads_before_writing(self):
+        first = PhoneBook(self.filename)
+        second = PhoneBook(self.filename)
+        first.add_contact(Contact("John", "Doe", "(123) 456-7890"))
+        second.add_contact(Contact("Jane", "Doe", "(123) 456-7891"))
+        second.update_contact(0, phone="(123) 456-7899")
+        self.assertEqual([c.first_name for c in PhoneBook(self.filename).contacts], ["John", "Jane"])
+        self.assertEqual([c.phone for c in first.search_contacts("Doe")], ["(123) 456-7899", "(123) 456-7891"])
+
+    def run_with_timeout(self, target):
+        results = []
+        thread = threading.Thread(target=lambda: results.append(target()), daemon=True)
+        thread.start()
+        thread.join(timeout=5)
+        self.assertFalse(thread.is_alive(), "deadlocked")
+        return results[0]
+
+    def test_lazy_get_by_id_with_waiting_writer(self):
+        PhoneBook(self.filename).add_contact(Contact("John", "Doe", "(123) 456-7890"))
+        phonebook = PhoneBook(self.filename, lazy=True)
+        contact_id = phonebook.contacts[0].id
+        writer = threading.Thread(target=phonebook.add_contact, args=(Contact("Jane", "Doe", "(123) 456-7891"),),
+                                  daemon=True)
+
+        def read_while_writer_waits():
+            with phonebook._reading():
+                writer.start()
+                while not phonebook._lock._waiting_writers:
+                    time.sleep(0.001)
+                return phonebook.get_by_id(contact_id)
+
+        self.assertEqual(self.run_with_timeout(read_while_writer_waits).first_name, "John")
+        writer.join(timeout=5)
+        self.assertEqual(len(phonebook.contacts), 2)
+
+    def test_nested_read_does_not_reload_stale_contacts(self):
+        PhoneBook(self.filename).add_contact(Contact("John", "Doe", "(123) 456-7890"))
+        phonebook = PhoneBook(self.filename, lazy=True)
+        contact_id = phonebook.contacts[0].id
+
+        def read_across_external_write():
+            with phonebook._reading():
+                PhoneBook(self.filename).add_contact(Contact("Jane", "Doe", "(123) 456-7891"))
+                return phonebook.get_by_id(contact_id)
+
+        self.assertEqual(self.run_with_timeout(read_across_external_write).first_name, "John")
+        self.assertEqual(len(phonebook.list_contacts()), 2)
+
+    def test_generation_changes_on_every_write(self):
+        phonebook = PhoneBook(storage=JournalStorage(self.filename, fsync=False))
+        generations = {phonebook.storage.generation()}
+        phonebook.add_contact(Contact("John", "Doe", "(123) 456-7890"))
+        generations.add(phonebook.storage.generation())
+        phonebook.update_contact(0, phone="(123) 456-7899")
+        generations.add(phonebook.storage.generation())
+        phonebook.sort_contacts("first_name")
+        self.assertIn(phonebook.storage.generation(), generations)
+        self.assertEqual(len(generations), 3)
+
+    def test_parallel_processes_lose_no_updates(self):
+        for journal in (False, True):
+            with self.subTest(journal=journal):
+                filename = os.path.join(self.tmpdir.name, f"contacts-{journal}.json")
+                workers, count = 4, 25
+                with ProcessPoolExecutor(max_workers=workers) as executor:
+                    futures = [executor.submit(add_contacts_in_process, filename, journal, worker, count)
+                               for worker in range(workers)]
+                    for future in futures:
+                        future.result()
+                storage = JournalStorage(filename) if journal else JSONStorage(filename)
+                contacts = PhoneBook(storage=storage).contacts
+                self.assertEqual(len(contacts), workers * count)
+                self.assertEqual(len({(c.first_name, c.last_name) for c in contacts}), workers * count)
+
+    def test_threads_share_one_phonebook(self):
+        phonebook = PhoneBook(storage=JournalStorage(self.filename, fsync=False))
+        errors = []
+
+        def writer(worker):
+            for i in range(25):
+                phonebook.add_contact(Contact(f"Worker{worker}", f"Contact{i}", "(123) 456-7890"))
+
+        def reader():
+            try:
+                for _ in range(25):
+                    for contact in phonebook.search_contacts("Worker"):
+                        self.assertTrue(contact.first_name.startswith("Worker"))
+                    phonebook.list_contacts()
+            except Exception as e:
+                errors.append(e)
+
+        threads = [threading.Thread(target=writer, args=(worker,)) for worker in range(4)]
+        threads += [threading.Thread(target=reader) for _ in range(4)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        self.assertEqual(errors, [])
+        self.assertEqual(len(phonebook.contacts), 100)
+        self.assertEqual(len(PhoneBook(storage=JournalStorage(self.filename)).contacts), 100)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,85 @@
+import asyncio
+import os
+import tempfile
+import unittest
+from unittest.mock import patch
+
+from phonebook.phonebook import PhoneBook
+from server import PhoneBookServer, ReadWriteLock, is_running, send_request
+
+# test_server.py
+
+class TestPhoneBookServer(unittest.IsolatedAsyncioTestCase):
+
+    async def asyncSetUp(self):
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.socket_path = os.path.join(self.tmpdir.name, "phonebook.sock")
+        self.phonebook = PhoneBook(os.path.join(self.tmpdir.name, "contacts.json"))
+        self.server = PhoneBookServer(self.phonebook)
+        ready = asyncio.Event()
+        self.task = asyncio.create_task(self.server.serve(self.socket_path, ready))
+        await ready.wait()
+
+    async def asyncTearDown(self):
+        self.task.cancel()
+        with self.assertRaises(asyncio.CancelledError):
+            await self.task
+        self.tmpdir.cleanup()
+
+    async def request(self, action, **args):
+        return await asyncio.to_thread(send_request, action, args, self.socket_path)
+
+    async def test_add_then_search(self):
+        response = await self.request("add", first_name="John", last_name="Doe", phone="(123) 456-7890")
+        self.assertTrue(response["ok"])
+        self.assertIn("Contact added successfully.", response["output"])
+        response = await self.request("search", query="Jo")
+        self.assertIn("First Name: John", response["output"])
+        self.assertEqual(len(self.phonebook.contacts), 1)
+
+    async def test_concurrent_requests_get_their_own_output(self):
+        await self.request("add", first_name="John", last_name="Doe", phone="(123) 456-7890")
+        await self.request("add", first_name="Jane", last_name="Roe", phone="(123) 456-7891")
+        responses = await asyncio.gather(*(
+            self.request("search", query=name) for name in ["John", "Jane"] * 3
+        ))
+        for name, response in zip(["John", "Jane"] * 3, responses):
+            self.assertIn(f"First Name: {name}", response["output"])
+            self.assertEqual(response["output"].count("First Name:"), 1)
+
+    async def test_errors_are_reported(self):
+        response = await self.request("migrate")
+        self.assertEqual(response, {"ok": False, "error": "Unsupported action: migrate"})
+        with patch("builtins.print"):
+            response = await self.request("add", first_name="John")
+        self.assertFalse(response["ok"])
+        self.assertIn("required", response["error"])
+
+    async def test_is_running(self):
+        self.assertTrue(is_running(self.socket_path))
+        self.assertFalse(is_running(os.path.join(self.tmpdir.name, "missing.sock")))
+
+class TestReadWriteLock(unittest.IsolatedAsyncioTestCase):
+
+    async def test_readers_share_and_writers_exclude(self):
+        lock = ReadWriteLock()
+        events = []
+
+        async def reader(name):
+            async with lock.read():
+                events.append(f"{name} start")
+                await asyncio.sleep(0.01)
+                events.append(f"{name} end")
+
+        async def writer():
+            async with lock.write():
+                events.append("writer start")
+                await asyncio.sleep(0.01)
+                events.append("writer end")
+
+        await asyncio.gather(reader("r1"), reader("r2"), writer())
+        self.assertEqual(events[:2], ["r1 start", "r2 start"])
+        self.assertEqual(events[-2:], ["writer start", "writer end"])
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,170 @@
+import json
+import os
+import sqlite3
+import tempfile
+import unittest
+from unittest.mock import patch
+
+from phonebook.phonebook import Contact
+from phonebook.sqlite_phonebook import SQLitePhoneBook
+
+# test_sqlite_phonebook.py
+
+class TestSQLitePhoneBook(unittest.TestCase):
+
+    def setUp(self):
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.filename = os.path.join(self.tmpdir.name, "contacts.db")
+        self.phonebook = SQLitePhoneBook(self.filename)
+        self.print_patcher = patch('builtins.print')
+        self.print_patcher.start()
+        self.phonebook.add_contact(Contact("John", "Doe", "(123) 456-7890", "john@example.com", "123 Main St",
+                                           created_at="2023-03-01T10:00:00"))
+        self.phonebook.add_contact(Contact("Alice", "Smith", "(234) 567-8901", None, None,
+                                           created_at="2024-01-15T09:30:00"))
+        self.phonebook.add_contact(Contact("Bob", "Doe", "(345) 678-9012", created_at="2023-12-31T12:00:00"))
+
+    def tearDown(self):
+        self.phonebook.connection.close()
+        self.print_patcher.stop()
+        self.tmpdir.cleanup()
+
+    def names(self, contacts):
+        return [contact.first_name for contact in contacts]
+
+    def test_contacts_persist_in_insertion_order(self):
+        reloaded = SQLitePhoneBook(self.filename)
+        self.assertEqual(self.names(reloaded.list_contacts()), ["John", "Alice", "Bob"])
+        reloaded.connection.close()
+
+    def test_duplicates_are_skipped(self):
+        self.phonebook.add_contact(Contact("Alice", "Smith", "(234) 567-8901", "", ""))
+        self.assertEqual(len(self.phonebook.contacts), 3)
+
+    def test_update_and_delete_by_index(self):
+        self.phonebook.update_contact(1, last_name="Jones")
+        self.phonebook.delete_contact(0)
+        contacts = self.phonebook.list_contacts()
+        self.assertEqual([(c.first_name, c.last_name) for c in contacts], [("Alice", "Jones"), ("Bob", "Doe")])
+
+    def test_sort_returns_view_without_reordering(self):
+        self.assertEqual(self.names(self.phonebook.sort_contacts("first_name")), ["Alice", "Bob", "John"])
+        self.assertEqual(self.names(self.phonebook.sort_contacts("last_name,-first_name")), ["John", "Bob", "Alice"])
+        self.assertEqual(self.names(self.phonebook.sort_contacts("email")), ["John", "Alice", "Bob"])
+        self.phonebook.delete_contact(0)
+        self.assertEqual(self.names(self.phonebook.list_contacts()), ["Alice", "Bob"])
+
+    def test_iter_contacts_pages_by_position(self):
+        self.phonebook.delete_contact(0)
+        self.phonebook.add_contact(Contact("Carol", "Jones", "(456) 789-0123"))
+        with patch('phonebook.sqlite_phonebook.STREAM_BATCH_SIZE', 2):
+            self.assertEqual(self.names(self.phonebook.iter_contacts()), ["Alice", "Bob", "Carol"])
+            self.assertEqual(self.names(self.phonebook.iter_contacts(offset=1, limit=2)), ["Bob", "Carol"])
+        self.assertEqual(self.names(self.phonebook.iter_search_contacts("o", offset=1)), ["Carol"])
+
+    def test_sort_rejects_unknown_key(self):
+        with self.assertRaises(ValueError):
+            self.phonebook.sort_contacts("position; DROP TABLE contacts")
+
+    def test_group(self):
+        grouped = self.phonebook.group_contacts("last_name")
+        self.assertEqual({key: self.names(group) for key, group in grouped.items()},
+                         {"Doe": ["John", "Bob"], "Smith": ["Alice"]})
+
+    def test_group_order_and_keys_match_phonebook(self):
+        self.assertEqual(list(self.phonebook.group_contacts("first_name")), ["John", "Alice", "Bob"])
+        grouped = self.phonebook.group_contacts("id")
+        self.assertEqual(list(grouped), [contact.id for contact in self.phonebook.contacts])
+        with self.assertRaises(ValueError):
+            self.phonebook.group_contacts("position")
+
+    def test_search_matches_wildcards(self):
+        self.assertEqual(self.names(self.phonebook.search_contacts("o")), ["John", "Bob"])
+        self.assertEqual(self.names(self.phonebook.search_contacts("(2*8901")), ["Alice"])
+
+    def test_cached_search_sees_changes_from_other_connections(self):
+        self.assertEqual(self.names(self.phonebook.search_contacts("o")), ["John", "Bob"])
+        self.assertEqual(self.names(self.phonebook.search_contacts("o")), ["John", "Bob"])
+        self.assertEqual(self.phonebook.cache_stats()["hits"], 1)
+        other = SQLitePhoneBook(self.filename)
+        other.add_contact(Contact("Joan", "Smith", "(456) 789-0123"))
+        other.connection.close()
+        self.assertEqual(self.names(self.phonebook.search_contacts("o")), ["John", "Bob", "Joan"])
+        self.phonebook.delete_contact(0)
+        self.assertEqual(self.names(self.phonebook.search_contacts("o")), ["Bob", "Joan"])
+
+    def test_fuzzy_search(self):
+        self.assertEqual(self.names(self.phonebook.fuzzy_search_contacts("Jhon Do")), ["John"])
+        self.assertEqual(self.names(self.phonebook.fuzzy_search_contacts("Dow")), ["John", "Bob"])
+        self.assertEqual(self.names(self.phonebook.fuzzy_search_contacts("Dow", limit=1)), ["John"])
+
+    def test_filter_by_time_frame(self):
+        results = self.phonebook.filter_contacts_by_time_frame("2023-01-01", "2023-12-31")
+        self.assertEqual(self.names(results), ["John"])
+
+    def test_batch_changes_are_atomic(self):
+        with self.phonebook.batch() as batch:
+            batch.delete(0)
+            batch.update(2, first_name="Bobby")
+            batch.add(Contact("Jane", "Lee", "(456) 789-0123"))
+        self.assertEqual(self.names(self.phonebook.list_contacts()), ["Alice", "Bobby", "Jane"])
+        with self.assertRaises(IndexError):
+            self.phonebook.delete_contacts([0, 3])
+        self.assertEqual(self.names(self.phonebook.list_contacts()), ["Alice", "Bobby", "Jane"])
+
+    def test_contacts_are_addressed_by_id(self):
+        john, alice, bob = self.phonebook.list_contacts()
+        self.phonebook.delete_contact(0)
+        self.assertIsNone(self.phonebook.get_by_id(john.id))
+        self.phonebook.add_contact(john)
+        self.assertEqual(self.phonebook.index_of(john.id), 2)
+        self.phonebook.update_contact_by_id(john.id, phone="(999) 999-9999")
+        self.assertEqual(self.names(self.phonebook.get_by_phone("(999) 999-9999")), ["John"])
+        self.assertEqual(self.phonebook.get_by_email("john@example.com")[0].id, john.id)
+        self.phonebook.delete_contact_by_id(alice.id)
+        self.assertIsNone(self.phonebook.get_by_id(alice.id))
+        with self.assertRaises(KeyError):
+            self.phonebook.delete_contact_by_id(alice.id)
+        self.assertEqual([c.id for c in SQLitePhoneBook(self.filename).list_contacts()], [bob.id, john.id])
+
+    def test_phones_and_emails_are_normalized(self):
+        self.phonebook.add_contact(Contact("Alice", "Smith", "234.567.8901", "", ""))
+        self.assertEqual(len(self.phonebook.contacts), 3)
+        self.phonebook.update_contact(2, phone="+1 999-999-9999", email="Bob@Example.COM")
+        self.assertEqual(self.names(self.phonebook.get_by_phone("999-999-9999")), ["Bob"])
+        self.assertEqual(self.phonebook.get_by_email("bob@example.com")[0].phone, "(999) 999-9999")
+        with self.assertRaises(ValueError):
+            self.phonebook.update_contact(0, phone="12345")
+
+    def test_old_database_gets_contact_ids(self):
+        filename = os.path.join(self.tmpdir.name, "old.db")
+        connection = sqlite3.connect(filename)
+        connection.execute(
+            "CREATE TABLE contacts (id INTEGER PRIMARY KEY, position INTEGER NOT NULL, identity TEXT NOT NULL, "
+            "first_name TEXT NOT NULL, last_name TEXT NOT NULL, phone TEXT NOT NULL, email TEXT, address TEXT, "
+            "created_at TEXT NOT NULL, updated_at TEXT NOT NULL)"
+        )
+        connection.execute(
+            "INSERT INTO contacts VALUES (1, 1, '', 'Jane', 'Lee', '(456) 789-0123', NULL, NULL, "
+            "'2024-01-01T00:00:00', '2024-01-01T00:00:00')"
+        )
+        connection.commit()
+        connection.close()
+        phonebook = SQLitePhoneBook(filename)
+        [jane] = phonebook.list_contacts()
+        self.assertEqual(phonebook.get_by_id(jane.id).first_name, "Jane")
+        phonebook.connection.close()
+
+    def test_migrate_from_json(self):
+        json_filename = os.path.join(self.tmpdir.name, "contacts.json")
+        with open(json_filename, "w") as f:
+            json.dump([Contact("Jane", "Lee", "(456) 789-0123").to_dict()], f)
+        target = SQLitePhoneBook(os.path.join(self.tmpdir.name, "migrated.db"))
+        self.assertEqual(target.migrate_from_json(json_filename), 1)
+        self.assertEqual(self.names(target.contacts), ["Jane"])
+        with self.assertRaises(ValueError):
+            target.migrate_from_json(json_filename)
+        target.connection.close()
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,157 @@
+import json
+import os
+import tempfile
+import unittest
+
+from phonebook.storage import ColumnarStorage, JSONLinesStorage, JSONStorage, JournalStorage
+
+# test_storage.py
+
+def make_record(first_name):
+    return {"first_name": first_name, "last_name": "Doe", "phone": "(123) 456-7890"}
+
+class TestJSONStorage(unittest.TestCase):
+
+    def setUp(self):
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.filename = os.path.join(self.tmpdir.name, "contacts.json")
+
+    def tearDown(self):
+        self.tmpdir.cleanup()
+
+    def test_missing_file_loads_empty(self):
+        self.assertEqual(JSONStorage(self.filename).load(), [])
+
+    def test_save_and_load_round_trip(self):
+        storage = JSONStorage(self.filename)
+        storage.save([make_record("John")])
+        self.assertEqual(JSONStorage(self.filename).load(), [make_record("John")])
+        self.assertEqual(sorted(os.listdir(self.tmpdir.name)), ["contacts.json", "contacts.json.lock"])
+
+class TestCompactFormats(unittest.TestCase):
+
+    def setUp(self):
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.filename = os.path.join(self.tmpdir.name, "contacts.json")
+        self.records = [
+            {"id": "0123456789abcdef", "first_name": "Zoë", "last_name": "Doe", "phone": "(123) 456-7890",
+             "email": None, "address": "1 \"Quoted\" St\nApt 2", "created_at": "2024-01-01T00:00:00",
+             "updated_at": "2024-01-01T00:00:00"},
+            {"id": "fedcba9876543210", "first_name": "Jane", "last_name": "", "phone": "(234) 567-8901",
+             "email": "jane@example.com", "address": None, "created_at": "2024-02-01T00:00:00",
+             "updated_at": "2024-03-01T00:00:00"},
+        ]
+
+    def tearDown(self):
+        self.tmpdir.cleanup()
+
+    def test_every_backend_loads_every_format(self):
+        for writer in (JSONStorage, JSONLinesStorage, ColumnarStorage):
+            writer(self.filename).save(self.records)
+            for reader in (JSONStorage, JSONLinesStorage, ColumnarStorage, JournalStorage):
+                with self.subTest(writer=writer.__name__, reader=reader.__name__):
+                    self.assertEqual(reader(self.filename).load(), self.records)
+
+    def test_empty_files_round_trip(self):
+        for backend in (JSONLinesStorage, ColumnarStorage):
+            with self.subTest(backend=backend.__name__):
+                backend(self.filename).save([])
+                self.assertEqual(JSONStorage(self.filename).load(), [])
+
+    def test_json_lines_appends_added_contacts(self):
+        storage = JSONLinesStorage(self.filename)
+        storage.save(self.records[:1])
+        self.assertTrue(storage.append([{"op": "add", "contact": self.records[1]}]))
+        self.assertFalse(storage.append([{"op": "delete", "index": 0}]))
+        self.assertEqual(JSONStorage(self.filename).load(), self.records)
+        # A file in another format has to be rewritten before appending.
+        JSONStorage(self.filename).save(self.records)
+        storage = JSONLinesStorage(self.filename)
+        storage.load()
+        self.assertFalse(storage.append([{"op": "add", "contact": self.records[0]}]))
+
+    def test_torn_json_line_is_discarded(self):
+        JSONLinesStorage(self.filename).save(self.records)
+        with open(self.filename, "a") as f:
+            f.write('{"first_name": "Al')
+        self.assertEqual(JSONLinesStorage(self.filename).load(), self.records)
+
+class TestJournalStorage(unittest.TestCase):
+
+    def setUp(self):
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.filename = os.path.join(self.tmpdir.name, "contacts.json")
+        self.storage = JournalStorage(self.filename, fsync=False)
+        self.storage.save([make_record("John")])
+
+    def tearDown(self):
+        self.tmpdir.cleanup()
+
+    def test_appended_entries_are_replayed(self):
+        self.assertTrue(self.storage.append([
+            {"op": "add", "contact": make_record("Jane")},
+            {"op": "update", "index": 0, "contact": make_record("Johnny")},
+        ]))
+        self.assertTrue(self.storage.append([{"op": "delete", "index": 1}]))
+        self.assertEqual(JournalStorage(self.filename).load(), [make_record("Johnny")])
+        # The snapshot itself is untouched until compaction.
+        with open(self.filename) as f:
+            self.assertEqual(json.load(f), [make_record("John")])
+
+    def test_other_backends_keep_journaled_changes(self):
+        self.storage.append([{"op": "add", "contact": make_record("Jane")}])
+        for storage_class in (JSONStorage, JSONLinesStorage, ColumnarStorage):
+            with self.subTest(storage_class.__name__):
+                storage = storage_class(self.filename)
+                records = storage.load()
+                self.assertEqual(records, [make_record("John"), make_record("Jane")])
+                self.assertFalse(storage.append([{"op": "add", "contact": make_record("Alice")}]))
+                storage.save(records + [make_record("Alice")])
+                self.assertFalse(os.path.exists(storage.journal_filename))
+                self.assertEqual(len(JournalStorage(self.filename).load()), 3)
+                self.storage.save([make_record("John")])
+                self.storage.append([{"op": "add", "contact": make_record("Jane")}])
+
+    def test_journal_is_not_replayed_onto_an_identical_save(self):
+        self.storage.append([{"op": "add", "contact": make_record("Jane")}])
+        storage = JSONStorage(self.filename)
+        storage.load()
+        storage.save([make_record("John")])
+        self.assertEqual(JournalStorage(self.filename).load(), [make_record("John")])
+
+    def test_append_requests_compaction_at_threshold(self):
+        storage = JournalStorage(self.filename, compact_threshold=2, fsync=False)
+        storage.load()
+        self.assertTrue(storage.append([{"op": "add", "contact": make_record("Jane")}]))
+        self.assertFalse(storage.append([{"op": "add", "contact": make_record("Alice")},
+                                         {"op": "add", "contact": make_record("Bob")}]))
+
+    def test_save_compacts_journal(self):
+        self.storage.append([{"op": "add", "contact": make_record("Jane")}])
+        self.storage.save([make_record("John"), make_record("Jane")])
+        with open(self.storage.journal_filename) as f:
+            self.assertEqual(len(f.readlines()), 1)
+        self.assertEqual(len(JournalStorage(self.filename).load()), 2)
+
+    def test_stale_journal_is_ignored(self):
+        self.storage.append([{"op": "add", "contact": make_record("Jane")}])
+        # Simulate a crash after the new snapshot was written but before the
+        # journal was reset.
+        with open(self.filename, "w") as f:
+            json.dump([make_record("John"), make_record("Jane")], f)
+        storage = JournalStorage(self.filename)
+        self.assertEqual(len(storage.load()), 2)
+        storage.append([{"op": "add", "contact": make_record("Alice")}])
+        self.assertEqual(len(JournalStorage(self.filename).load()), 3)
+
+    def test_torn_entry_is_discarded(self):
+        self.storage.append([{"op": "add", "contact": make_record("Jane")}])
+        with open(self.storage.journal_filename, "a") as f:
+            f.write('{"op": "add", "contact": {"first_')
+        storage = JournalStorage(self.filename)
+        self.assertEqual(len(storage.load()), 2)
+        storage.append([{"op": "add", "contact": make_record("Alice")}])
+        self.assertEqual(len(JournalStorage(self.filename).load()), 3)
+
+if __name__ == '__main__':
+    unittest.main()
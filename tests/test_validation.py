@@ -0,0 +1,55 @@
+import unittest
+
+from phonebook.validation import (
+    email_key, normalize_email, normalize_many, normalize_phone, phone_key, to_e164
+)
+
+# test_validation.py
+
+class TestValidation(unittest.TestCase):
+
+    def test_phone_layouts_share_one_canonical_form(self):
+        for phone in ["(123) 456-7890", "123-456-7890", "123.456.7890", "1234567890", " +1 123 456 7890 ",
+                      "1-123-456-7890"]:
+            with self.subTest(phone=phone):
+                self.assertEqual(to_e164(phone), "+11234567890")
+                self.assertEqual(normalize_phone(phone), "(123) 456-7890")
+
+    def test_international_numbers_keep_e164_form(self):
+        self.assertEqual(normalize_phone("+44 20 7946 0958"), "+442079460958")
+
+    def test_invalid_phones_are_rejected(self):
+        for phone in ["", None, "456-7890", "223-456-78901", "+12 345", "123-456-789O", "12+3456789012"]:
+            with self.subTest(phone=phone):
+                with self.assertRaises(ValueError):
+                    normalize_phone(phone)
+
+    def test_emails_are_lower_cased(self):
+        self.assertEqual(normalize_email(" John.Doe@Example.COM "), "john.doe@example.com")
+        self.assertIsNone(normalize_email(None))
+        with self.assertRaises(ValueError):
+            normalize_email("john@com")
+
+    def test_keys_fall_back_to_stripped_value(self):
+        self.assertEqual(phone_key("123-456-7890"), "(123) 456-7890")
+        self.assertEqual(phone_key(" 555 "), "555")
+        self.assertEqual(email_key(" Not-An-Email "), "Not-An-Email")
+
+    def test_normalize_many_skips_and_counts_invalid_rows(self):
+        rows = [
+            {"phone": "(123) 456-7890", "email": ""},
+            {"phone": "234-567-8901", "email": "A@B.COM"},
+            {"phone": "123", "email": ""},
+            {"phone": "(123) 456-7890", "email": "bad"},
+            {"email": "a@b.com"},
+        ]
+        counts = {"invalid": 0}
+        normalized = list(normalize_many(rows, counts))
+        self.assertEqual(normalized, [
+            {"phone": "(123) 456-7890", "email": ""},
+            {"phone": "(234) 567-8901", "email": "a@b.com"},
+        ])
+        self.assertEqual(counts["invalid"], 3)
+
+if __name__ == '__main__':
+    unittest.main()